@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Dict
 from app.services.transformer import TransformationService
+from app.services.executor import offload
 
 router = APIRouter(prefix="/api/calculate", tags=["calculate"])
 
@@ -13,7 +14,8 @@ class FactorsRequest(BaseModel):
 
 
 @router.post("/grid-convergence")
-async def grid_convergence(req: FactorsRequest):
+@offload
+def grid_convergence(req: FactorsRequest):
     try:
         service = TransformationService()
         val = service.calculate_grid_convergence(req.crs, req.lon, req.lat)
@@ -23,7 +25,8 @@ async def grid_convergence(req: FactorsRequest):
 
 
 @router.post("/scale-factor")
-async def scale_factor(req: FactorsRequest):
+@offload
+def scale_factor(req: FactorsRequest):
     try:
         service = TransformationService()
         factors = service.calculate_scale_factor(req.crs, req.lon, req.lat)
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 from pyproj import CRS
-from pyproj.database import query_crs_info
-from pyproj.aoi import AreaOfInterest
 from typing import Optional, List, Dict
 from app.services.crs_parser import CustomCRSParser
+from app.services.crs_registry import content_key
+from app.services.crs_index import CRS_SEARCH_INDEX, PARAMETER_FIELDS, PROJECTED_CRS_INDEX
+from app.services.serialization import dumps
 from pydantic import BaseModel
-from app.services.transformer import TransformationService
+from app.services.transformer import TransformationService, CRS_REGISTRY, CRS_METADATA_CACHE
+from app.services.executor import offload
 
 
 class CustomXmlBody(BaseModel):
@@ -13,144 +15,154 @@ class CustomXmlBody(BaseModel):
 
 router = APIRouter(prefix="/api/crs", tags=["crs"])
 
+def _metadata_key(kind: str, code: str) -> str:
+    # WKT/PROJJSON inputs are hashed, so they never become multi-KB Redis keys.
+    return f"{kind}:{content_key(code.strip())}"
+
+
 @router.get("/info")
-async def crs_info(code: str):
+@offload
+def crs_info(code: str):
     """Return CRS metadata like name, datum, ellipsoid parameters, etc."""
     try:
-        service = TransformationService()
-        crs = service._crs_from_input(code)
-        # Base info
-        info = {
-            "code": code,
-            "name": crs.name,
-            "type": crs.type_name,
-            "is_geographic": crs.is_geographic,
-            "is_projected": crs.is_projected,
-            "area_of_use": getattr(crs.area_of_use, "name", None),
-        }
+        info = CRS_METADATA_CACHE.get_or_build(_metadata_key("info", code), lambda: _crs_info(code))
+        # The cached entry may have been built from a differently spaced input.
+        return {**info, "code": code}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        try:
-            geodetic = getattr(crs, "geodetic_crs", None)
-        except Exception:
-            geodetic = None
-        if geodetic is None and crs.is_geographic:
-            geodetic = crs
-        geodetic_code = None
-        geodetic_name = None
-        if geodetic is not None:
-            geodetic_name = getattr(geodetic, "name", None)
-            try:
-                auth_name, auth_code = geodetic.to_authority() or (None, None)
-                if auth_name and auth_code:
-                    geodetic_code = f"{auth_name}:{auth_code}"
-            except Exception:
-                geodetic_code = None
-        info["geodetic_crs"] = {
-            "code": geodetic_code,
-            "name": geodetic_name,
-        }
 
-        # Datum and geodetic
-        datum_name = None
-        try:
-            datum_name = getattr(crs.datum, "name", None)
-        except Exception:
-            datum_name = None
-        info["datum_name"] = datum_name
+def _crs_info(code: str) -> Dict:
+    service = TransformationService()
+    crs = service._crs_from_input(code)
+    # Base info
+    info = {
+        "code": code,
+        "name": crs.name,
+        "type": crs.type_name,
+        "is_geographic": crs.is_geographic,
+        "is_projected": crs.is_projected,
+        "area_of_use": getattr(crs.area_of_use, "name", None),
+    }
 
-        # Ellipsoid
-        ell = None
-        geo = getattr(crs, "geodetic_crs", None) or crs
+    try:
+        geodetic = getattr(crs, "geodetic_crs", None)
+    except Exception:
+        geodetic = None
+    if geodetic is None and crs.is_geographic:
+        geodetic = crs
+    geodetic_code = None
+    geodetic_name = None
+    if geodetic is not None:
+        geodetic_name = getattr(geodetic, "name", None)
         try:
-            ell = getattr(geo, "ellipsoid", None)
+            auth_name, auth_code = geodetic.to_authority() or (None, None)
+            if auth_name and auth_code:
+                geodetic_code = f"{auth_name}:{auth_code}"
         except Exception:
-            ell = None
-        if ell is not None:
-            try:
-                info["ellipsoid"] = {
-                    "name": getattr(ell, "name", None),
-                    "semi_major_m": getattr(ell, "semi_major_metre", None),
-                    "semi_minor_m": getattr(ell, "semi_minor_metre", None),
-                    "inverse_flattening": getattr(ell, "inverse_flattening", None),
-                    "flattening": getattr(ell, "flattening", None),
-                }
-            except Exception:
-                pass
+            geodetic_code = None
+    info["geodetic_crs"] = {
+        "code": geodetic_code,
+        "name": geodetic_name,
+    }
+
+    # Datum and geodetic
+    datum_name = None
+    try:
+        datum_name = getattr(crs.datum, "name", None)
+    except Exception:
+        datum_name = None
+    info["datum_name"] = datum_name
 
-        # Prime meridian
+    # Ellipsoid
+    ell = None
+    geo = getattr(crs, "geodetic_crs", None) or crs
+    try:
+        ell = getattr(geo, "ellipsoid", None)
+    except Exception:
+        ell = None
+    if ell is not None:
         try:
-            pm = getattr(geo, "prime_meridian", None)
-            if pm is not None:
-                info["prime_meridian"] = {
-                    "name": getattr(pm, "name", None),
-                    "longitude": getattr(pm, "longitude", None),
-                }
+            info["ellipsoid"] = {
+                "name": getattr(ell, "name", None),
+                "semi_major_m": getattr(ell, "semi_major_metre", None),
+                "semi_minor_m": getattr(ell, "semi_minor_metre", None),
+                "inverse_flattening": getattr(ell, "inverse_flattening", None),
+                "flattening": getattr(ell, "flattening", None),
+            }
         except Exception:
             pass
 
-        # Axis + units snapshot
-        units = {}
-        for axis in crs.axis_info:
-            entry = {
-                "name": axis.name,
-                "abbrev": axis.abbrev,
-                "direction": axis.direction,
-                "unit_name": axis.unit_name,
-                "unit_conv_factor": axis.unit_conversion_factor,
+    # Prime meridian
+    try:
+        pm = getattr(geo, "prime_meridian", None)
+        if pm is not None:
+            info["prime_meridian"] = {
+                "name": getattr(pm, "name", None),
+                "longitude": getattr(pm, "longitude", None),
             }
-            units[axis.direction] = entry
-        info["axis"] = units
+    except Exception:
+        pass
 
-        return info
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    # Axis + units snapshot
+    units = {}
+    for axis in crs.axis_info:
+        entry = {
+            "name": axis.name,
+            "abbrev": axis.abbrev,
+            "direction": axis.direction,
+            "unit_name": axis.unit_name,
+            "unit_conv_factor": axis.unit_conversion_factor,
+        }
+        units[axis.direction] = entry
+    info["axis"] = units
+
+    return info
 
 
 @router.get("/units/{epsg_code}")
-async def get_units(epsg_code: str):
+@offload
+def get_units(epsg_code: str):
     try:
-        service = TransformationService()
-        crs = service._crs_from_input(epsg_code)
-        units = {}
-        for axis in crs.axis_info:
-            if axis.direction in ["east", "north"]:
-                units["horizontal"] = axis.unit_name
-                units["horizontal_factor"] = axis.unit_conversion_factor
-            elif axis.direction == "up":
-                units["vertical"] = axis.unit_name
-                units["vertical_factor"] = axis.unit_conversion_factor
+        units = CRS_METADATA_CACHE.get_or_build(_metadata_key("units", epsg_code), lambda: CRS_REGISTRY.get(epsg_code).units)
         return {"epsg_code": epsg_code, "units": units}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/search")
-async def search_crs(text: Optional[str] = None,
+@offload
+def search_crs(text: Optional[str] = None,
                      area_of_interest: Optional[str] = None,
-                     crs_type: Optional[str] = None):
-    try:
-        pj_types = None
-        if crs_type:
-            pj_types = [crs_type]
+                     crs_type: Optional[str] = None,
+                     limit: Optional[int] = Query(None, ge=1, le=1000),
+                     cursor: Optional[str] = None):
+    """Search EPSG CRS by name/alias tokens or code, area of interest and type.
 
+    Text results are ranked best first. With ``limit`` the response is one
+    page; ``X-Next-Cursor`` holds the cursor of the next one.
+    """
+    try:
         aoi = None
         if area_of_interest:
             # Expect "west,south,east,north"
             west, south, east, north = map(float, area_of_interest.split(","))
-            aoi = AreaOfInterest(west_lon_degree=west, south_lat_degree=south,
-                                 east_lon_degree=east, north_lat_degree=north)
-
-        results = query_crs_info(auth_name="EPSG", 
-                                 area_of_interest=aoi,
-                                 pj_types=pj_types,
-                                 search_term=text)
-        return [{"code": r.code, "name": r.name, "type": r.type_name} for r in results]
+            aoi = (west, south, east, north)
+
+        results, total, next_cursor = CRS_SEARCH_INDEX.page(
+            text=text, area_of_interest=aoi, crs_type=crs_type, limit=limit, cursor=cursor
+        )
+        headers = {"X-Total-Count": str(total)}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return Response(content=dumps(results), media_type="application/json", headers=headers)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/match")
-async def match_custom(body: CustomXmlBody):
+@offload
+def match_custom(body: CustomXmlBody):
     """Match a custom XML CRS definition to possible EPSG CRS candidates.
     Heuristic scoring based on UTM zone, projection method, datum and ellipsoid.
     """
@@ -194,72 +206,25 @@ async def match_custom(body: CustomXmlBody):
         except Exception:
             a = None
 
-        # Narrow candidate search
-        search_term = None
-        if is_utm and zone_num:
-            search_term = f"UTM zone {zone_num}"
-
-        infos = query_crs_info(auth_name="EPSG", pj_types=["PROJECTED_CRS"]) 
-        # Lightweight name-based prefilter to reduce CRS instantiations
-        name_l = lambda s: (s or '').lower()
-        if is_utm:
-            infos = [i for i in infos if 'utm' in name_l(i.name)]
-        if zone_num:
-            ztok = f"zone {zone_num}"
-            infos = [i for i in infos if ztok in name_l(i.name)] or infos
-
-        def score_epsg(info) -> Dict:
-            s = 0
-            details = {"code": info.code, "name": info.name}
+        # Definitions without a UTM zone are also scored on their projection parameters.
+        parameters = {}
+        for field in PARAMETER_FIELDS:
             try:
-                cand = CRS.from_epsg(info.code)
-                details["crs_name"] = cand.name
-                # Method and parameters
-                conv = cand.to_json_dict().get('conversion') or {}
-                method = (conv.get('method') or {}).get('name', '')
-                params = conv.get('parameters') or []
-                # UTM heuristic
-                name_lower = (info.name or '').lower()
-                if is_utm:
-                    if 'utm' in name_lower:
-                        s += 20
-                    if zone_num and f"zone {zone_num}" in name_lower:
-                        s += 50
-                    if hemi_south and 'south' in name_lower:
-                        s += 5
-                    if (not hemi_south) and 'north' in name_lower:
-                        s += 5
-                # Transverse Mercator
-                if 'Transverse Mercator' in method:
-                    s += 15
-
-                # Datum / ellipsoid names
-                geo = getattr(cand, 'geodetic_crs', None) or cand
-                cdn = getattr(getattr(cand, 'datum', None), 'name', '') or getattr(getattr(geo, 'datum', None), 'name', '') or ''
-                ell = getattr(geo, 'ellipsoid', None)
-                elln = getattr(ell, 'name', '') if ell else ''
-                if datum_name and datum_name.split()[0].lower() in cdn.lower():
-                    s += 20
-                if ell_name and ell_name.split()[0].lower() in elln.lower():
-                    s += 15
-                if a and hasattr(ell, 'semi_major_metre'):
-                    try:
-                        if abs(float(ell.semi_major_metre) - a) < 2.0:  # within 2 m
-                            s += 10
-                    except Exception:
-                        pass
-
-                details.update({
-                    "datum": cdn,
-                    "ellipsoid": elln,
-                    "method": method,
-                })
-            except Exception:
-                pass
-            return {"epsg_code": f"EPSG:{info.code}", "name": info.name, "score": s, "details": details}
-
-        ranked = [score_epsg(i) for i in infos]
-        ranked.sort(key=lambda x: x['score'], reverse=True)
+                value = float(z.attrib[field]) if z is not None and z.attrib.get(field) else None
+            except ValueError:
+                value = None
+            if value is not None and isfinite(value):
+                parameters[field] = value
+
+        ranked = PROJECTED_CRS_INDEX.match(
+            is_utm=is_utm,
+            zone=zone_num,
+            south=hemi_south,
+            datum_name=datum_name,
+            ellipsoid_name=ell_name,
+            semi_major=a,
+            parameters=parameters,
+        )
 
         return {
             "proj_string": proj_str,
@@ -273,7 +238,7 @@ async def match_custom(body: CustomXmlBody):
                 "system_id": system_id.strip() if isinstance(system_id, str) else system_id,
                 "system_name": system_name,
             },
-            "matches": ranked[:20],
+            "matches": ranked,
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -326,18 +291,20 @@ def _extract_projection_parameters(crs: CRS) -> Dict:
 
 
 @router.get("/parameters")
-async def crs_parameters(code: str):
+@offload
+def crs_parameters(code: str):
     try:
-        service = TransformationService()
-        crs = service._crs_from_input(code)
-        params = _extract_projection_parameters(crs)
-        return params
+        return CRS_METADATA_CACHE.get_or_build(
+            _metadata_key("parameters", code),
+            lambda: _extract_projection_parameters(TransformationService()._crs_from_input(code)),
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/parse-custom")
-async def parse_custom(body: CustomXmlBody):
+@offload
+def parse_custom(body: CustomXmlBody):
     try:
         parser = CustomCRSParser()
         proj = parser.parse_xml_to_proj(body.xml)
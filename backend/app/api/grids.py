@@ -6,6 +6,9 @@ from pyproj.datadir import get_data_dir
 import os
 import subprocess
 
+from app.services.grid_manifest import GRID_MANIFEST
+from app.services.transformer import OFFLINE_MODE, ensure_proj_network, invalidate_transform_caches
+
 router = APIRouter(prefix="/api/transform", tags=["transform"])
 
 
@@ -24,24 +27,14 @@ def _extract_grids(op_str: str) -> List[str]:
 
 
 def _grid_present(name: str) -> bool:
-    # Search PROJ data dirs for the basename
-    base = os.path.basename(name)
-    candidates = [os.environ.get("PROJ_DATA"), os.environ.get("PROJ_LIB"), get_data_dir()]
-    for d in candidates:
-        if not d:
-            continue
-        try:
-            for root, _, files in os.walk(d):
-                if base in files:
-                    return True
-        except Exception:
-            continue
-    return False
+    # Looked up in the indexed PROJ data dirs (refreshed when grids change).
+    return GRID_MANIFEST.present(name)
 
 
 @router.get("/required-grids")
 def required_grids(source_crs: str, target_crs: str) -> Dict:
     try:
+        ensure_proj_network()
         group = TransformerGroup(source_crs, target_crs, always_xy=True)
         out: List[Dict[str, Optional[str]]] = []
         for idx, tr in enumerate(group.transformers):
@@ -70,6 +63,12 @@ def required_grids(source_crs: str, target_crs: str) -> Dict:
         raise HTTPException(status_code=400, detail=str(exc))
 
 
+@router.get("/grid-manifest")
+def grid_manifest() -> Dict:
+    """Local grid index used by required-grids and, in offline mode, candidate selection."""
+    return {"offline": OFFLINE_MODE, **GRID_MANIFEST.stats()}
+
+
 @router.post("/prefetch-grids")
 def prefetch_grids(names: Dict[str, list]):
     """Try to download grids from PROJ CDN into PROJ_DATA using projsync.
@@ -100,4 +99,7 @@ def prefetch_grids(names: Dict[str, list]):
             errors.append({"name": g, "error": "projsync not available in backend image"})
         except Exception as exc:
             errors.append({"name": g, "error": str(exc)})
+    if downloaded:
+        # New grids change which TransformerGroup paths are usable.
+        invalidate_transform_caches()
     return {"dest": dest, "downloaded": downloaded, "errors": errors}
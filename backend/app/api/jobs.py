@@ -0,0 +1,114 @@
+import os
+from typing import Any, Dict, Iterator, Literal
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, ValidationError
+
+from app.api.transform import (
+    LocalTrajectoryRequest,
+    TrajectoryRequest,
+    local_trajectory_chunks,
+    trajectory_chunks,
+)
+from app.services.jobs import JobChunk, JobManager, job_store_from_env
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+class JobRequest(BaseModel):
+    kind: Literal['trajectory', 'local-trajectory']
+    # Same body as POST /api/transform/<kind>
+    payload: Dict[str, Any]
+
+
+def _trajectory_chunks(payload: Dict[str, Any], chunk_size: int) -> Iterator[JobChunk]:
+    return trajectory_chunks(TrajectoryRequest(**payload), chunk_size)
+
+
+def _local_trajectory_chunks(payload: Dict[str, Any], chunk_size: int) -> Iterator[JobChunk]:
+    return local_trajectory_chunks(LocalTrajectoryRequest(**payload), chunk_size)
+
+
+_VALIDATORS = {"trajectory": TrajectoryRequest, "local-trajectory": LocalTrajectoryRequest}
+
+JOB_MANAGER = JobManager(
+    job_store_from_env,  # connects on first use
+    {"trajectory": _trajectory_chunks, "local-trajectory": _local_trajectory_chunks},
+    workers=int(os.getenv("JOBS_WORKERS", "1")),
+    chunk_size=int(os.getenv("JOBS_CHUNK_SIZE", "5000")),
+    ttl=int(os.getenv("JOBS_TTL_SECONDS", "3600")),
+    lease=float(os.getenv("JOBS_LEASE_SECONDS", "60")),
+)
+
+
+def _progress(job: Dict) -> Dict:
+    done = job["progress"]["done"]
+    total = job["progress"]["total"]
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "done": done,
+        "total": total,
+        "fraction": (done / total) if total else (1.0 if job["status"] == "succeeded" else 0.0),
+        "chunks": job["chunks"],
+    }
+
+
+def _job_or_404(job_id: str) -> Dict:
+    job = JOB_MANAGER.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@router.post("")
+def submit_job(request: JobRequest):
+    try:
+        _VALIDATORS[request.kind](**request.payload)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    try:
+        job = JOB_MANAGER.submit(request.kind, request.payload)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"job_id": job["job_id"], "kind": job["kind"], "status": job["status"]}
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    return _job_or_404(job_id)
+
+
+@router.get("/{job_id}/progress")
+def get_job_progress(job_id: str):
+    return _progress(_job_or_404(job_id))
+
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str, chunk: int = 0):
+    job = _job_or_404(job_id)
+    if chunk < 0 or chunk >= job["chunks"]:
+        if job["status"] in ("queued", "running"):
+            raise HTTPException(status_code=409, detail=f"Chunk {chunk} not ready (job {job['status']})")
+        raise HTTPException(status_code=404, detail=f"Chunk {chunk} out of range (job has {job['chunks']})")
+    data = JOB_MANAGER.chunk(job_id, chunk)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"Chunk {chunk} expired")
+    producing = job["status"] in ("queued", "running")
+    has_next = chunk + 1 < job["chunks"] or producing
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "chunk": chunk,
+        "chunks": job["chunks"],
+        "next_chunk": chunk + 1 if has_next else None,
+        "summary": job["summary"],
+        **data,
+    }
+
+
+@router.delete("/{job_id}")
+def delete_job(job_id: str):
+    _job_or_404(job_id)
+    JOB_MANAGER.delete(job_id)
+    return {"job_id": job_id, "deleted": True}
@@ -1,12 +1,46 @@
+import hmac
 import math
+import os
+import time
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Body, Header, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Literal
-from pyproj import CRS, Transformer, Geod
-
-from app.services.transformer import TransformationService
+from typing import Dict, Iterator, List, Literal, Optional, Tuple, Union
+from pyproj import Transformer, Geod
+import numpy as np
+
+from app.services.transformer import (
+    TransformationService,
+    TRANSFORMER_CACHE,
+    CRS_REGISTRY,
+    CHAIN_CACHE,
+    PATH_CATALOG,
+    VIA_SUGGESTION_CACHE,
+    LOCAL_OFFSET_TRANSFORMERS,
+    LOCAL_OFFSET_CONTEXTS,
+    TRANSFORMER_BUILDS,
+    CRS_METADATA_CACHE,
+    invalidate_transform_caches,
+)
 from app.services.crs_parser import CustomCRSParser
+from app.services.crs_index import CRS_SEARCH_INDEX, PROJECTED_CRS_INDEX
+from app.services.executor import offload
+from app.services.binary_columns import (
+    RAW_MEDIA_TYPE,
+    UnsupportedMediaType,
+    decode_columns,
+    flatten_columns,
+    require_columns,
+    response_media_type,
+)
+from app.services.serialization import (
+    STREAM_CHUNK_SIZE,
+    STREAM_LAYOUTS,
+    binary_response,
+    negotiate_layout,
+    streaming_response,
+    timed_response,
+)
 
 router = APIRouter(prefix="/api/transform", tags=["transform"])
 
@@ -21,10 +55,27 @@ class TransformRequest(BaseModel):
     preferred_ops: Optional[List[str]] = None
 
 
+class DirectBatchRequest(BaseModel):
+    source_crs: str
+    target_crs: str
+    x: List[float]
+    y: List[float]
+    z: Optional[List[float]] = None
+    path_id: Optional[int] = None
+    preferred_ops: Optional[List[str]] = None
+
+
 class TrajectoryRequest(BaseModel):
     source_crs: str
     target_crs: str
-    trajectory_points: List[Dict]
+    trajectory_points: List[Dict] = []
+    # Columnar alternative to trajectory_points (x/y required together)
+    x: Optional[List[float]] = None
+    y: Optional[List[float]] = None
+    z: Optional[List[float]] = None
+    ids: Optional[List[Union[str, int]]] = None
+    # "columnar" returns x/y/z arrays and does not echo the input points
+    output: Literal['records', 'columnar'] = 'records'
 
 
 class ViaRequest(BaseModel):
@@ -36,6 +87,15 @@ class ViaRequest(BaseModel):
     segment_preferred_ops: Optional[List[Optional[List[str]]]] = None
 
 
+class ViaBatchRequest(BaseModel):
+    path: List[str]
+    x: List[float]
+    y: List[float]
+    z: Optional[List[float]] = None
+    segment_path_ids: Optional[List[Optional[int]]] = None
+    segment_preferred_ops: Optional[List[Optional[List[str]]]] = None
+
+
 class CustomTransformRequest(BaseModel):
     custom_definition_xml: str
     source_crs: str
@@ -79,7 +139,8 @@ class LocalTrajectoryRequest(BaseModel):
 
 
 @router.post("/direct")
-async def transform_direct(request: TransformRequest):
+@offload
+def transform_direct(request: TransformRequest):
     try:
         service = TransformationService()
 
@@ -113,6 +174,10 @@ async def transform_direct(request: TransformRequest):
             },
             "transformation_accuracy": result["accuracy"],
         }
+        if result.get("step_accuracies") is not None:
+            response["step_accuracies"] = result["step_accuracies"]
+        if "skipped_paths" in result:
+            response["skipped_paths"] = result["skipped_paths"]
 
         if target_crs.is_projected:
             # For convergence/scale factor, inputs should be geographic lon/lat
@@ -150,34 +215,253 @@ async def transform_direct(request: TransformRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _column(values: Optional[np.ndarray]) -> Optional[List[Optional[float]]]:
+    """Array to JSON-safe list; non-finite entries become null."""
+    if values is None:
+        return None
+    out = values.astype(object)
+    out[~np.isfinite(values)] = None
+    return out.tolist()
+
+
+def _path_id_column(values: Optional[np.ndarray]) -> Optional[List[Optional[int]]]:
+    """Per-point path ids to a JSON list; -1 (failed or non-group fallback) becomes null."""
+    if values is None:
+        return None
+    return [None if v < 0 else v for v in values.tolist()]
+
+
+@router.post("/direct-batch")
+@offload
+def transform_direct_batch(request: DirectBatchRequest):
+    if not request.x:
+        raise HTTPException(status_code=400, detail="Coordinate arrays cannot be empty")
+
+    try:
+        service = TransformationService()
+        result = service.transform_points(
+            request.source_crs,
+            request.target_crs,
+            np.asarray(request.x, dtype=float),
+            np.asarray(request.y, dtype=float),
+            np.asarray(request.z, dtype=float) if request.z is not None else None,
+            path_id=request.path_id,
+            preferred_ops=request.preferred_ops,
+        )
+        response = {
+            "x": _column(result["x"]),
+            "y": _column(result["y"]),
+            "z": _column(result["z"]),
+            "count": len(result["x"]),
+            "failed_indices": result["failed"].tolist(),
+            "units_used": {
+                "source": result["units_source"],
+                "target": result["units_target"],
+            },
+            "transformation_accuracy": result["accuracy"],
+            "step_accuracies": result["step_accuracies"],
+            "path_ids": _path_id_column(result["point_path_ids"]),
+            "path_counts": result["path_counts"],
+        }
+        if result["skipped_paths"] is not None:
+            response["skipped_paths"] = result["skipped_paths"]
+        return response
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/trajectory")
-async def transform_trajectory(request: TrajectoryRequest):
+@offload
+def transform_trajectory(
+    request: TrajectoryRequest,
+    accept: Optional[str] = Header(None),
+    format: Optional[str] = Query(
+        None, description="json (default), records, columnar, ndjson or ndjson-columnar"
+    ),
+    chunk_size: Optional[int] = Query(None, ge=1, description="Points per chunk when streaming"),
+):
+    try:
+        layout = negotiate_layout(accept, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if layout in STREAM_LAYOUTS:
+        size = chunk_size or STREAM_CHUNK_SIZE
+        if layout == "ndjson":
+            # One line per point: always the record shape.
+            request = request.model_copy(update={"output": "records"})
+        chunks = trajectory_chunks(request, size, "columnar" if layout == "ndjson-columnar" else "records")
+        try:
+            return streaming_response(chunks, layout, size)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    started = time.perf_counter()
+    payload = trajectory_result(request, layout)
+    return timed_response(payload, layout, time.perf_counter() - started)
+
+
+@router.post("/trajectory/binary")
+@offload
+def transform_trajectory_binary(
+    source_crs: str,
+    target_crs: str,
+    body: bytes = Body(..., media_type=RAW_MEDIA_TYPE),
+    content_type: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+):
+    """x/y(/z) float64 columns in, transformed x/y(/z) columns out.
+
+    Bodies are an EPJC column container, ``.npy`` (structured, or (N, k) in
+    x, y, z order) or Arrow IPC; the response uses the ``Accept`` format, else
+    the request's.
+    """
+    try:
+        kind = response_media_type(accept, content_type)
+    except UnsupportedMediaType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    started = time.perf_counter()
     try:
+        raw, _ = decode_columns(body, content_type, ("x", "y", "z"))
+        columns = require_columns(raw, ("x", "y"), ("z",))
         service = TransformationService()
-        transformed = service.transform_trajectory(
-            request.source_crs, request.target_crs, request.trajectory_points
+        x_out, y_out, z_out = service.transform_trajectory_arrays(
+            source_crs, target_crs, columns["x"], columns["y"], columns.get("z")
         )
+        out = {"x": x_out, "y": y_out}
+        if z_out is not None:
+            out["z"] = z_out
+        meta = {
+            "source_crs": source_crs,
+            "target_crs": target_crs,
+            "count": len(x_out),
+            "units_used": {
+                "source": CRS_REGISTRY.get(source_crs).units,
+                "target": CRS_REGISTRY.get(target_crs).units,
+            },
+            "transformation_accuracy": service.get_transformer(source_crs, target_crs).accuracy,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return binary_response(out, kind, meta, time.perf_counter() - started)
 
-        source_crs = service._crs_from_input(request.source_crs)
-        target_crs = service._crs_from_input(request.target_crs)
 
-        return {
-            "transformed_trajectory": transformed,
+def trajectory_result(request: TrajectoryRequest, layout: str = "json") -> Dict:
+    """Body of /trajectory as a dict; the ``columnar`` layout implies ``output="columnar"``.
+
+    Outside the default ``json`` layout the columns stay NumPy arrays for the
+    fast encoder.
+    """
+    try:
+        service = TransformationService()
+        if request.x is not None or request.y is not None:
+            if request.x is None or request.y is None:
+                raise ValueError("Columnar input requires both x and y")
+            if not request.x:
+                raise ValueError("Trajectory points list cannot be empty")
+            ids = request.ids or list(range(len(request.x)))
+            if len(ids) != len(request.x):
+                raise ValueError("ids must have the same length as x")
+            xs = np.asarray(request.x, dtype=float)
+            ys = np.asarray(request.y, dtype=float)
+            zs = np.asarray(request.z, dtype=float) if request.z is not None else None
+            originals = None
+        else:
+            ids, xs, ys, zs = service.trajectory_columns(request.trajectory_points)
+            originals = request.trajectory_points
+
+        x_out, y_out, z_out = service.transform_trajectory_arrays(
+            request.source_crs, request.target_crs, xs, ys, zs
+        )
+
+        if request.output == 'columnar' or layout == 'columnar':
+            column = _column if layout == "json" else (lambda values: values)
+            payload = {
+                "transformed_columns": {
+                    "ids": ids,
+                    "x": column(x_out),
+                    "y": column(y_out),
+                    "z": column(z_out),
+                }
+            }
+        else:
+            payload = {
+                "transformed_trajectory": service.trajectory_records(
+                    ids, x_out, y_out, z_out, originals=originals
+                )
+            }
+
+        response = {
+            **payload,
             "units_used": {
-                "source": service._get_units(source_crs),
-                "target": service._get_units(target_crs),
+                "source": CRS_REGISTRY.get(request.source_crs).units,
+                "target": CRS_REGISTRY.get(request.target_crs).units,
             },
             "transformation_accuracy": service.get_transformer(
                 request.source_crs, request.target_crs
             ).accuracy,
         }
+        skipped = service.skipped_paths(request.source_crs, request.target_crs)
+        if skipped is not None:
+            response["skipped_paths"] = skipped
+        return response
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def trajectory_chunks(request: TrajectoryRequest, chunk_size: int, layout: str = "json") -> Iterator[Tuple[Dict, Dict, int, int]]:
+    """/trajectory in slices of ``chunk_size`` points.
+
+    Yields ``(data, summary, done, total)``: ``data`` holds the slice's
+    ``transformed_trajectory`` or ``transformed_columns``, ``summary`` the
+    remaining response fields. Ids default to positions in the full request.
+    """
+    columnar_input = request.x is not None or request.y is not None
+    if columnar_input:
+        if request.x is None or request.y is None:
+            raise ValueError("Columnar input requires both x and y")
+        total = len(request.x)
+        ids = request.ids or list(range(total))
+    else:
+        total = len(request.trajectory_points)
+    if total == 0:
+        raise ValueError("Trajectory points list cannot be empty")
+
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        if columnar_input:
+            part = request.model_copy(
+                update={
+                    "x": request.x[start:stop],
+                    "y": request.y[start:stop],
+                    "z": request.z[start:stop] if request.z is not None else None,
+                    "ids": ids[start:stop],
+                }
+            )
+        else:
+            part = request.model_copy(update={"trajectory_points": request.trajectory_points[start:stop]})
+        response = trajectory_result(part, layout)
+        key = "transformed_columns" if "transformed_columns" in response else "transformed_trajectory"
+        data = response.pop(key)
+        if not columnar_input:
+            # Points without an id default to their position in the full request.
+            if key == "transformed_trajectory":
+                for offset, record in enumerate(data):
+                    if "id" not in record["original"]:
+                        record["id"] = start + offset
+            else:
+                data["ids"] = [
+                    point.get("id", start + offset)
+                    for offset, point in enumerate(request.trajectory_points[start:stop])
+                ]
+        yield {key: data}, response, stop, total
+
+
 @router.get("/accuracy")
-async def get_transformation_accuracy(source_crs: str, target_crs: str):
+@offload
+def get_transformation_accuracy(source_crs: str, target_crs: str):
     try:
         service = TransformationService()
         transformer = service.get_transformer(source_crs, target_crs)
@@ -195,8 +479,44 @@ async def get_transformation_accuracy(source_crs: str, target_crs: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters for the process-wide transformer, CRS and metadata caches."""
+    return {
+        "transformers": TRANSFORMER_CACHE.stats(),
+        "crs": CRS_REGISTRY.stats(),
+        "chains": CHAIN_CACHE.stats(),
+        "paths": PATH_CATALOG.stats(),
+        "via_suggestions": VIA_SUGGESTION_CACHE.stats(),
+        "local_offset_transformers": LOCAL_OFFSET_TRANSFORMERS.stats(),
+        "local_offset_contexts": LOCAL_OFFSET_CONTEXTS.stats(),
+        "builds": TRANSFORMER_BUILDS.stats(),
+        "crs_metadata": CRS_METADATA_CACHE.stats(),
+        "projected_crs_index": PROJECTED_CRS_INDEX.stats(),
+        "crs_search_index": CRS_SEARCH_INDEX.stats(),
+    }
+
+
+@router.post("/cache/invalidate")
+async def invalidate_cache(x_admin_token: Optional[str] = Header(None)):
+    """Drop cached transformers and path enumerations after PROJ data or grids change.
+
+    Disabled (404) unless CACHE_ADMIN_TOKEN is set; callers must then send it
+    as ``X-Admin-Token``. Forcing cold PROJ rebuilds is expensive, so this is
+    not open to every client. /prefetch-grids already invalidates on its own.
+    """
+    token = os.getenv("CACHE_ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    invalidate_transform_caches()
+    return {"invalidated": True, "generation": PATH_CATALOG.generation}
+
+
 @router.get("/available-paths")
-async def get_available_paths(source_crs: str, target_crs: str):
+@offload
+def get_available_paths(source_crs: str, target_crs: str):
     try:
         service = TransformationService()
         paths = service.get_all_transformation_paths(source_crs, target_crs)
@@ -213,7 +533,8 @@ async def get_available_paths(source_crs: str, target_crs: str):
 
 
 @router.get("/available-paths-via")
-async def get_available_paths_via(source_crs: str, via_crs: str, target_crs: str):
+@offload
+def get_available_paths_via(source_crs: str, via_crs: str, target_crs: str):
     """List available TransformerGroup paths for source→via and via→target."""
     try:
         service = TransformationService()
@@ -231,67 +552,28 @@ async def get_available_paths_via(source_crs: str, via_crs: str, target_crs: str
 
 
 @router.get("/suggest-vias")
-async def suggest_vias(source_crs: str, target_crs: str):
+@offload
+def suggest_vias(source_crs: str, target_crs: str):
     """Return a small, validated set of suggested via CRS codes between source and target.
 
     Strategy:
     - Include geodetic CRS (and 3D variants) for source and target if resolvable.
     - Include global pivots commonly useful for pipelines: EPSG:4326, EPSG:4978, EPSG:4979.
     - Validate that both source→candidate and candidate→target have at least one transformer.
+
+    Legs are checked concurrently and the list is cached per (source, target).
     """
     try:
         service = TransformationService()
-        suggestions = []
-        seen = set()
-
-        def add(code: str, reason: str):
-            key = code.strip()
-            if not key or key in seen:
-                return
-            # Validate there exists a path in both legs
-            try:
-                leg1 = service.get_all_transformation_paths(source_crs, key)
-                leg2 = service.get_all_transformation_paths(key, target_crs)
-            except Exception:
-                return
-            if not leg1 or not leg2:
-                return
-            suggestions.append({"code": key, "reason": reason})
-            seen.add(key)
-
-        # Geodetic CRS of source/target
-        try:
-            src = service._crs_from_input(source_crs)
-            src_geo = getattr(src, "geodetic_crs", None) or src
-            add(src_geo.to_string(), "source geodetic")
-            try:
-                add(src_geo.to_3d().to_string(), "source geodetic 3D")
-            except Exception:
-                pass
-        except Exception:
-            pass
-        try:
-            tgt = service._crs_from_input(target_crs)
-            tgt_geo = getattr(tgt, "geodetic_crs", None) or tgt
-            add(tgt_geo.to_string(), "target geodetic")
-            try:
-                add(tgt_geo.to_3d().to_string(), "target geodetic 3D")
-            except Exception:
-                pass
-        except Exception:
-            pass
-
-        # Common pivots
-        for code, reason in [("EPSG:4326", "WGS 84"), ("EPSG:4979", "WGS 84 3D"), ("EPSG:4978", "ECEF")]:
-            add(code, reason)
-
+        suggestions = service.suggest_vias(source_crs, target_crs)
         return {"source_crs": source_crs, "target_crs": target_crs, "suggestions": suggestions}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/via")
-async def transform_via(request: ViaRequest):
+@offload
+def transform_via(request: ViaRequest):
     try:
         service = TransformationService()
         x = request.position.get("x") or request.position.get("lon")
@@ -302,6 +584,7 @@ async def transform_via(request: ViaRequest):
         acc_known = True
 
         cur_x, cur_y, cur_z = x, y, z
+        skipped: Optional[List[Dict]] = None
         seg_ids = request.segment_path_ids or []
         seg_ops = request.segment_preferred_ops or []
 
@@ -329,19 +612,56 @@ async def transform_via(request: ViaRequest):
                 acc_known = False
             else:
                 total_accuracy += float(out["accuracy"])  # naive aggregation
+            if "skipped_paths" in out:
+                skipped = (skipped or []) + out["skipped_paths"]
 
-        return {
+        response = {
             "x": cur_x,
             "y": cur_y,
             "z": cur_z,
             "cumulative_accuracy": None if not acc_known else total_accuracy,
         }
+        if skipped is not None:
+            response["skipped_paths"] = skipped
+        return response
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/via-batch")
+@offload
+def transform_via_batch(request: ViaBatchRequest):
+    if not request.x:
+        raise HTTPException(status_code=400, detail="Coordinate arrays cannot be empty")
+    if len(request.x) != len(request.y) or (request.z is not None and len(request.z) != len(request.x)):
+        raise HTTPException(status_code=400, detail="Coordinate arrays must have the same length")
+
+    try:
+        service = TransformationService()
+        result = service.transform_points_via(
+            request.path,
+            np.asarray(request.x, dtype=float),
+            np.asarray(request.y, dtype=float),
+            np.asarray(request.z, dtype=float) if request.z is not None else None,
+            segment_path_ids=request.segment_path_ids,
+            segment_preferred_ops=request.segment_preferred_ops,
+        )
+        return {
+            "x": _column(result["x"]),
+            "y": _column(result["y"]),
+            "z": _column(result["z"]),
+            "count": len(result["x"]),
+            "failed_indices": result["failed"].tolist(),
+            "legs": result["legs"],
+            "cumulative_accuracy": result["cumulative_accuracy"],
+        }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/custom")
-async def transform_custom(request: CustomTransformRequest):
+@offload
+def transform_custom(request: CustomTransformRequest):
     try:
         parser = CustomCRSParser()
         proj_str = parser.parse_xml_to_proj(request.custom_definition_xml)
@@ -358,42 +678,45 @@ async def transform_custom(request: CustomTransformRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _geo_to_wgs(context: Dict) -> Transformer:
+    """The context's shared geodetic to WGS 84 transformer (never rebuilt per request)."""
+    geo_to_wgs = context["geo_to_wgs"]
+    if geo_to_wgs is None:
+        raise ValueError(f"No transformation from {context['geodetic'].name} to WGS 84")
+    return geo_to_wgs
+
+
 @router.post("/local-offset")
-async def transform_local_offset(request: LocalOffsetRequest):
+@offload
+def transform_local_offset(request: LocalOffsetRequest):
     try:
         service = TransformationService()
-        crs = service._crs_from_input(request.crs)
-        geodetic = getattr(crs, "geodetic_crs", None) or crs
-        geodetic3d = geodetic
-        try:
-            geodetic3d = geodetic.to_3d()
-        except Exception:
-            pass
-
         ref_lon = request.reference.lon
         ref_lat = request.reference.lat
         ref_h = request.reference.height or 0.0
 
-        transformer_proj_to_geo = Transformer.from_crs(crs, geodetic3d, always_xy=True)
-
         if ref_lon is None or ref_lat is None:
             if request.reference.x is None or request.reference.y is None:
                 raise HTTPException(status_code=400, detail="Reference must include lon/lat or x/y")
-            ref_lon, ref_lat, ref_h = transformer_proj_to_geo.transform(
+            ref_lon, ref_lat, ref_h = service.local_reference_geodetic(
+                request.crs,
                 request.reference.x,
                 request.reference.y,
                 ref_h,
             )
 
+        # Cached per reference: transformers, origin ECEF, scales and reference projections.
         context = service.build_local_offset_context(request.crs, ref_lon, ref_lat, ref_h)
-        units_info = service._get_units(crs)
+        crs = context["crs"]
+        transformer_proj_to_geo = context["proj_to_geo"]
+        units_info = CRS_REGISTRY.get(request.crs).units
         horizontal_factor = units_info.get("horizontal_factor") or 1.0
         meter_to_axis = 1.0 / horizontal_factor if horizontal_factor else 1.0
 
         if request.reference.x is not None and request.reference.y is not None:
             base_projected = {"x": request.reference.x, "y": request.reference.y}
         else:
-            proj_coords = context["geo_to_target"].transform(ref_lon, ref_lat, ref_h)
+            proj_coords = context["reference_projected"]
             base_projected = {"x": proj_coords[0], "y": proj_coords[1]}
 
         precise = service.local_offset_via_ecef(
@@ -410,7 +733,9 @@ async def transform_local_offset(request: LocalOffsetRequest):
         scales = None
         scale_result = None
         try:
-            scales = service.calculate_scale_factor(request.crs, ref_lon, ref_lat)
+            if context["scales"] is None:
+                raise ValueError("Scale factor only applies to projected CRS")
+            scales = dict(context["scales"])
             meridional = scales.get("meridional_scale")
             parallel = scales.get("parallel_scale")
             if meridional is not None and parallel is not None:
@@ -425,8 +750,7 @@ async def transform_local_offset(request: LocalOffsetRequest):
                     new_y,
                     ref_h + (request.offset.up or 0.0),
                 )
-                geo_to_wgs = context.get("geo_to_wgs") or Transformer.from_crs(geodetic3d, CRS.from_epsg(4979), always_xy=True)
-                scale_wgs = geo_to_wgs.transform(lon_scale, lat_scale, h_scale)
+                scale_wgs = _geo_to_wgs(context).transform(lon_scale, lat_scale, h_scale)
                 scale_result = {
                     "projected": {"x": new_x, "y": new_y},
                     "geodetic": {"lon": lon_scale, "lat": lat_scale, "height": h_scale},
@@ -440,21 +764,11 @@ async def transform_local_offset(request: LocalOffsetRequest):
         except Exception:
             scale_result = None
 
-        precise_wgs = precise.get("wgs84")
-        if precise_wgs is None:
-            geo_to_wgs = context.get("geo_to_wgs") or Transformer.from_crs(geodetic3d, CRS.from_epsg(4979), always_xy=True)
-            try:
-                wgs = geo_to_wgs.transform(
-                    precise["geodetic"]["lon"],
-                    precise["geodetic"]["lat"],
-                    precise["geodetic"].get("height", ref_h),
-                )
-                precise["wgs84"] = {"lon": wgs[0], "lat": wgs[1], "height": wgs[2]}
-            except Exception:
-                pass
-
-        geo_to_wgs = context.get("geo_to_wgs") or Transformer.from_crs(geodetic3d, CRS.from_epsg(4979), always_xy=True)
-        reference_wgs = geo_to_wgs.transform(ref_lon, ref_lat, ref_h)
+        # local_offset_via_ecef already tried the context's WGS 84 transformer;
+        # when it failed there "wgs84" is left out of the ECEF result.
+        reference_wgs = context["reference_wgs84"]
+        if reference_wgs is None:
+            reference_wgs = _geo_to_wgs(context).transform(ref_lon, ref_lat, ref_h)
 
         difference = None
         if precise and scale_result:
@@ -498,46 +812,121 @@ async def transform_local_offset(request: LocalOffsetRequest):
 
 
 @router.post("/local-trajectory")
-async def transform_local_trajectory(request: LocalTrajectoryRequest):
-    if not request.points:
+@offload
+def transform_local_trajectory(
+    request: LocalTrajectoryRequest,
+    accept: Optional[str] = Header(None),
+    format: Optional[str] = Query(
+        None, description="json (default), records, columnar, ndjson or ndjson-columnar"
+    ),
+    chunk_size: Optional[int] = Query(None, ge=1, description="Points per chunk when streaming"),
+):
+    try:
+        layout = negotiate_layout(accept, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if layout in STREAM_LAYOUTS:
+        size = chunk_size or STREAM_CHUNK_SIZE
+        chunks = local_trajectory_chunks(request, size, "columnar" if layout == "ndjson-columnar" else "records")
+        try:
+            return streaming_response(chunks, layout, size)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    started = time.perf_counter()
+    payload = local_trajectory_result(request, layout)
+    return timed_response(payload, layout, time.perf_counter() - started)
+
+
+@router.post("/local-trajectory/binary")
+@offload
+def transform_local_trajectory_binary(
+    crs: str,
+    mode: Literal['ecef', 'scale', 'both'] = 'both',
+    ref_lon: Optional[float] = None,
+    ref_lat: Optional[float] = None,
+    ref_x: Optional[float] = None,
+    ref_y: Optional[float] = None,
+    ref_height: float = 0.0,
+    body: bytes = Body(..., media_type=RAW_MEDIA_TYPE),
+    content_type: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+):
+    """east/north(/tvd/md) float64 columns in, the columnar /local-trajectory result out.
+
+    Output columns carry dotted names (``ecef.projected.x``, ...); the
+    reference and per-trajectory constants travel as metadata.
+    """
+    try:
+        kind = response_media_type(accept, content_type)
+    except UnsupportedMediaType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    started = time.perf_counter()
+    try:
+        raw, _ = decode_columns(body, content_type, ("east", "north", "tvd", "md"))
+        offsets = require_columns(raw, ("east", "north"), ("tvd", "md"))
+        request = LocalTrajectoryRequest(
+            crs=crs,
+            reference=ReferencePosition(lon=ref_lon, lat=ref_lat, x=ref_x, y=ref_y, height=ref_height),
+            points=[],
+            mode=mode,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = local_trajectory_result(request, offsets=offsets)
+    columns, constants = flatten_columns(result.pop("points"))
+    columns.pop("index", None)
+    result.pop("layout", None)
+    return binary_response(columns, kind, {**result, "constants": constants}, time.perf_counter() - started)
+
+
+def local_trajectory_result(
+    request: LocalTrajectoryRequest,
+    layout: str = "json",
+    offsets: Optional[Dict[str, np.ndarray]] = None,
+) -> Dict:
+    """Body of /local-trajectory as a dict.
+
+    One entry per point, except for the ``columnar`` layout, which gives the
+    same fields as NumPy arrays under ``points`` (values shared by every point
+    stay scalars). ``offsets`` (``east``/``north`` and optional ``tvd``/``md``
+    arrays) replaces ``request.points`` and implies the columnar layout.
+    """
+    if offsets is not None:
+        layout = "columnar"
+    elif not request.points:
         raise HTTPException(status_code=400, detail="Trajectory points list cannot be empty")
 
     try:
         service = TransformationService()
-        crs = service._crs_from_input(request.crs)
-        geodetic = getattr(crs, "geodetic_crs", None) or crs
-        geodetic3d = geodetic
-        try:
-            geodetic3d = geodetic.to_3d()
-        except Exception:
-            pass
-
         ref_lon = request.reference.lon
         ref_lat = request.reference.lat
         ref_h = request.reference.height or 0.0
 
-        transformer_proj_to_geo = Transformer.from_crs(crs, geodetic3d, always_xy=True)
-
         if ref_lon is None or ref_lat is None:
             if request.reference.x is None or request.reference.y is None:
                 raise HTTPException(status_code=400, detail="Reference must include lon/lat or x/y")
-            ref_lon, ref_lat, ref_h = transformer_proj_to_geo.transform(
+            ref_lon, ref_lat, ref_h = service.local_reference_geodetic(
+                request.crs,
                 request.reference.x,
                 request.reference.y,
                 ref_h,
             )
 
+        # Cached per reference: transformers, origin ECEF, scales and reference projections.
         context = service.build_local_offset_context(request.crs, ref_lon, ref_lat, ref_h)
-        geo_to_target = context["geo_to_target"]
-        geo_to_wgs = context.get("geo_to_wgs") or Transformer.from_crs(geodetic3d, CRS.from_epsg(4979), always_xy=True)
-        units_info = service._get_units(crs)
+        crs = context["crs"]
+        transformer_proj_to_geo = context["proj_to_geo"]
+        geo_to_wgs = _geo_to_wgs(context)
+        units_info = CRS_REGISTRY.get(request.crs).units
         horizontal_factor = units_info.get("horizontal_factor") or 1.0
         meter_to_axis = 1.0 / horizontal_factor if horizontal_factor else 1.0
 
         if request.reference.x is not None and request.reference.y is not None:
             base_projected = {"x": request.reference.x, "y": request.reference.y}
         else:
-            proj_coords = geo_to_target.transform(ref_lon, ref_lat, ref_h)
+            proj_coords = context["reference_projected"]
             base_projected = {"x": proj_coords[0], "y": proj_coords[1]}
 
         mode = request.mode
@@ -545,108 +934,136 @@ async def transform_local_trajectory(request: LocalTrajectoryRequest):
         include_scale = mode in ("scale", "both")
 
         scales = None
-        if include_scale and crs.is_projected:
-            try:
-                scales = service.calculate_scale_factor(request.crs, ref_lon, ref_lat)
-            except Exception:
-                scales = None
+        if include_scale and context["scales"] is not None:
+            scales = dict(context["scales"])
 
         geod = Geod(ellps='WGS84')
 
-        points_out: List[Dict] = []
-        for idx, pt in enumerate(request.points):
-            up = -(pt.tvd or 0.0)
-            entry: Dict[str, Dict] = {
-                "index": idx,
-                "name": pt.name,
-                "md": pt.md,
-                "tvd": pt.tvd,
-                "offset": {
-                    "east": pt.east,
-                    "north": pt.north,
-                    "up": up,
-                },
-            }
+        if offsets is not None:
+            east = offsets["east"]
+            north = offsets["north"]
+            count = len(east)
+            tvd = offsets.get("tvd")
+            up = -np.nan_to_num(tvd, nan=0.0) if tvd is not None else np.zeros(count)
+        else:
+            count = len(request.points)
+            east = np.fromiter((pt.east for pt in request.points), dtype=float, count=count)
+            north = np.fromiter((pt.north for pt in request.points), dtype=float, count=count)
+            up = -np.fromiter((pt.tvd or 0.0 for pt in request.points), dtype=float, count=count)
+
+        ecef_results: Optional[List[Dict]] = None
+        ecef_cols: Optional[Dict[str, np.ndarray]] = None
+        if include_ecef:
+            ecef_cols = service.local_offsets_via_ecef_arrays(
+                context, np.column_stack([east, north, up])
+            )
+            if layout != "columnar":
+                ecef_results = service.ecef_results(ecef_cols)
 
-            ecef_res = None
-            if include_ecef:
-                ecef_res = service.local_offset_via_ecef(
-                    request.crs,
-                    ref_lon,
-                    ref_lat,
-                    ref_h,
-                    pt.east,
-                    pt.north,
-                    up,
-                    context=context,
+        scale_results: Optional[List[Dict]] = None
+        scale_cols: Optional[Dict[str, np.ndarray]] = None
+        if include_scale and scales is not None:
+            meridional = scales.get("meridional_scale")
+            parallel = scales.get("parallel_scale")
+            if meridional is not None and parallel is not None:
+                new_x = base_projected["x"] + east * parallel * meter_to_axis
+                new_y = base_projected["y"] + north * meridional * meter_to_axis
+                lon_scale, lat_scale, h_scale = service.transform_columns(
+                    transformer_proj_to_geo,
+                    new_x,
+                    new_y,
+                    ref_h + up,
                 )
-                entry["ecef"] = ecef_res
-
-            scale_res = None
-            if include_scale and scales is not None:
-                meridional = scales.get("meridional_scale")
-                parallel = scales.get("parallel_scale")
-                if meridional is not None and parallel is not None:
-                    grid_east_m = pt.east * parallel
-                    grid_north_m = pt.north * meridional
-                    dx = grid_east_m * meter_to_axis
-                    dy = grid_north_m * meter_to_axis
-                    new_x = base_projected["x"] + dx
-                    new_y = base_projected["y"] + dy
-                    lon_scale, lat_scale, h_scale = transformer_proj_to_geo.transform(
-                        new_x,
-                        new_y,
-                        ref_h + up,
-                    )
-                    wgs_scale = geo_to_wgs.transform(lon_scale, lat_scale, h_scale)
-                    scale_res = {
-                        "projected": {"x": new_x, "y": new_y},
-                        "geodetic": {"lon": lon_scale, "lat": lat_scale, "height": h_scale},
-                        "wgs84": {"lon": wgs_scale[0], "lat": wgs_scale[1], "height": wgs_scale[2]},
+                wgs_scale = service.transform_columns(geo_to_wgs, lon_scale, lat_scale, h_scale)
+                scale_cols = {
+                    "x": new_x,
+                    "y": new_y,
+                    "lon": lon_scale,
+                    "lat": lat_scale,
+                    "height": h_scale,
+                    "wgs_lon": wgs_scale[0],
+                    "wgs_lat": wgs_scale[1],
+                    "wgs_height": wgs_scale[2],
+                }
+                projected_units = {
+                    "unit": units_info.get("horizontal"),
+                    "meter_per_unit": horizontal_factor,
+                }
+                scale_results = None if layout == "columnar" else [
+                    {
+                        "projected": {"x": px, "y": py},
+                        "geodetic": {"lon": glon, "lat": glat, "height": gh},
+                        "wgs84": {"lon": wlon, "lat": wlat, "height": wh},
                         "scales": scales,
-                        "projected_units": {
-                            "unit": units_info.get("horizontal"),
-                            "meter_per_unit": horizontal_factor,
-                        },
+                        "projected_units": projected_units,
                     }
-                    entry["scale"] = scale_res
-
-            if include_ecef and include_scale and ecef_res and scale_res:
-                proj_diff = None
-                if ecef_res.get("projected") and scale_res.get("projected"):
-                    dx_axis = ecef_res["projected"]["x"] - scale_res["projected"]["x"]
-                    dy_axis = ecef_res["projected"]["y"] - scale_res["projected"]["y"]
-                    proj_diff = {
-                        "dx_axis": dx_axis,
-                        "dy_axis": dy_axis,
-                        "d_axis": math.hypot(dx_axis, dy_axis),
-                        "dx_m": dx_axis * horizontal_factor,
-                        "dy_m": dy_axis * horizontal_factor,
-                        "d_m": math.hypot(dx_axis * horizontal_factor, dy_axis * horizontal_factor),
+                    for px, py, glon, glat, gh, wlon, wlat, wh in zip(
+                        new_x.tolist(),
+                        new_y.tolist(),
+                        lon_scale.tolist(),
+                        lat_scale.tolist(),
+                        h_scale.tolist(),
+                        wgs_scale[0].tolist(),
+                        wgs_scale[1].tolist(),
+                        wgs_scale[2].tolist(),
+                    )
+                ]
+
+        differences: Optional[List[Dict]] = None
+        difference_cols: Optional[Dict[str, np.ndarray]] = None
+        if ecef_cols is not None and scale_cols is not None:
+            dx_axis = ecef_cols["x"] - scale_cols["x"]
+            dy_axis = ecef_cols["y"] - scale_cols["y"]
+            d_axis = np.hypot(dx_axis, dy_axis)
+            dx_m = dx_axis * horizontal_factor
+            dy_m = dy_axis * horizontal_factor
+            d_m = np.hypot(dx_m, dy_m)
+            geod_dist: List[Optional[float]] = [None] * count
+            dist_col: Optional[np.ndarray] = None
+            if "wgs_lon" in ecef_cols:
+                ends = (ecef_cols["wgs_lon"], ecef_cols["wgs_lat"], scale_cols["wgs_lon"], scale_cols["wgs_lat"])
+                if count == 1:
+                    # pyproj sends size-1 arrays down its scalar path; pass floats.
+                    ends = tuple(float(col[0]) for col in ends)
+                _, _, dist = geod.inv(*ends)
+                dist_col = np.abs(np.atleast_1d(np.asarray(dist, dtype=float)))
+                geod_dist = dist_col.tolist()
+            difference_cols = {
+                "dx_axis": dx_axis,
+                "dy_axis": dy_axis,
+                "d_axis": d_axis,
+                "dx_m": dx_m,
+                "dy_m": dy_m,
+                "d_m": d_m,
+                "distance": dist_col,
+            }
+            differences = None if layout == "columnar" else [
+                {
+                    "projected": {
+                        "dx_axis": a,
+                        "dy_axis": b,
+                        "d_axis": c,
+                        "dx_m": d,
+                        "dy_m": e,
+                        "d_m": f,
                         "unit": units_info.get("horizontal"),
                         "meter_per_unit": horizontal_factor,
-                    }
-                geod_diff = None
-                ecef_wgs = ecef_res.get("wgs84")
-                scale_wgs = scale_res.get("wgs84")
-                if ecef_wgs and scale_wgs:
-                    _, _, dist = geod.inv(
-                        ecef_wgs["lon"],
-                        ecef_wgs["lat"],
-                        scale_wgs["lon"],
-                        scale_wgs["lat"],
-                    )
-                    geod_diff = {"distance": abs(dist)}
-                entry["difference"] = {
-                    "projected": proj_diff,
-                    "geodesic": geod_diff,
+                    },
+                    "geodesic": {"distance": g} if g is not None else None,
                 }
+                for a, b, c, d, e, f, g in zip(
+                    dx_axis.tolist(),
+                    dy_axis.tolist(),
+                    d_axis.tolist(),
+                    dx_m.tolist(),
+                    dy_m.tolist(),
+                    d_m.tolist(),
+                    geod_dist,
+                )
+            ]
 
-            points_out.append(entry)
-
-        reference_wgs = geo_to_wgs.transform(ref_lon, ref_lat, ref_h)
-
-        return {
+        reference_wgs = context["reference_wgs84"] or geo_to_wgs.transform(ref_lon, ref_lat, ref_h)
+        result = {
             "crs": request.crs,
             "mode": mode,
             "reference": {
@@ -658,9 +1075,111 @@ async def transform_local_trajectory(request: LocalTrajectoryRequest):
                     "meter_per_unit": horizontal_factor,
                 },
             },
-            "points": points_out,
         }
+
+        if layout == "columnar":
+            if offsets is not None:
+                columns: Dict[str, object] = {
+                    "index": np.arange(count),
+                    "md": offsets.get("md"),
+                    "tvd": offsets.get("tvd"),
+                }
+            else:
+                columns = {
+                    "index": np.arange(count),
+                    "name": [pt.name for pt in request.points],
+                    "md": [pt.md for pt in request.points],
+                    "tvd": [pt.tvd for pt in request.points],
+                }
+            columns["offset"] = {"east": east, "north": north, "up": up}
+            if ecef_cols is not None:
+                columns["ecef"] = {
+                    "geodetic": {"lon": ecef_cols["lon"], "lat": ecef_cols["lat"], "height": ecef_cols["height"]},
+                    "projected": {"x": ecef_cols["x"], "y": ecef_cols["y"]},
+                }
+                if "wgs_lon" in ecef_cols:
+                    columns["ecef"]["wgs84"] = {
+                        "lon": ecef_cols["wgs_lon"],
+                        "lat": ecef_cols["wgs_lat"],
+                        "height": ecef_cols["wgs_height"],
+                    }
+            if scale_cols is not None:
+                columns["scale"] = {
+                    "projected": {"x": scale_cols["x"], "y": scale_cols["y"]},
+                    "geodetic": {"lon": scale_cols["lon"], "lat": scale_cols["lat"], "height": scale_cols["height"]},
+                    "wgs84": {"lon": scale_cols["wgs_lon"], "lat": scale_cols["wgs_lat"], "height": scale_cols["wgs_height"]},
+                    "scales": scales,
+                    "projected_units": projected_units,
+                }
+            if difference_cols is not None:
+                columns["difference"] = {
+                    "projected": {
+                        **{key: value for key, value in difference_cols.items() if key != "distance"},
+                        "unit": units_info.get("horizontal"),
+                        "meter_per_unit": horizontal_factor,
+                    },
+                    "geodesic": (
+                        {"distance": difference_cols["distance"]}
+                        if difference_cols["distance"] is not None
+                        else None
+                    ),
+                }
+            result["layout"] = "columnar"
+            result["count"] = count
+            result["points"] = columns
+            return result
+
+        points_out: List[Dict] = []
+        for idx, (pt, up_value) in enumerate(zip(request.points, up.tolist())):
+            entry: Dict[str, Dict] = {
+                "index": idx,
+                "name": pt.name,
+                "md": pt.md,
+                "tvd": pt.tvd,
+                "offset": {
+                    "east": pt.east,
+                    "north": pt.north,
+                    "up": up_value,
+                },
+            }
+            if ecef_results is not None:
+                entry["ecef"] = ecef_results[idx]
+            if scale_results is not None:
+                entry["scale"] = scale_results[idx]
+            if differences is not None:
+                entry["difference"] = differences[idx]
+            points_out.append(entry)
+
+        result["points"] = points_out
+        return result
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+def local_trajectory_chunks(
+    request: LocalTrajectoryRequest, chunk_size: int, layout: str = "json"
+) -> Iterator[Tuple[Dict, Dict, int, int]]:
+    """/local-trajectory in slices of ``chunk_size`` points, as ``(data, summary, done, total)``.
+
+    ``data["points"]`` is the slice's entries (or columns, for the
+    ``columnar`` layout) with ``index`` counted from the start of the request.
+    """
+    total = len(request.points)
+    if total == 0:
+        raise ValueError("Trajectory points list cannot be empty")
+
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        response = local_trajectory_result(
+            request.model_copy(update={"points": request.points[start:stop]}), layout
+        )
+        points = response.pop("points")
+        if layout == "columnar":
+            points["index"] = points["index"] + start
+            response.pop("count", None)
+        else:
+            for point in points:
+                point["index"] += start
+        yield {"points": points}, response, stop, total
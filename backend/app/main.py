@@ -1,5 +1,9 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.transform import router as transform_router
 from app.api.crs import router as crs_router
 from app.api.calculate import router as calc_router
@@ -7,8 +11,23 @@ from app.api.gigs import router as gigs_router
 from app.api.docs import router as docs_router
 from app.api.vertical import router as vertical_router
 from app.api.grids import router as grids_router
+from app.api.jobs import router as jobs_router
+from app.services.executor import BLOCKING_EXECUTOR, ExecutorSaturated
+from app.services.process_pool import PROCESS_POOL
+from app.services.warmup import WARMUP
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if os.getenv("WARMUP_ENABLED", "1").lower() in ("1", "true", "yes", "on"):
+        WARMUP.start()
+    else:
+        WARMUP.disable()
+    yield
+    BLOCKING_EXECUTOR.shutdown()
+    PROCESS_POOL.shutdown()
+
 
-app = FastAPI(title="CRS Transformation Platform")
+app = FastAPI(title="CRS Transformation Platform", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,7 +44,26 @@ app.include_router(gigs_router)
 app.include_router(docs_router)
 app.include_router(vertical_router)
 app.include_router(grids_router)
+app.include_router(jobs_router)
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated(request: Request, exc: ExecutorSaturated):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 
 @app.get("/")
 def root():
     return {"status": "ok", "service": "crs-transformation-platform"}
+
+
+@app.get("/ready")
+def ready():
+    """503 until the startup warm-up of hot CRS pairs has finished; reports per-pair timings."""
+    report = WARMUP.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+
+@app.get("/executor-stats")
+def executor_stats():
+    """Worker pool load and queue-wait times for offloaded endpoints."""
+    return {**BLOCKING_EXECUTOR.stats(), "processes": PROCESS_POOL.stats()}
@@ -0,0 +1,206 @@
+import io
+import json
+import struct
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:  # optional: Arrow IPC streams
+    import pyarrow
+except ImportError:  # pragma: no cover - depends on the deployment
+    pyarrow = None
+
+
+# Column container: little-endian float64 columns behind a small header.
+#
+#   magic     4 bytes   b"EPJC"
+#   version   uint16    1
+#   columns   uint16    number of columns
+#   rows      uint64    values per column
+#   meta_len  uint32    length of the UTF-8 JSON metadata that follows
+#   meta      JSON      {"columns": [names...], ...}
+#   padding   zero bytes up to a multiple of 8
+#   data      columns * rows float64 LE, column after column
+RAW_MEDIA_TYPE = "application/vnd.epsg-proj.columns"
+NPY_MEDIA_TYPE = "application/x-npy"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+MEDIA_TYPES = (RAW_MEDIA_TYPE, NPY_MEDIA_TYPE, ARROW_MEDIA_TYPE)
+
+_MAGIC = b"EPJC"
+_HEADER = struct.Struct("<4sHHQI")
+_FLOAT = np.dtype("<f8")
+
+
+class UnsupportedMediaType(ValueError):
+    """The body's content type is not a supported binary column format."""
+
+
+def media_type(content_type: Optional[str]) -> str:
+    """The supported media type named by a Content-Type/Accept value (parameters ignored)."""
+    for part in (content_type or "").split(","):
+        name = part.split(";")[0].strip().lower()
+        if name in MEDIA_TYPES:
+            if name == ARROW_MEDIA_TYPE and pyarrow is None:
+                raise UnsupportedMediaType("Arrow IPC needs pyarrow, which is not installed")
+            return name
+    raise UnsupportedMediaType(
+        f"Unsupported media type '{content_type}' (expected one of: {', '.join(MEDIA_TYPES)})"
+    )
+
+
+def response_media_type(accept: Optional[str], content_type: Optional[str]) -> str:
+    """Format for the response: the one ``Accept`` names, else the request's own."""
+    try:
+        return media_type(accept)
+    except UnsupportedMediaType as exc:
+        if accept and ARROW_MEDIA_TYPE in accept.lower():
+            raise exc
+    return media_type(content_type)
+
+
+def pack_raw(columns: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None) -> bytes:
+    names = list(columns)
+    rows = len(columns[names[0]]) if names else 0
+    meta_bytes = json.dumps({**(meta or {}), "columns": names}, separators=(",", ":")).encode("utf-8")
+    head = _HEADER.pack(_MAGIC, 1, len(names), rows, len(meta_bytes)) + meta_bytes
+    head += b"\0" * (-len(head) % 8)
+    body = b"".join(np.ascontiguousarray(columns[name], dtype=_FLOAT).tobytes() for name in names)
+    return head + body
+
+
+def unpack_raw(body: bytes) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Columns as read-only float64 views into ``body`` (no copy), plus the metadata."""
+    if len(body) < _HEADER.size:
+        raise ValueError("Body too short for a column container header")
+    magic, version, count, rows, meta_len = _HEADER.unpack_from(body)
+    if magic != _MAGIC or version != 1:
+        raise ValueError("Not an EPJC v1 column container")
+    meta_end = _HEADER.size + meta_len
+    meta = json.loads(bytes(body[_HEADER.size:meta_end]).decode("utf-8")) if meta_len else {}
+    names = meta.get("columns") or [f"c{i}" for i in range(count)]
+    if len(names) != count:
+        raise ValueError("Column names do not match the column count")
+    offset = meta_end + (-meta_end % 8)
+    if len(body) - offset != count * rows * _FLOAT.itemsize:
+        raise ValueError(f"Expected {count} x {rows} float64 values after the header")
+    data = np.frombuffer(body, dtype=_FLOAT, count=count * rows, offset=offset).reshape(count, rows)
+    return {name: data[i] for i, name in enumerate(names)}, meta
+
+
+def _read_npy(body: bytes, names: Sequence[str]) -> Dict[str, np.ndarray]:
+    stream = io.BytesIO(body)
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    else:
+        raise ValueError(f"Unsupported .npy format version {version}")
+    if dtype.hasobject:
+        raise ValueError(".npy bodies must not contain Python objects")
+    count = int(np.prod(shape)) if shape else 1
+    data = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+    if dtype.names:
+        # Structured array: one field per column.
+        return {name: data[name] for name in dtype.names}
+    # Plain 2-D array: one column per position, named by ``names``.
+    if len(shape) != 2 or shape[1] > len(names):
+        raise ValueError(f".npy arrays must have shape (N, k) with k <= {len(names)}")
+    matrix = data.reshape(shape, order="F" if fortran_order else "C")
+    return {names[i]: matrix[:, i] for i in range(shape[1])}
+
+
+def _write_npy(columns: Dict[str, np.ndarray]) -> bytes:
+    names = list(columns)
+    rows = len(columns[names[0]]) if names else 0
+    records = np.empty(rows, dtype=[(name, _FLOAT) for name in names])
+    for name in names:
+        records[name] = columns[name]
+    stream = io.BytesIO()
+    np.save(stream, records, allow_pickle=False)
+    return stream.getvalue()
+
+
+def _read_arrow(body: bytes) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    table = pyarrow.ipc.open_stream(pyarrow.py_buffer(body)).read_all()
+    columns: Dict[str, np.ndarray] = {}
+    for name, column in zip(table.column_names, table.columns):
+        chunk = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+        # Zero-copy when the column has no nulls; nulls become NaN.
+        columns[name] = chunk.to_numpy(zero_copy_only=False).astype(_FLOAT, copy=False)
+    raw_meta = (table.schema.metadata or {}).get(b"epsg_proj")
+    return columns, json.loads(raw_meta) if raw_meta else {}
+
+
+def _write_arrow(columns: Dict[str, np.ndarray], meta: Dict[str, Any]) -> bytes:
+    table = pyarrow.table({name: np.asarray(values, dtype=_FLOAT) for name, values in columns.items()})
+    table = table.replace_schema_metadata({"epsg_proj": json.dumps(meta)})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_columns(
+    body: bytes, content_type: Optional[str], names: Sequence[str]
+) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Float64 columns (and any embedded metadata) from a binary request body.
+
+    ``names`` are the expected column names in order; they label the columns
+    of a plain (N, k) ``.npy`` array.
+    """
+    kind = media_type(content_type)
+    if kind == RAW_MEDIA_TYPE:
+        return unpack_raw(body)
+    if kind == NPY_MEDIA_TYPE:
+        return _read_npy(body, names), {}
+    return _read_arrow(body)
+
+
+def encode_columns(columns: Dict[str, np.ndarray], kind: str, meta: Dict[str, Any]) -> bytes:
+    """Serialize float64 columns in ``kind``; ``meta`` travels inside raw and Arrow bodies."""
+    if kind == RAW_MEDIA_TYPE:
+        return pack_raw(columns, meta)
+    if kind == NPY_MEDIA_TYPE:
+        return _write_npy(columns)
+    return _write_arrow(columns, meta)
+
+
+def require_columns(
+    columns: Dict[str, np.ndarray], required: Sequence[str], optional: Sequence[str] = ()
+) -> Dict[str, np.ndarray]:
+    """The known columns as float64 arrays (native byte order, no copy when already so)."""
+    missing = [name for name in required if name not in columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    out = {
+        name: np.asarray(columns[name], dtype=float)
+        for name in list(required) + list(optional)
+        if name in columns
+    }
+    lengths = {len(values) for values in out.values()}
+    if len(lengths) > 1:
+        raise ValueError("Columns must have the same length")
+    if not lengths or lengths == {0}:
+        raise ValueError("Trajectory points list cannot be empty")
+    return out
+
+
+def flatten_columns(tree: Dict[str, Any], prefix: str = "") -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Split a columnar result into dotted-name float arrays and the remaining scalars."""
+    arrays: Dict[str, np.ndarray] = {}
+    rest: Dict[str, Any] = {}
+    for key, value in tree.items():
+        name = f"{prefix}{key}"
+        if value is None:
+            continue
+        if isinstance(value, np.ndarray) and value.dtype.kind in "fiu":
+            arrays[name] = value
+        elif isinstance(value, dict):
+            sub_arrays, sub_rest = flatten_columns(value, prefix=f"{name}.")
+            arrays.update(sub_arrays)
+            if sub_rest:
+                rest[key] = sub_rest
+        elif not isinstance(value, list):
+            rest[key] = value
+    return arrays, rest
@@ -1,22 +1,581 @@
+import asyncio
 import os
 import json
-from typing import Any, Optional
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
+import numpy as np
 import redis
+import redis.asyncio as redis_asyncio
+
+from app.services.binary_columns import pack_raw, unpack_raw
+
+
+class LRUCache:
+    """Thread-safe LRU mapping bounded by entry count and optional total weight.
+
+    ``weigher`` returns an approximate size for each value; when ``max_weight``
+    is set, least recently used entries are evicted until the total fits.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_weight: Optional[int] = None,
+        weigher: Optional[Callable[[Any], int]] = None,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.max_weight = max_weight if max_weight and max_weight > 0 else None
+        self._weigher = weigher
+        self._data: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._weight = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _weigh(self, value: Any) -> int:
+        if self._weigher is None:
+            return 1
+        try:
+            return max(0, int(self._weigher(value)))
+        except Exception:
+            return 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        weight = self._weigh(value)
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self._weight -= previous[1]
+            self._data[key] = (value, weight)
+            self._weight += weight
+            self._evict()
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return default
+            self._weight -= entry[1]
+            return entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+
+    def _evict(self) -> None:
+        # Always keep the most recent entry, even if it alone exceeds max_weight.
+        while len(self._data) > 1 and (
+            len(self._data) > self.max_entries
+            or (self.max_weight is not None and self._weight > self.max_weight)
+        ):
+            _, (_, weight) = self._data.popitem(last=False)
+            self._weight -= weight
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "weight": self._weight,
+                "max_weight": self.max_weight,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class PerThreadCache:
+    """LRUCache facade that keeps one independent cache per thread.
+
+    pyproj ``Transformer`` objects built from a ``TransformerGroup`` wrap a raw
+    PJ and must not be used from two threads at once, so caches holding them
+    are partitioned by thread. ``clear`` empties every thread's cache and
+    ``stats`` sums them.
+    """
+
+    def __init__(self, factory: Callable[[], LRUCache]):
+        self._factory = factory
+        self._limits = factory()
+        self._local = threading.local()
+        self._caches: "weakref.WeakSet[LRUCache]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def local(self) -> LRUCache:
+        cache = getattr(self._local, "cache", None)
+        if cache is None:
+            cache = self._factory()
+            self._local.cache = cache
+            with self._lock:
+                self._caches.add(cache)
+        return cache
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self.local().get(key, default)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.local().set(key, value)
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.local().set(key, value)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.local()
+
+    def __len__(self) -> int:
+        return len(self.local())
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        return self.local().pop(key, default)
+
+    def _all(self) -> List[LRUCache]:
+        with self._lock:
+            return list(self._caches)
+
+    def clear(self) -> None:
+        for cache in self._all():
+            cache.clear()
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        per_thread = [cache.stats() for cache in self._all()]
+        totals: Dict[str, Optional[int]] = {"threads": len(per_thread)}
+        for name in ("entries", "weight", "hits", "misses", "evictions"):
+            totals[name] = sum(stats[name] or 0 for stats in per_thread)
+        # Limits apply per thread.
+        totals["max_entries"] = self._limits.max_entries
+        totals["max_weight"] = self._limits.max_weight
+        return totals
+
+
+class SingleFlight:
+    """Coalesces concurrent builds of the same key into one call.
+
+    The first caller for a key runs ``fn``; callers arriving while it runs wait
+    and receive the same result or exception. Exceptions are remembered for
+    ``failure_ttl`` seconds so a failing build is not retried by every request.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.value: Any = None
+            self.error: Optional[BaseException] = None
+
+    def __init__(self, failure_ttl: float = 5.0):
+        self.failure_ttl = max(0.0, float(failure_ttl))
+        self._calls: Dict[Hashable, "SingleFlight._Call"] = {}
+        self._failures: Dict[Hashable, Tuple[BaseException, float]] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+        self.failure_hits = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``(value, leader)``; ``leader`` is True when this caller ran ``fn``."""
+        with self._lock:
+            failure = self._failures.get(key)
+            if failure is not None:
+                if failure[1] > time.monotonic():
+                    self.failure_hits += 1
+                    raise failure[0]
+                del self._failures[key]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = SingleFlight._Call()
+                self._calls[key] = call
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, False
+
+        try:
+            call.value = fn()
+        except Exception as exc:
+            call.error = exc
+            if self.failure_ttl:
+                now = time.monotonic()
+                with self._lock:
+                    for stale in [k for k, (_, until) in self._failures.items() if until <= now]:
+                        del self._failures[stale]
+                    self._failures[key] = (exc, now + self.failure_ttl)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.value, True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._failures.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "failures_cached": len(self._failures),
+                "failure_hits": self.failure_hits,
+            }
+
+
+try:  # optional fast JSON codec
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: Any) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+_POOLS: Dict[Tuple, Any] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _connection_options(**options: Any) -> Dict[str, Any]:
+    return {
+        "host": os.getenv("REDIS_HOST", "redis"),
+        "port": int(os.getenv("REDIS_PORT", "6379")),
+        "max_connections": int(os.getenv("REDIS_MAX_CONNECTIONS", "32")),
+        **options,
+    }
+
+
+def shared_pool(**options: Any) -> redis.ConnectionPool:
+    """The process-wide connection pool for these connection options."""
+    options = _connection_options(**options)
+    key = tuple(sorted(options.items()))
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = redis.ConnectionPool(**options)
+            _POOLS[key] = pool
+        return pool
 
 
 class RedisCache:
-    def __init__(self):
-        host = os.getenv("REDIS_HOST", "redis")
-        port = int(os.getenv("REDIS_PORT", "6379"))
-        self.client = redis.Redis(host=host, port=port, decode_responses=True)
+    """JSON and binary-column values in Redis over shared connection pools.
+
+    Every instance with the same options shares one pool per process. JSON
+    goes through orjson when installed (NumPy arrays included). Float column
+    payloads can use ``set_columns``, which stores them in the EPJC container
+    of binary_columns. ``get_many_json``/``set_many_json`` and ``pipeline``
+    batch keys into one round trip. ``client``/``binary_client`` may be
+    passed in (e.g. fakeredis in tests).
+    """
+
+    def __init__(self, client: Any = None, binary_client: Any = None, **options: Any):
+        if client is None:
+            client = redis.Redis(connection_pool=shared_pool(decode_responses=True, **options))
+            if binary_client is None:
+                binary_client = redis.Redis(connection_pool=shared_pool(decode_responses=False, **options))
+        self.client = client
+        self.binary = binary_client if binary_client is not None else client
 
     def get_json(self, key: str) -> Optional[Any]:
         data = self.client.get(key)
         if data is None:
             return None
-        return json.loads(data)
+        return _loads(data)
 
     def set_json(self, key: str, value: Any, ex: Optional[int] = 3600) -> None:
-        self.client.set(key, json.dumps(value), ex=ex)
+        self.client.set(key, _dumps(value), ex=ex)
+
+    def get_many_json(self, keys: List[str]) -> List[Optional[Any]]:
+        """Values for ``keys`` (None where missing) in one MGET."""
+        if not keys:
+            return []
+        return [None if data is None else _loads(data) for data in self.client.mget(keys)]
+
+    def set_many_json(self, values: Dict[str, Any], ex: Optional[int] = 3600) -> None:
+        """Set every key in one pipelined round trip."""
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.set(key, _dumps(value), ex=ex)
+        pipe.execute()
+
+    def get_columns(self, key: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        data = self.binary.get(key)
+        if data is None:
+            return None
+        return unpack_raw(data)
+
+    def set_columns(
+        self,
+        key: str,
+        columns: Dict[str, np.ndarray],
+        meta: Optional[Dict[str, Any]] = None,
+        ex: Optional[int] = 3600,
+    ) -> None:
+        """Store float64 columns as an EPJC container (8 bytes per value, no text encoding)."""
+        self.binary.set(key, pack_raw(columns, meta), ex=ex)
+
+    def pipeline(self) -> Any:
+        """Non-transactional pipeline on the text client, for batching mixed commands."""
+        return self.client.pipeline(transaction=False)
+
+
+class AsyncRedisCache:
+    """``redis.asyncio`` counterpart of RedisCache for use inside async endpoints.
+
+    asyncio connections belong to one event loop, so each loop gets its own
+    shared pool, created on first use.
+    """
+
+    _pools: "weakref.WeakKeyDictionary[Any, Dict[Tuple, Any]]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, client: Any = None, binary_client: Any = None, **options: Any):
+        self._client = client
+        self._binary = binary_client if binary_client is not None else client
+        self._options = options
+
+    def _connect(self, decode_responses: bool) -> Any:
+        loop = asyncio.get_running_loop()
+        options = _connection_options(decode_responses=decode_responses, **self._options)
+        key = tuple(sorted(options.items()))
+        with _POOLS_LOCK:
+            pools = AsyncRedisCache._pools.setdefault(loop, {})
+            pool = pools.get(key)
+            if pool is None:
+                pool = redis_asyncio.ConnectionPool(**options)
+                pools[key] = pool
+        return redis_asyncio.Redis(connection_pool=pool)
+
+    @property
+    def client(self) -> Any:
+        return self._client if self._client is not None else self._connect(True)
+
+    @property
+    def binary(self) -> Any:
+        return self._binary if self._binary is not None else self._connect(False)
+
+    async def get_json(self, key: str) -> Optional[Any]:
+        data = await self.client.get(key)
+        if data is None:
+            return None
+        return _loads(data)
+
+    async def set_json(self, key: str, value: Any, ex: Optional[int] = 3600) -> None:
+        await self.client.set(key, _dumps(value), ex=ex)
+
+    async def get_many_json(self, keys: List[str]) -> List[Optional[Any]]:
+        if not keys:
+            return []
+        return [None if data is None else _loads(data) for data in await self.client.mget(keys)]
+
+    async def set_many_json(self, values: Dict[str, Any], ex: Optional[int] = 3600) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.set(key, _dumps(value), ex=ex)
+        await pipe.execute()
+
+    async def get_columns(self, key: str) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        data = await self.binary.get(key)
+        if data is None:
+            return None
+        return unpack_raw(data)
+
+    async def set_columns(
+        self,
+        key: str,
+        columns: Dict[str, np.ndarray],
+        meta: Optional[Dict[str, Any]] = None,
+        ex: Optional[int] = 3600,
+    ) -> None:
+        await self.binary.set(key, pack_raw(columns, meta), ex=ex)
+
+
+class TieredCache:
+    """Process-local LRU in front of Redis for deterministic, JSON-serializable values.
+
+    Redis keys are ``<namespace>:<version>:<key>``. ``version`` (a string or a
+    callable resolved on first use) should change whenever the cached values
+    could, e.g. with the PROJ database version. Builder errors of the
+    ``negative_errors`` types are cached for ``negative_ttl`` seconds and
+    re-raised as ValueError with the same message. Values are shared between
+    callers and must not be mutated.
+
+    Redis is optional: ``redis`` may be None, a RedisCache, or a callable
+    returning either, called on first use so that no client or pool is
+    created at import time. When a Redis call fails the cache carries on
+    with the local tier alone, retrying Redis after ``retry_after`` seconds.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        version: Any,
+        redis: Any = None,
+        max_entries: int = 1024,
+        ttl: int = 86400,
+        negative_ttl: int = 300,
+        negative_errors: Tuple[type, ...] = (ValueError,),
+        retry_after: float = 30.0,
+    ):
+        self.namespace = namespace
+        self._version = version
+        self._resolved_version: Optional[str] = None
+        self._redis = redis
+        self._redis_resolved = not callable(redis)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.negative_errors = negative_errors
+        self.retry_after = retry_after
+        self._local = LRUCache(max_entries=max_entries)
+        self._builds = SingleFlight(failure_ttl=0)
+        self._redis_down_until = 0.0
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.negative_hits = 0
+        self.builds = 0
+        self.redis_errors = 0
+
+    @property
+    def version(self) -> str:
+        if self._resolved_version is None:
+            self._resolved_version = str(self._version() if callable(self._version) else self._version)
+        return self._resolved_version
+
+    @property
+    def redis(self) -> Optional[RedisCache]:
+        if not self._redis_resolved:
+            with self._lock:
+                if not self._redis_resolved:
+                    self._redis = self._redis()
+                    self._redis_resolved = True
+        return self._redis
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{self.version}:{key}"
+
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self) -> None:
+        with self._lock:
+            self.redis_errors += 1
+            self._redis_down_until = time.monotonic() + self.retry_after
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _unwrap(self, envelope: Dict[str, Any]) -> Any:
+        if "error" in envelope:
+            self._count("negative_hits")
+            raise ValueError(envelope["error"])
+        return envelope["value"]
+
+    def _store(self, key: str, envelope: Dict[str, Any], ttl: int) -> None:
+        self._local.set(key, (time.monotonic() + ttl, envelope))
+        if self._redis_available():
+            try:
+                self.redis.set_json(self._redis_key(key), envelope, ex=ttl)
+            except Exception:
+                self._redis_failed()
+
+    def get_or_build(self, key: str, build: Callable[[], Any]) -> Any:
+        """Cached value for ``key``, calling ``build`` on a miss in both tiers."""
+        entry = self._local.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._count("local_hits")
+                return self._unwrap(entry[1])
+            self._local.pop(key)
+
+        if self._redis_available():
+            try:
+                envelope = self.redis.get_json(self._redis_key(key))
+            except Exception:
+                envelope = None
+                self._redis_failed()
+            if envelope is not None:
+                # Local copies start a full TTL of their own; Redis' remaining TTL is not read.
+                ttl = self.negative_ttl if "error" in envelope else self.ttl
+                self._local.set(key, (time.monotonic() + ttl, envelope))
+                self._count("redis_hits")
+                return self._unwrap(envelope)
+
+        def compute() -> Dict[str, Any]:
+            self._count("builds")
+            try:
+                envelope = {"value": build()}
+            except self.negative_errors as exc:
+                envelope = {"error": str(exc)}
+                self._store(key, envelope, self.negative_ttl)
+                return envelope
+            self._store(key, envelope, self.ttl)
+            return envelope
+
+        envelope, _ = self._builds.do(key, compute)
+        if "error" in envelope:
+            raise ValueError(envelope["error"])
+        return envelope["value"]
+
+    def clear(self) -> None:
+        """Drop the local tier and re-resolve the version on next use."""
+        self._local.clear()
+        self._resolved_version = None
 
+    def stats(self) -> Dict[str, Any]:
+        if not self._redis_resolved:
+            redis_state = "not connected"
+        elif self._redis is None:
+            redis_state = "disabled"
+        elif time.monotonic() < self._redis_down_until:
+            redis_state = "unavailable"
+        else:
+            redis_state = "ok"
+        with self._lock:
+            return {
+                "version": self._resolved_version,
+                "local": self._local.stats(),
+                "local_hits": self.local_hits,
+                "redis_hits": self.redis_hits,
+                "negative_hits": self.negative_hits,
+                "builds": self.builds,
+                "redis": redis_state,
+                "redis_errors": self.redis_errors,
+            }
@@ -0,0 +1,514 @@
+import base64
+import bisect
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from math import degrees
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pyproj import CRS, datadir
+from pyproj.database import query_crs_info
+from pyproj.enums import PJType
+
+from app.services.crs_registry import proj_db_version
+
+
+# Bump when the stored features or their meaning change.
+INDEX_SCHEMA = "1"
+
+# Conversion parameters kept per CRS, in degrees / metres / unity.
+PARAMETERS = {
+    "Latitude of natural origin": "lat_origin",
+    "Latitude of origin": "lat_origin",
+    "Latitude of projection centre": "lat_origin",
+    "Longitude of natural origin": "lon_origin",
+    "Longitude of origin": "lon_origin",
+    "Central meridian": "lon_origin",
+    "Scale factor at natural origin": "scale_factor",
+    "Scale factor at projection centre": "scale_factor",
+    "False easting": "false_easting",
+    "False northing": "false_northing",
+}
+PARAMETER_FIELDS = ("lat_origin", "lon_origin", "scale_factor", "false_easting", "false_northing")
+# Parameter agreement tolerances for match scoring.
+PARAMETER_TOLERANCES = {
+    "lat_origin": 1e-6,
+    "lon_origin": 1e-6,
+    "scale_factor": 1e-8,
+    "false_easting": 0.01,
+    "false_northing": 0.01,
+}
+
+_ZONE = re.compile(r"zone (\d+)([ns])?\b")
+
+
+def _features(code: str, name: str) -> Dict[str, Any]:
+    lower = name.lower()
+    zone = _ZONE.search(lower)
+    row: Dict[str, Any] = {
+        "code": code,
+        "name": name,
+        "zone": int(zone.group(1)) if zone else -1,
+        "south": bool(zone and zone.group(2) == "s") or "south" in lower,
+        "ok": False,
+    }
+    try:
+        crs = CRS.from_epsg(code)
+        operation = crs.coordinate_operation
+        geo = crs.geodetic_crs or crs
+        datum = getattr(crs.datum, "name", "") or getattr(geo.datum, "name", "") or ""
+        ellipsoid = geo.ellipsoid
+        row.update(
+            crs_name=crs.name,
+            method=getattr(operation, "method_name", "") or "",
+            datum=datum,
+            ellipsoid=getattr(ellipsoid, "name", "") or "",
+            semi_major=float(getattr(ellipsoid, "semi_major_metre", np.nan) or np.nan),
+        )
+        for param in getattr(operation, "params", None) or []:
+            field = PARAMETERS.get(param.name)
+            if field is None or field in row:
+                continue
+            value = float(param.value)
+            factor = param.unit_conversion_factor or 1.0
+            if param.unit_category == "angular":
+                value = degrees(value * factor)
+            elif param.unit_category == "linear":
+                value *= factor
+            row[field] = value
+        row["ok"] = True
+    except Exception:
+        pass
+    return row
+
+
+def build_features() -> Dict[str, np.ndarray]:
+    """Feature columns for every EPSG projected CRS, in ``query_crs_info`` order."""
+    rows = [_features(info.code, info.name) for info in query_crs_info(auth_name="EPSG", pj_types=["PROJECTED_CRS"])]
+    columns: Dict[str, np.ndarray] = {}
+    for field in ("code", "name", "crs_name", "method", "datum", "ellipsoid"):
+        columns[field] = np.array([row.get(field, "") for row in rows], dtype=str)
+    columns["zone"] = np.array([row["zone"] for row in rows], dtype=np.int16)
+    columns["south"] = np.array([row["south"] for row in rows], dtype=bool)
+    columns["ok"] = np.array([row["ok"] for row in rows], dtype=bool)
+    for field in ("semi_major",) + PARAMETER_FIELDS:
+        columns[field] = np.array([row.get(field, np.nan) for row in rows], dtype=float)
+    return columns
+
+
+class ProjectedCRSIndex:
+    """Precomputed features of all EPSG projected CRS for /api/crs/match.
+
+    Built once per PROJ database version (about 5k CRS instantiations) and
+    persisted as ``projected_crs_<version>.npz`` under ``directory``, so later
+    processes load it in milliseconds. Matching scores every CRS at once with
+    NumPy instead of instantiating candidates per request.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = Path(directory or Path(tempfile.gettempdir()) / "epsg_proj")
+        self._columns: Optional[Dict[str, np.ndarray]] = None
+        self._derived: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.version: Optional[str] = None
+        self.source: Optional[str] = None
+        self.seconds: Optional[float] = None
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"projected_crs_{INDEX_SCHEMA}-{proj_db_version()}.npz"
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        columns = self._columns
+        if columns is not None:
+            return columns
+        with self._lock:
+            if self._columns is None:
+                self._load()
+            return self._columns
+
+    def _load(self) -> None:
+        started = time.perf_counter()
+        path = self.path
+        columns: Optional[Dict[str, np.ndarray]] = None
+        if path.exists():
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    columns = {name: data[name] for name in data.files}
+                self.source = "file"
+            except Exception:
+                columns = None
+        if columns is None:
+            columns = build_features()
+            self.source = "built"
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                partial = path.with_suffix(f".{os.getpid()}.tmp.npz")
+                np.savez(partial, **columns)
+                partial.replace(path)
+            except Exception:
+                pass  # read-only location: keep the index in memory only
+        lower = np.char.lower(columns["name"])
+        self._derived = {
+            "utm": np.char.find(lower, "utm") >= 0,
+            "transverse_mercator": np.char.find(columns["method"], "Transverse Mercator") >= 0,
+            "datum_lower": np.char.lower(columns["datum"]),
+            "ellipsoid_lower": np.char.lower(columns["ellipsoid"]),
+        }
+        self.version = path.stem
+        self.seconds = round(time.perf_counter() - started, 4)
+        self._columns = columns
+
+    def match(
+        self,
+        is_utm: bool,
+        zone: Optional[int],
+        south: bool,
+        datum_name: str = "",
+        ellipsoid_name: str = "",
+        semi_major: Optional[float] = None,
+        parameters: Optional[Dict[str, float]] = None,
+        limit: int = 20,
+    ) -> List[Dict]:
+        """Best-scoring EPSG projected CRS for parsed custom-definition features.
+
+        Scores: UTM name 20, zone 50, hemisphere 5, Transverse Mercator 15,
+        datum 20, ellipsoid 15, semi-major axis within 2 m 10, and 10 per
+        matching projection parameter (non-UTM definitions only).
+        """
+        columns = self.columns()
+        derived = self._derived
+        candidates = np.ones(len(columns["code"]), dtype=bool)
+        score = np.zeros(len(candidates), dtype=np.int64)
+
+        if is_utm:
+            candidates &= derived["utm"]
+            score += 20 * derived["utm"]
+            if zone:
+                in_zone = columns["zone"] == zone
+                if (candidates & in_zone).any():
+                    candidates &= in_zone
+                score += 50 * in_zone
+                score += 5 * ((columns["zone"] >= 0) & (columns["south"] == south))
+        score += 15 * derived["transverse_mercator"]
+        if datum_name.split():
+            score += 20 * (np.char.find(derived["datum_lower"], datum_name.split()[0].lower()) >= 0)
+        if ellipsoid_name.split():
+            score += 15 * (np.char.find(derived["ellipsoid_lower"], ellipsoid_name.split()[0].lower()) >= 0)
+        if semi_major:
+            with np.errstate(invalid="ignore"):
+                score += 10 * (np.abs(columns["semi_major"] - semi_major) < 2.0)
+        if parameters and not is_utm:
+            for field, value in parameters.items():
+                if field in PARAMETER_TOLERANCES and value is not None:
+                    with np.errstate(invalid="ignore"):
+                        score += 10 * (np.abs(columns[field] - value) <= PARAMETER_TOLERANCES[field])
+        # CRS that failed to instantiate when the index was built score 0.
+        score = np.where(columns["ok"], score, 0)
+
+        rows = np.flatnonzero(candidates)
+        # Stable sort keeps PROJ's order between equal scores.
+        top = rows[np.argsort(-score[rows], kind="stable")[:limit]]
+        matches = []
+        for i in top.tolist():
+            code, name = str(columns["code"][i]), str(columns["name"][i])
+            details: Dict[str, Any] = {"code": code, "name": name}
+            if columns["ok"][i]:
+                details.update(
+                    crs_name=str(columns["crs_name"][i]),
+                    datum=str(columns["datum"][i]),
+                    ellipsoid=str(columns["ellipsoid"][i]),
+                    method=str(columns["method"][i]),
+                )
+            matches.append({"epsg_code": f"EPSG:{code}", "name": name, "score": int(score[i]), "details": details})
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._columns is not None,
+            "entries": len(self._columns["code"]) if self._columns is not None else 0,
+            "version": self.version,
+            "source": self.source,
+            "seconds": self.seconds,
+            "path": str(self.path),
+        }
+
+
+_TOKEN = re.compile(r"[0-9a-z]+")
+_ALIAS_TABLES = ("geodetic_crs", "projected_crs", "vertical_crs", "compound_crs")
+# Area-of-use grid cell size in degrees; larger extents skip the grid.
+_CELL = 10.0
+_GRID_COLUMNS, _GRID_ROWS = int(360 / _CELL), int(180 / _CELL)
+_LARGE_CELLS = _GRID_COLUMNS * _GRID_ROWS // 8
+
+
+def tokens(text: str) -> List[str]:
+    return _TOKEN.findall((text or "").lower())
+
+
+def _aliases(codes: Dict[str, int]) -> List[Tuple[int, str]]:
+    """(row, alias) for EPSG CRS aliases in proj.db; empty if it cannot be read."""
+    for directory in (datadir.get_data_dir() or "").split(os.pathsep):
+        path = Path(directory) / "proj.db"
+        if not path.exists():
+            continue
+        try:
+            with sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True) as db:
+                rows = db.execute(
+                    "SELECT code, alt_name FROM alias_name WHERE auth_name = 'EPSG' AND table_name IN (?, ?, ?, ?)",
+                    _ALIAS_TABLES,
+                ).fetchall()
+        except sqlite3.Error:
+            return []
+        return [(codes[str(code)], alias) for code, alias in rows if str(code) in codes]
+    return []
+
+
+class _Postings:
+    """Token -> row postings, flattened: rows of ``vocabulary[i]`` are ``rows[offsets[i]:offsets[i + 1]]``.
+
+    The vocabulary is sorted, so every token sharing a prefix is one
+    contiguous slice of ``rows``.
+    """
+
+    def __init__(self, pairs: List[Tuple[str, int]]):
+        pairs = sorted(set(pairs))
+        self.vocabulary = sorted({token for token, _ in pairs})
+        starts = np.searchsorted(np.array([token for token, _ in pairs], dtype=str), self.vocabulary)
+        self.offsets = np.append(starts, len(pairs)).astype(np.int64)
+        self.rows = np.array([row for _, row in pairs], dtype=np.int32)
+
+    def exact(self, token: str) -> np.ndarray:
+        i = bisect.bisect_left(self.vocabulary, token)
+        if i < len(self.vocabulary) and self.vocabulary[i] == token:
+            return self.rows[self.offsets[i]:self.offsets[i + 1]]
+        return self.rows[:0]
+
+    def prefix(self, token: str) -> np.ndarray:
+        lo = bisect.bisect_left(self.vocabulary, token)
+        hi = bisect.bisect_left(self.vocabulary, token + "\uffff")
+        return self.rows[self.offsets[lo]:self.offsets[hi]]
+
+
+def _boxes(west: float, south: float, east: float, north: float) -> List[Tuple[float, float, float, float]]:
+    # Extents crossing the antimeridian (west > east) become two boxes.
+    if west > east:
+        return [(west, south, 180.0, north), (-180.0, south, east, north)]
+    return [(west, south, east, north)]
+
+
+def _cells(box: Tuple[float, float, float, float]) -> np.ndarray:
+    west, south, east, north = box
+    c0 = min(max(int((west + 180.0) // _CELL), 0), _GRID_COLUMNS - 1)
+    c1 = min(max(int((east + 180.0) // _CELL), 0), _GRID_COLUMNS - 1)
+    r0 = min(max(int((south + 90.0) // _CELL), 0), _GRID_ROWS - 1)
+    r1 = min(max(int((north + 90.0) // _CELL), 0), _GRID_ROWS - 1)
+    rows, columns = np.meshgrid(np.arange(r0, r1 + 1), np.arange(c0, c1 + 1), indexing="ij")
+    return (rows * _GRID_COLUMNS + columns).ravel()
+
+
+class CRSSearchIndex:
+    """In-memory search index of the non-deprecated EPSG CRS for /api/crs/search.
+
+    Names and proj.db aliases are tokenized into sorted postings for token
+    and prefix lookups. Areas of use are bucketed in a uniform 10 degree grid;
+    extents too large for the grid are always tested directly. Built in well
+    under a second on first use (the startup warm-up triggers it).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self.version: Optional[str] = None
+        self.seconds: Optional[float] = None
+
+    def _ensure(self) -> None:
+        if self._built:
+            return
+        with self._lock:
+            if not self._built:
+                self._build()
+
+    def _build(self) -> None:
+        started = time.perf_counter()
+        infos = query_crs_info(auth_name="EPSG")
+        self.codes = np.array([info.code for info in infos], dtype=str)
+        self.names = np.array([info.name for info in infos], dtype=str)
+        self.types = np.array([info.type.name for info in infos], dtype=str)
+        self.lower = np.char.lower(self.names)
+        area = np.array(
+            [
+                (a.west, a.south, a.east, a.north) if (a := info.area_of_use) is not None else (np.nan,) * 4
+                for info in infos
+            ],
+            dtype=float,
+        )
+        self.area = area
+        row_of = {info.code: row for row, info in enumerate(infos)}
+
+        self.name_postings = _Postings([(token, row) for row, info in enumerate(infos) for token in tokens(info.name)])
+        aliases = _aliases(row_of)
+        self.aliases = len(aliases)
+        self.alias_postings = _Postings([(token, row) for row, alias in aliases for token in tokens(alias)])
+
+        cells: List[Tuple[int, int]] = []
+        large: List[int] = []
+        for row, (west, south, east, north) in enumerate(area):
+            if np.isnan(west):
+                large.append(row)
+                continue
+            covered = np.concatenate([_cells(box) for box in _boxes(west, south, east, north)])
+            if len(covered) > _LARGE_CELLS:
+                large.append(row)
+            else:
+                cells.extend((int(cell), row) for cell in covered)
+        cells.sort()
+        self.cell_rows = np.array([row for _, row in cells], dtype=np.int32)
+        self.cell_offsets = np.searchsorted(
+            np.array([cell for cell, _ in cells], dtype=np.int64), np.arange(_GRID_COLUMNS * _GRID_ROWS + 1)
+        )
+        self.large_rows = np.array(large, dtype=np.int32)
+
+        self.version = hashlib.sha1(proj_db_version().encode("utf-8")).hexdigest()[:12]
+        self.seconds = round(time.perf_counter() - started, 4)
+        self._built = True
+
+    def _text_ranking(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, scores) matching every query token as a prefix of a name or alias token.
+
+        A bare code (``32631``, ``EPSG:326``) also matches codes starting with it.
+        """
+        size = len(self.codes)
+        text = text.strip()
+        if text.upper().startswith("EPSG:"):
+            text = text[5:]
+        query = tokens(text)
+        matched = np.ones(size, dtype=bool)
+        score = np.zeros(size, dtype=np.int64)
+        for token in query:
+            in_name = np.zeros(size, dtype=bool)
+            in_name[self.name_postings.prefix(token)] = True
+            exact = np.zeros(size, dtype=bool)
+            exact[self.name_postings.exact(token)] = True
+            in_alias = np.zeros(size, dtype=bool)
+            in_alias[self.alias_postings.prefix(token)] = True
+            matched &= in_name | in_alias
+            # Whole name token 3, name token prefix 2, alias only 1.
+            score += np.where(exact, 3, np.where(in_name, 2, 1))
+        if text.isdigit():
+            by_code = np.char.startswith(self.codes, text)
+            matched |= by_code
+            score += np.where(self.codes == text, 100, 50 * by_code)
+        rows = np.flatnonzero(matched)
+        score = score[rows]
+        names = self.lower[rows]
+        score += 5 * (np.char.find(names, text.lower()) >= 0)
+        score += 5 * np.char.startswith(names, " ".join(query))
+        # Best score, then shorter names, then database order.
+        order = np.lexsort((rows, np.char.str_len(self.names[rows]), -score))
+        return rows[order], score[order]
+
+    def _aoi_mask(self, west: float, south: float, east: float, north: float) -> np.ndarray:
+        """Rows whose area of use intersects the box (west > east crosses the antimeridian)."""
+        mask = np.zeros(len(self.codes), dtype=bool)
+        for qw, qs, qe, qn in _boxes(west, south, east, north):
+            cells = _cells((qw, qs, qe, qn))
+            candidates = np.unique(
+                np.concatenate(
+                    [self.large_rows]
+                    + [self.cell_rows[self.cell_offsets[cell]:self.cell_offsets[cell + 1]] for cell in cells]
+                )
+            )
+            cw, cs, ce, cn = self.area[candidates].T
+            with np.errstate(invalid="ignore"):
+                across = (cs <= qn) & (cn >= qs)
+                along = np.where(cw <= ce, (cw <= qe) & (ce >= qw), (qe >= cw) | (qw <= ce))
+            mask[candidates[across & along]] = True
+        return mask
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        area_of_interest: Optional[Tuple[float, float, float, float]] = None,
+        crs_type: Optional[str] = None,
+    ) -> np.ndarray:
+        """Matching rows, best first for text queries and in database order otherwise."""
+        self._ensure()
+        if text and tokens(text):
+            rows, _ = self._text_ranking(text)
+        else:
+            rows = np.arange(len(self.codes))
+        if crs_type:
+            rows = rows[self.types[rows] == PJType.create(crs_type).name]
+        if area_of_interest is not None:
+            rows = rows[self._aoi_mask(*area_of_interest)[rows]]
+        return rows
+
+    def page(
+        self,
+        text: Optional[str] = None,
+        area_of_interest: Optional[Tuple[float, float, float, float]] = None,
+        crs_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, str]], int, Optional[str]]:
+        """One page of results, the total match count and the cursor of the next page.
+
+        Without ``limit`` every match is returned. Cursors are opaque; they
+        are tied to the query and the index version and raise ValueError
+        when used with anything else.
+        """
+        rows = self.search(text, area_of_interest, crs_type)
+        query = self._fingerprint(text, area_of_interest, crs_type)
+        offset = self._decode_cursor(cursor, query) if cursor else 0
+        stop = len(rows) if limit is None else offset + limit
+        results = [
+            {"code": str(code), "name": str(name), "type": str(kind)}
+            for code, name, kind in zip(self.codes[rows[offset:stop]], self.names[rows[offset:stop]], self.types[rows[offset:stop]])
+        ]
+        next_cursor = self._encode_cursor(stop, query) if stop < len(rows) else None
+        return results, len(rows), next_cursor
+
+    def _fingerprint(self, *query: Any) -> str:
+        raw = json.dumps([self.version, *query], default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+    @staticmethod
+    def _encode_cursor(offset: int, query: str) -> str:
+        return base64.urlsafe_b64encode(f"{offset}:{query}".encode("ascii")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, query: str) -> int:
+        try:
+            offset, fingerprint = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii").split(":")
+            offset = int(offset)
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if fingerprint != query or offset < 0:
+            raise ValueError("Cursor does not belong to this query (or the CRS database changed)")
+        return offset
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._built,
+            "entries": len(self.codes) if self._built else 0,
+            "aliases": self.aliases if self._built else 0,
+            "tokens": len(self.name_postings.vocabulary) if self._built else 0,
+            "seconds": self.seconds,
+        }
+
+
+PROJECTED_CRS_INDEX = ProjectedCRSIndex(os.getenv("CRS_INDEX_DIR") or None)
+CRS_SEARCH_INDEX = CRSSearchIndex()
+
+
+if __name__ == "__main__":  # pragma: no cover - build/persist ahead of deployment
+    PROJECTED_CRS_INDEX.columns()
+    print(PROJECTED_CRS_INDEX.stats())
@@ -0,0 +1,206 @@
+import hashlib
+import threading
+from typing import Callable, Dict, Iterator, Mapping, Optional
+
+import pyproj
+from pyproj import CRS, Proj
+from pyproj.database import get_database_metadata
+
+from app.services.cache import LRUCache
+
+
+# Labels longer than this (WKT, PROJJSON, PROJ strings) are keyed by content hash.
+_MAX_PLAIN_KEY = 64
+
+
+def content_key(label: str) -> str:
+    """Cache key for a CRS input: the label itself, or a SHA-1 of long definitions."""
+    if len(label) <= _MAX_PLAIN_KEY:
+        return label
+    return "sha1:" + hashlib.sha1(label.encode("utf-8")).hexdigest()
+
+
+def proj_db_version() -> str:
+    """PROJ library and EPSG database versions, for keying derived caches."""
+    epsg = "unknown"
+    try:
+        epsg = get_database_metadata("EPSG.VERSION") or epsg
+    except Exception:
+        pass
+    return f"proj{pyproj.proj_version_str}-epsg{epsg}"
+
+
+def crs_units(crs: CRS) -> Dict:
+    units: Dict[str, float] = {}
+    for axis in crs.axis_info:
+        if axis.direction in ["east", "north"]:
+            units["horizontal"] = axis.unit_name
+            units["horizontal_factor"] = axis.unit_conversion_factor
+        elif axis.direction == "up":
+            units["vertical"] = axis.unit_name
+            units["vertical_factor"] = axis.unit_conversion_factor
+    return units
+
+
+def geodetic_crs(crs: CRS) -> CRS:
+    try:
+        geo = crs.geodetic_crs
+    except Exception:
+        geo = None
+    if geo is None:
+        return crs
+    return geo
+
+
+def ensure_3d(crs: CRS) -> CRS:
+    try:
+        if hasattr(crs, "is_geocentric") and crs.is_geocentric:
+            return crs
+    except Exception:
+        pass
+    try:
+        return crs.to_3d()
+    except Exception:
+        return crs
+
+
+class LazyDefinitions(Mapping[str, str]):
+    """Alias -> CRS definition mapping whose definitions are built on first lookup.
+
+    Keys are known up front, so membership tests and iteration are free; a
+    value's builder runs once and its result is kept.
+    """
+
+    def __init__(self, builders: Mapping[str, Callable[[], str]]):
+        self._builders = dict(builders)
+        self._values: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: str) -> str:
+        value = self._values.get(key)
+        if value is not None:
+            return value
+        builder = self._builders[key]
+        with self._lock:
+            if key not in self._values:
+                self._values[key] = builder()
+            return self._values[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._builders
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._builders)
+
+    def __len__(self) -> int:
+        return len(self._builders)
+
+    @property
+    def built(self) -> int:
+        return len(self._values)
+
+
+class CRSRecord:
+    """A parsed CRS and the facts derived from it, each computed at most once."""
+
+    def __init__(self, label: str, resolved: str, crs: CRS, canonical: str):
+        self.label = label
+        self.resolved = resolved
+        self.crs = crs
+        self.canonical = canonical
+        self.is_projected = crs.is_projected
+        self.is_geographic = crs.is_geographic
+        self._units: Optional[Dict] = None
+        self._geodetic: Optional[CRS] = None
+        self._geodetic3d: Optional[CRS] = None
+        self._proj: Optional[Proj] = None
+
+    @property
+    def units(self) -> Dict:
+        if self._units is None:
+            self._units = crs_units(self.crs)
+        return dict(self._units)
+
+    @property
+    def geodetic(self) -> CRS:
+        if self._geodetic is None:
+            self._geodetic = geodetic_crs(self.crs)
+        return self._geodetic
+
+    @property
+    def geodetic3d(self) -> CRS:
+        if self._geodetic3d is None:
+            self._geodetic3d = ensure_3d(self.geodetic)
+        return self._geodetic3d
+
+    @property
+    def proj(self) -> Proj:
+        if self._proj is None:
+            self._proj = Proj(self.crs)
+        return self._proj
+
+
+class CRSRegistry:
+    """Interns CRS inputs so each distinct code, alias or definition is parsed once.
+
+    Short labels (``EPSG:4326``, ``GIGS:OSGB36_3D``) are keyed directly; long
+    WKT/PROJ inputs are keyed by a SHA-1 of their text.
+    """
+
+    def __init__(self, aliases: Mapping[str, str], max_entries: int = 1024):
+        self._aliases = aliases
+        self._records = LRUCache(max_entries=max_entries)
+        self._canonical = LRUCache(max_entries=max_entries)
+
+    @staticmethod
+    def _key(label: str) -> str:
+        return content_key(label)
+
+    def resolve_input(self, crs_code: str) -> str:
+        label = crs_code.strip()
+        return self._aliases.get(label, label)
+
+    def get(self, crs_code: str) -> CRSRecord:
+        """Return the record for ``crs_code``; parse errors propagate and are not cached."""
+        label = crs_code.strip()
+        key = self._key(label)
+        record = self._records.get(key)
+        if record is not None:
+            return record
+        resolved = self.resolve_input(label)
+        crs = CRS.from_user_input(resolved)
+        record = CRSRecord(label, resolved, crs, self._canonical_for(label, crs))
+        self._records[key] = record
+        return record
+
+    def canonical(self, crs_code: str) -> str:
+        """Authority code for ``crs_code`` (aliases map to themselves), or the label."""
+        label = crs_code.strip()
+        key = self._key(label)
+        cached = self._canonical.get(key)
+        if cached is not None:
+            return cached
+        try:
+            canonical = self.get(label).canonical
+        except Exception:
+            canonical = label
+        self._canonical[key] = canonical
+        return canonical
+
+    def _canonical_for(self, label: str, crs: CRS) -> str:
+        if label in self._aliases:
+            return label
+        try:
+            authority = crs.to_authority()
+            if authority:
+                return f"{authority[0]}:{authority[1]}"
+        except Exception:
+            pass
+        return label
+
+    def clear(self) -> None:
+        self._records.clear()
+        self._canonical.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Optional[int]]]:
+        return {"records": self._records.stats(), "canonical": self._canonical.stats()}
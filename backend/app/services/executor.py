@@ -0,0 +1,179 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class BlockingExecutor:
+    """Bounded thread pool for blocking pyproj work called from async endpoints.
+
+    At most ``max_workers`` calls run at once and at most ``queue_depth`` more
+    wait for a worker; further submissions raise ``ExecutorSaturated`` instead
+    of piling up. Worker threads are long-lived, so the per-thread transformer
+    caches stay warm between requests.
+    """
+
+    def __init__(self, max_workers: int = 4, queue_depth: int = 64):
+        self.max_workers = max(1, int(max_workers))
+        self.queue_depth = max(0, int(queue_depth))
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_last = 0.0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="transform-worker"
+                )
+            return self._pool
+
+    def _admit(self, force: bool = False) -> None:
+        with self._lock:
+            if not force and self._admitted >= self.max_workers + self.queue_depth:
+                self.rejected += 1
+                raise ExecutorSaturated(
+                    f"Transform workers busy ({self.max_workers} running, {self.queue_depth} queued)"
+                )
+            self._admitted += 1
+            self.submitted += 1
+
+    def _call(self, enqueued: float, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        waited = time.perf_counter() - enqueued
+        with self._lock:
+            self._running += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._wait_last = waited
+        ok = False
+        try:
+            result = func(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._admitted -= 1
+                self.completed += 1
+                if not ok:
+                    self.failed += 1
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return await self._submit(func, args, kwargs)
+
+    async def _submit(self, func: Callable[..., Any], args: tuple, kwargs: dict, force: bool = False) -> Any:
+        self._admit(force)
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(
+                self._executor(), self._call, time.perf_counter(), func, args, kwargs
+            )
+        except Exception:
+            with self._lock:
+                self._admitted -= 1
+            raise
+        return await future
+
+    async def iterate(self, iterator: Iterator[Any]) -> AsyncIterator[Any]:
+        """Advance a blocking iterator on the workers, one item per task (for streaming bodies).
+
+        Workers are released between items. Steps skip the queue limit, so a
+        stream that has started is not cut off by ``ExecutorSaturated``.
+        """
+        done = object()
+        while True:
+            item = await self._submit(next, (iterator, done), {}, force=True)
+            if item is done:
+                return
+            yield item
+
+    def broadcast(self, func: Callable[[], Any], timeout: float = 30.0) -> Tuple[List[Any], bool]:
+        """Run ``func`` once per worker thread (blocking); used to warm per-thread caches.
+
+        The tasks are admitted like requests (skipping the queue limit), so
+        they show up in the queue and wait stats. A barrier holds every task
+        until all workers have picked one up, which forces them onto distinct
+        threads. Returns the results and whether the barrier was met: when
+        request traffic keeps a worker busy past ``timeout``, each task still
+        runs ``func`` once it starts, but possibly on a thread that already did.
+        """
+        barrier = threading.Barrier(self.max_workers)
+
+        def pinned() -> Any:
+            try:
+                barrier.wait(timeout)
+            except threading.BrokenBarrierError:
+                pass
+            return func()
+
+        futures = []
+        for _ in range(self.max_workers):
+            self._admit(force=True)
+            try:
+                futures.append(self._executor().submit(self._call, time.perf_counter(), pinned, (), {}))
+            except Exception:
+                with self._lock:
+                    self._admitted -= 1
+                raise
+        results = [future.result() for future in futures]
+        return results, not barrier.broken
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            started = self.completed + self._running
+            return {
+                "workers": self.max_workers,
+                "queue_depth": self.queue_depth,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "queue_wait_ms": {
+                    "last": round(self._wait_last * 1000, 3),
+                    "max": round(self._wait_max * 1000, 3),
+                    "mean": round(self._wait_total / started * 1000, 3) if started else 0.0,
+                },
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+BLOCKING_EXECUTOR = BlockingExecutor(
+    max_workers=int(os.getenv("TRANSFORM_WORKERS", "4")),
+    queue_depth=int(os.getenv("TRANSFORM_QUEUE_DEPTH", "64")),
+)
+
+
+def offload(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Expose a blocking endpoint function as ``async def`` that runs on BLOCKING_EXECUTOR.
+
+    ``functools.wraps`` keeps the original signature, so FastAPI still sees
+    the request parameters.
+    """
+
+    @functools.wraps(func)
+    async def endpoint(*args: Any, **kwargs: Any) -> Any:
+        return await BLOCKING_EXECUTOR.run(func, *args, **kwargs)
+
+    return endpoint
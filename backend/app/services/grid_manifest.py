@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from pyproj import datadir
+
+
+# Offline mode: PROJ networking stays off and transformation candidates whose
+# grids are not in the local manifest are skipped instead of attempted.
+OFFLINE_MODE = os.getenv("PROJ_OFFLINE", "0").lower() in ("1", "true", "yes", "on")
+
+
+def operation_grids(operation) -> List[str]:
+    """Grid file names used by a pyproj CoordinateOperation, including its steps."""
+    names: List[str] = []
+    try:
+        for grid in getattr(operation, "grids", None) or []:
+            name = grid.short_name or grid.full_name
+            if name and name not in names:
+                names.append(name)
+        for step in getattr(operation, "operations", None) or []:
+            for name in operation_grids(step):
+                if name not in names:
+                    names.append(name)
+    except Exception:
+        pass
+    return names
+
+
+def transformer_grids(transformer) -> List[str]:
+    """Grid file names a Transformer needs (empty for ``from_crs`` selections)."""
+    names: List[str] = []
+    for operation in getattr(transformer, "operations", None) or []:
+        for name in operation_grids(operation):
+            if name not in names:
+                names.append(name)
+    return names
+
+
+def _default_dirs() -> List[str]:
+    dirs: List[str] = []
+    for value in (os.environ.get("PROJ_DATA"), os.environ.get("PROJ_LIB"), datadir.get_data_dir()):
+        for part in (value or "").split(os.pathsep):
+            if part and part not in dirs:
+                dirs.append(part)
+    return dirs
+
+
+class GridManifest:
+    """Index of the grid files present in a set of local PROJ data directories.
+
+    Directories default to PROJ_DATA, PROJ_LIB and pyproj's data dir; the
+    index is built on first use and rebuilt by ``refresh`` (after grids are
+    added or removed).
+    """
+
+    def __init__(self, dirs: Optional[List[str]] = None):
+        self._dirs = list(dirs) if dirs else None
+        self._names: Optional[Set[str]] = None
+        self._scanned_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def dirs(self) -> List[str]:
+        return list(self._dirs) if self._dirs is not None else _default_dirs()
+
+    @property
+    def explicit(self) -> bool:
+        return self._dirs is not None
+
+    def _index(self) -> Set[str]:
+        names = self._names
+        if names is not None:
+            return names
+        with self._lock:
+            if self._names is None:
+                found: Set[str] = set()
+                for directory in self.dirs:
+                    try:
+                        for _, _, files in os.walk(directory):
+                            found.update(files)
+                    except Exception:
+                        continue
+                self._names = found
+                self._scanned_at = time.time()
+            return self._names
+
+    def present(self, name: str) -> bool:
+        return os.path.basename(name) in self._index()
+
+    def missing(self, names: Iterable[str]) -> List[str]:
+        return [name for name in names if not self.present(name)]
+
+    def refresh(self) -> None:
+        with self._lock:
+            self._names = None
+            self._scanned_at = None
+
+    def stats(self) -> Dict:
+        files = len(self._index())
+        return {
+            "dirs": self.dirs,
+            "files": files,
+            "scanned_at": self._scanned_at,
+        }
+
+
+GRID_MANIFEST = GridManifest(
+    [part for part in os.getenv("GRID_MANIFEST_DIRS", "").split(os.pathsep) if part] or None
+)
@@ -0,0 +1,401 @@
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.services.cache import RedisCache
+
+
+# A handler turns a validated payload into successive result chunks:
+# (chunk data, summary fields, points done so far, total points).
+JobChunk = Tuple[Dict[str, Any], Dict[str, Any], int, int]
+JobHandler = Callable[[Dict[str, Any], int], Iterator[JobChunk]]
+
+
+class MemoryJobStore:
+    """Job records, payloads, leases and result chunks held in process memory."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict] = {}
+        self._payloads: Dict[str, Dict] = {}
+        self._leases: Dict[str, Dict] = {}
+        self._chunks: Dict[Tuple[str, int], Dict] = {}
+        self._lock = threading.Lock()
+
+    def put(self, job: Dict) -> None:
+        with self._lock:
+            self._jobs[job["job_id"]] = json.loads(json.dumps(job))
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return json.loads(json.dumps(job)) if job is not None else None
+
+    def put_payload(self, job_id: str, payload: Dict) -> None:
+        with self._lock:
+            self._payloads[job_id] = payload
+
+    def get_payload(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._payloads.get(job_id)
+
+    def put_lease(self, job_id: str, lease: Dict) -> None:
+        with self._lock:
+            self._leases[job_id] = lease
+
+    def get_lease(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._leases.get(job_id)
+
+    def put_chunk(self, job_id: str, index: int, data: Dict) -> None:
+        with self._lock:
+            self._chunks[(job_id, index)] = data
+
+    def get_chunk(self, job_id: str, index: int) -> Optional[Dict]:
+        with self._lock:
+            return self._chunks.get((job_id, index))
+
+    def list_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._jobs)
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            self._payloads.pop(job_id, None)
+            self._leases.pop(job_id, None)
+            for key in [k for k in self._chunks if k[0] == job_id]:
+                del self._chunks[key]
+
+
+class FileJobStore:
+    """Job records, payloads, leases and chunks as JSON files under ``root/<job_id>/``; survives restarts."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _write(self, path: Path, value: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(value), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Any]:
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, job: Dict) -> None:
+        self._write(self.root / job["job_id"] / "job.json", job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self._read(self.root / job_id / "job.json")
+
+    def put_payload(self, job_id: str, payload: Dict) -> None:
+        self._write(self.root / job_id / "payload.json", payload)
+
+    def get_payload(self, job_id: str) -> Optional[Dict]:
+        return self._read(self.root / job_id / "payload.json")
+
+    def put_lease(self, job_id: str, lease: Dict) -> None:
+        self._write(self.root / job_id / "lease.json", lease)
+
+    def get_lease(self, job_id: str) -> Optional[Dict]:
+        return self._read(self.root / job_id / "lease.json")
+
+    def put_chunk(self, job_id: str, index: int, data: Dict) -> None:
+        self._write(self.root / job_id / f"chunk-{index}.json", data)
+
+    def get_chunk(self, job_id: str, index: int) -> Optional[Dict]:
+        return self._read(self.root / job_id / f"chunk-{index}.json")
+
+    def list_ids(self) -> List[str]:
+        return [p.name for p in self.root.iterdir() if (p / "job.json").exists()]
+
+    def delete(self, job_id: str) -> None:
+        job_dir = self.root / job_id
+        if job_dir.exists():
+            for path in job_dir.iterdir():
+                path.unlink()
+            job_dir.rmdir()
+
+
+class RedisJobStore:
+    """Job records, payloads, leases and chunks in Redis through ``RedisCache``, expiring after ``ttl`` seconds."""
+
+    def __init__(self, cache: RedisCache, ttl: int = 3600):
+        self.cache = cache
+        self.ttl = ttl
+
+    def put(self, job: Dict) -> None:
+        pipe = self.cache.pipeline()
+        pipe.set(f"jobs:{job['job_id']}", json.dumps(job), ex=self.ttl)
+        pipe.sadd("jobs:index", job["job_id"])
+        pipe.execute()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.cache.get_json(f"jobs:{job_id}")
+
+    def put_payload(self, job_id: str, payload: Dict) -> None:
+        self.cache.set_json(f"jobs:{job_id}:payload", payload, ex=self.ttl)
+
+    def get_payload(self, job_id: str) -> Optional[Dict]:
+        return self.cache.get_json(f"jobs:{job_id}:payload")
+
+    def put_lease(self, job_id: str, lease: Dict) -> None:
+        self.cache.set_json(f"jobs:{job_id}:lease", lease, ex=self.ttl)
+
+    def get_lease(self, job_id: str) -> Optional[Dict]:
+        return self.cache.get_json(f"jobs:{job_id}:lease")
+
+    def put_chunk(self, job_id: str, index: int, data: Dict) -> None:
+        self.cache.set_json(f"jobs:{job_id}:chunk:{index}", data, ex=self.ttl)
+
+    def get_chunk(self, job_id: str, index: int) -> Optional[Dict]:
+        return self.cache.get_json(f"jobs:{job_id}:chunk:{index}")
+
+    def list_ids(self) -> List[str]:
+        ids = list(self.cache.client.smembers("jobs:index"))
+        pipe = self.cache.pipeline()
+        for job_id in ids:
+            pipe.exists(f"jobs:{job_id}")
+        live = [job_id for job_id, exists in zip(ids, pipe.execute()) if exists]
+        stale = set(ids) - set(live)
+        if stale:
+            self.cache.client.srem("jobs:index", *stale)
+        return live
+
+    def delete(self, job_id: str) -> None:
+        keys = list(self.cache.client.scan_iter(f"jobs:{job_id}:chunk:*"))
+        self.cache.client.delete(f"jobs:{job_id}", f"jobs:{job_id}:payload", f"jobs:{job_id}:lease", *keys)
+        self.cache.client.srem("jobs:index", job_id)
+
+
+def job_store_from_env():
+    """Store selected by JOBS_BACKEND (memory | file | redis).
+
+    ``redis`` falls back to the file store (or memory when JOBS_DIR is unset)
+    if the server cannot be reached when the store is first used.
+    """
+    backend = os.getenv("JOBS_BACKEND", "memory").lower()
+    ttl = int(os.getenv("JOBS_TTL_SECONDS", "3600"))
+    jobs_dir = os.getenv("JOBS_DIR")
+    if backend == "redis":
+        try:
+            cache = RedisCache()
+            cache.client.ping()
+            return RedisJobStore(cache, ttl=ttl)
+        except Exception:
+            backend = "file" if jobs_dir else "memory"
+    if backend == "file":
+        return FileJobStore(jobs_dir or "/tmp/epsg_proj_jobs")
+    return MemoryJobStore()
+
+
+class JobManager:
+    """Queues bulk transform jobs and runs them on local background threads.
+
+    Handlers yield results chunk by chunk; each chunk is stored as soon as it
+    is produced, so progress and partial results are visible while a job runs.
+    The input payload is stored once, apart from the job record, so the
+    per-chunk progress updates stay small. ``store`` may also be a factory
+    returning the store, called on first use so that nothing connects at
+    import time.
+
+    Every job this manager queues carries a lease naming it as the owner,
+    renewed every ``lease / 3`` seconds while the job is queued or running
+    here. Unfinished jobs in a shared (file/redis) store are only re-queued
+    by another manager once their lease is older than ``lease`` seconds, so
+    a job is not picked up while a live worker still owns it.
+    """
+
+    def __init__(
+        self,
+        store,
+        handlers: Dict[str, JobHandler],
+        workers: int = 1,
+        chunk_size: int = 5000,
+        ttl: int = 3600,
+        lease: float = 60.0,
+    ):
+        self._store = store
+        self._store_resolved = not callable(store)
+        self._store_lock = threading.Lock()
+        self.handlers = handlers
+        self.workers = max(1, int(workers))
+        self.chunk_size = max(1, int(chunk_size))
+        self.ttl = ttl
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._recovered = False
+        self.lease = lease
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        # Jobs queued or running under this manager's lease.
+        self._owned: Set[str] = set()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    @property
+    def store(self):
+        if not self._store_resolved:
+            with self._store_lock:
+                if not self._store_resolved:
+                    self._store = self._store()
+                    self._store_resolved = True
+        return self._store
+
+    def _ensure_workers(self) -> None:
+        with self._lock:
+            if not self._recovered:
+                self._recovered = True
+                self._recover()
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name="job-worker", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            if self._heartbeat is None or not self._heartbeat.is_alive():
+                self._heartbeat = threading.Thread(target=self._renew, name="job-lease", daemon=True)
+                self._heartbeat.start()
+
+    def _claim(self, job_id: str) -> None:
+        self.store.put_lease(job_id, {"owner": self.owner, "heartbeat_at": time.time()})
+        self._owned.add(job_id)
+
+    def _owned_elsewhere(self, job_id: str) -> bool:
+        lease = self.store.get_lease(job_id)
+        return lease is not None and lease["owner"] != self.owner
+
+    def _stale(self, job_id: str) -> bool:
+        lease = self.store.get_lease(job_id)
+        # Records written before leases existed have none and count as stale.
+        return lease is None or (
+            lease["owner"] != self.owner and time.time() - lease["heartbeat_at"] > self.lease
+        )
+
+    def _recover(self) -> None:
+        # Unfinished jobs whose owner stopped renewing its lease (a crashed or
+        # restarted process, file/redis store) are claimed and re-queued.
+        for job_id in self.store.list_ids():
+            if job_id in self._owned:
+                continue
+            job = self.store.get(job_id)
+            if job and job["status"] in ("queued", "running") and self._stale(job_id):
+                self._claim(job_id)
+                job["status"] = "queued"
+                self.store.put(job)
+                self._queue.put(job_id)
+
+    def _renew(self) -> None:
+        while True:
+            time.sleep(self.lease / 3)
+            try:
+                for job_id in list(self._owned):
+                    self._claim(job_id)
+                with self._lock:
+                    self._recover()
+            except Exception:
+                pass
+
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Dict:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.purge_expired()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "progress": {"done": 0, "total": None},
+            "chunk_size": self.chunk_size,
+            "chunks": 0,
+            "summary": {},
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        self._claim(job["job_id"])
+        self.store.put_payload(job["job_id"], payload)
+        self.store.put(job)
+        self._queue.put(job["job_id"])
+        self._ensure_workers()
+        return job
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        job = self.store.get(job_id)
+        if job is not None:
+            job.pop("payload", None)
+        return job
+
+    def chunk(self, job_id: str, index: int) -> Optional[Dict]:
+        return self.store.get_chunk(job_id, index)
+
+    def delete(self, job_id: str) -> None:
+        self._owned.discard(job_id)
+        self.store.delete(job_id)
+
+    def purge_expired(self) -> None:
+        cutoff = time.time() - self.ttl
+        for job_id in self.store.list_ids():
+            job = self.store.get(job_id)
+            if job and job.get("finished_at") and job["finished_at"] < cutoff:
+                self.store.delete(job_id)
+
+    def run(self, job_id: str) -> None:
+        try:
+            self._run(job_id)
+        finally:
+            self._owned.discard(job_id)
+
+    def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job["status"] not in ("queued", "running"):
+            return
+        if self._owned_elsewhere(job_id):
+            # Another manager recovered the job after this one's lease lapsed
+            # (checked again before every chunk).
+            return
+        # Records written before payloads were stored separately carry it inline.
+        payload = job.pop("payload", None)
+        if payload is None:
+            payload = self.store.get_payload(job_id)
+        job.update(status="running", started_at=time.time(), chunks=0)
+        self.store.put(job)
+        try:
+            if payload is None:
+                raise ValueError("Job payload is missing (expired or deleted)")
+            for index, (data, summary, done, total) in enumerate(
+                self.handlers[job["kind"]](payload, self.chunk_size)
+            ):
+                if self._owned_elsewhere(job_id):
+                    return
+                self.store.put_chunk(job_id, index, data)
+                if index == 0:
+                    job["summary"] = summary
+                job["chunks"] = index + 1
+                job["progress"] = {"done": done, "total": total}
+                self.store.put(job)
+            job["status"] = "succeeded"
+        except Exception as exc:
+            job["status"] = "failed"
+            job["error"] = getattr(exc, "detail", None) or str(exc)
+        job["finished_at"] = time.time()
+        self.store.put(job)
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            try:
+                self.run(job_id)
+            except Exception:
+                pass
+            finally:
+                self._queue.task_done()
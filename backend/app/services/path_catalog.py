@@ -0,0 +1,186 @@
+import copy
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from pyproj import Transformer
+from pyproj.transformer import TransformerGroup
+
+from app.services.cache import LRUCache, PerThreadCache, SingleFlight
+from app.services.crs_registry import content_key
+from app.services.grid_manifest import operation_grids
+
+
+def serialize_paths(transformers: List[Transformer]) -> List[Dict]:
+    """Describe TransformerGroup members for the available-paths endpoints, best accuracy first."""
+    paths: List[Dict] = []
+    for i, transformer in enumerate(transformers):
+        ops_info: List[Dict[str, Optional[str]]] = []
+        for op in getattr(transformer, "operations", []) or []:
+            try:
+                ops_info.append(
+                    {
+                        "name": getattr(op, "name", None),
+                        "method_name": getattr(op, "method_name", None),
+                        "authority": getattr(op, "authority", None),
+                        "code": getattr(op, "code", None) or getattr(op, "id", None),
+                    }
+                )
+            except Exception:
+                # Best-effort only; keep going if unknown object shape
+                ops_info.append({})
+        paths.append(
+            {
+                "path_id": i,
+                "description": transformer.description,
+                "accuracy": transformer.accuracy,
+                "accuracy_unit": "meter",
+                "operations": [op.to_proj4() for op in transformer.operations],
+                "operations_info": ops_info,
+                "is_best_available": i == 0,
+            }
+        )
+    # Sort by numeric accuracy; None means unknown and sorts last
+    return sorted(
+        paths, key=lambda x: x["accuracy"] if x["accuracy"] is not None else float("inf")
+    )
+
+
+def _pipeline(transformer: Transformer) -> Optional[str]:
+    try:
+        return transformer.to_proj4()
+    except Exception:
+        return None
+
+
+class PathCatalog:
+    """Caches TransformerGroup enumeration per (source, target) input pair.
+
+    Enumeration runs once per pair: concurrent first requests wait for a
+    single leader, and a failed build is remembered for ``failure_ttl``
+    seconds. The leader shares the members' PROJJSON definitions and the
+    unavailable operations. Group transformers (reused for candidate
+    selection) are not thread-safe, so every other thread rebuilds its own
+    from those definitions with ``Transformer.from_pipeline``, which skips
+    the enumeration. PROJJSON does not round-trip every operation (PROJ
+    drops the direction of "Inverse of" steps), so a rebuilt member is only
+    used when its PROJ pipeline matches the leader's; otherwise that thread
+    enumerates its own group. The serialized path descriptions are plain
+    data and shared. Call ``invalidate`` after PROJ data or grid files
+    change, since the group contents depend on which grids are present.
+    """
+
+    def __init__(self, max_entries: int = 256, failure_ttl: float = 5.0):
+        self._entries = PerThreadCache(lambda: LRUCache(max_entries=max_entries))
+        self._paths = LRUCache(max_entries=max_entries)
+        # key -> (member pipeline definitions, unavailable operations)
+        self._groups = LRUCache(max_entries=max_entries)
+        self._flight = SingleFlight(failure_ttl=failure_ttl)
+        self.generation = 0
+        self.enumerations = 0
+        self._count_lock = threading.Lock()
+
+    @staticmethod
+    def _key(resolved_source: str, resolved_target: str) -> Tuple[str, str]:
+        return content_key(resolved_source.strip()), content_key(resolved_target.strip())
+
+    def _build_group(self, resolved_source: str, resolved_target: str) -> TransformerGroup:
+        with self._count_lock:
+            self.enumerations += 1
+        return TransformerGroup(
+            resolved_source,
+            resolved_target,
+            always_xy=True,
+            allow_superseded=True,
+        )
+
+    def _enumerate(self, key: Tuple[str, str], resolved_source: str, resolved_target: str) -> Tuple[List[Tuple[str, Optional[str]]], List[Dict]]:
+        generation = self.generation
+        group = self._build_group(resolved_source, resolved_target)
+        transformers = list(group.transformers)
+        shared = (
+            [(transformer.to_json(), _pipeline(transformer)) for transformer in transformers],
+            [{"name": op.name, "grids": operation_grids(op)} for op in group.unavailable_operations],
+        )
+        # Skip the store if invalidate() ran while PROJ was enumerating.
+        if generation == self.generation:
+            self._entries[key] = transformers
+            self._groups[key] = shared
+        return shared
+
+    def _group(self, key: Tuple[str, str], resolved_source: str, resolved_target: str) -> Tuple[Tuple[List[Tuple[str, Optional[str]]], List[Dict]], bool]:
+        """The pair's shared enumeration and whether this call performed it."""
+        shared = self._groups.get(key)
+        if shared is not None:
+            return shared, False
+        return self._flight.do(("group",) + key, lambda: self._enumerate(key, resolved_source, resolved_target))
+
+    @staticmethod
+    def _rebuild(definitions: List[Tuple[str, Optional[str]]]) -> Optional[List[Transformer]]:
+        """The members rebuilt from the leader's definitions, or None when any
+        of them does not reproduce the leader's PROJ pipeline."""
+        transformers = []
+        for definition, pipeline in definitions:
+            transformer = Transformer.from_pipeline(definition)
+            if pipeline is None or _pipeline(transformer) != pipeline:
+                return None
+            transformers.append(transformer)
+        return transformers
+
+    def _transformers(self, key: Tuple[str, str], resolved_source: str, resolved_target: str) -> List[Transformer]:
+        transformers = self._entries.get(key)
+        if transformers is not None:
+            return transformers
+        generation = self.generation
+        (definitions, _), enumerated = self._group(key, resolved_source, resolved_target)
+        if enumerated:
+            transformers = self._entries.get(key)
+            if transformers is not None:
+                return transformers
+        # The leader's objects belong to its thread; rebuild ours from its definitions.
+        transformers = self._rebuild(definitions)
+        if transformers is None:
+            transformers = list(self._build_group(resolved_source, resolved_target).transformers)
+        if generation == self.generation:
+            self._entries[key] = transformers
+        return transformers
+
+    def transformers(self, resolved_source: str, resolved_target: str) -> List[Transformer]:
+        """This thread's group transformers for the pair, building on a miss (errors propagate)."""
+        key = self._key(resolved_source, resolved_target)
+        return list(self._transformers(key, resolved_source, resolved_target))
+
+    def unavailable(self, resolved_source: str, resolved_target: str) -> List[Dict]:
+        """Operations PROJ left out of the group because their grids cannot be opened."""
+        key = self._key(resolved_source, resolved_target)
+        (_, unavailable), _ = self._group(key, resolved_source, resolved_target)
+        return copy.deepcopy(unavailable)
+
+    def paths(self, resolved_source: str, resolved_target: str) -> List[Dict]:
+        key = self._key(resolved_source, resolved_target)
+        paths = self._paths.get(key)
+        if paths is None:
+            def serialize() -> List[Dict]:
+                # to_proj4() on every operation is the expensive part; only do it on demand.
+                generation = self.generation
+                result = serialize_paths(self._transformers(key, resolved_source, resolved_target))
+                if generation == self.generation:
+                    self._paths[key] = result
+                return result
+
+            paths, _ = self._flight.do(("paths",) + key, serialize)
+        return copy.deepcopy(paths)
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+        self._paths.clear()
+        self._groups.clear()
+        self._flight.clear()
+        self.generation += 1
+
+    def stats(self) -> Dict:
+        stats = dict(self._entries.stats())
+        stats["serialized"] = self._paths.stats()
+        stats["builds"] = self._flight.stats()
+        stats["enumerations"] = self.enumerations
+        stats["generation"] = self.generation
+        return stats
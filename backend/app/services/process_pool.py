@@ -0,0 +1,143 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from pyproj import Transformer, datadir, network
+
+from app.services.cache import LRUCache
+
+
+# Worker-process state: transformers rebuilt from pipeline strings, kept warm
+# across tasks for the life of the process.
+_WORKER_TRANSFORMERS = LRUCache(max_entries=64)
+
+
+def _init_worker(data_dir: Optional[str], network_enabled: bool) -> None:
+    # Mirror the parent's PROJ search path (including the bundled proj_data dir).
+    if data_dir:
+        try:
+            datadir.set_data_dir(data_dir)
+        except Exception:
+            pass
+    try:
+        network.set_network_enabled(network_enabled)
+    except Exception:
+        pass
+
+
+def _worker_transform(pipeline: str, columns: Tuple[np.ndarray, ...]) -> Tuple[np.ndarray, ...]:
+    transformer = _WORKER_TRANSFORMERS.get(pipeline)
+    if transformer is None:
+        transformer = Transformer.from_pipeline(pipeline)
+        _WORKER_TRANSFORMERS[pipeline] = transformer
+    return tuple(np.asarray(col, dtype=float) for col in transformer.transform(*columns, errcheck=False))
+
+
+def pipeline_for(transformer: Transformer) -> Optional[str]:
+    """PROJ pipeline string that rebuilds ``transformer`` in another process.
+
+    Returns None when the transformer has no single-pipeline form, e.g. a
+    ``from_crs`` transformer that still chooses between several operations
+    per point; those must run in-process to keep their results.
+    """
+    try:
+        pipeline = transformer.to_proj4()
+    except Exception:
+        return None
+    return pipeline or None
+
+
+class ProcessPoolBackend:
+    """Opt-in multi-process execution for very large coordinate arrays.
+
+    Arrays with at least ``min_points`` rows are split into contiguous shards,
+    transformed by worker processes and concatenated back in order. Workers
+    receive the transformer as a PROJ pipeline string (PJ objects cannot be
+    pickled) and cache the rebuilt transformer. ``transform`` returns None
+    whenever the work should stay in-process: backend disabled, small input,
+    no pipeline form, or a worker failure.
+    """
+
+    def __init__(self, workers: int = 0, min_points: int = 100_000):
+        self.workers = max(0, int(workers))
+        self.min_points = max(1, int(min_points))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.tasks = 0
+        self.shards = 0
+        self.fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that already runs PROJ worker threads is unsafe.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(datadir.get_data_dir(), network.is_network_enabled()),
+                )
+            return self._pool
+
+    def transform(
+        self, transformer: Transformer, columns: Sequence[np.ndarray]
+    ) -> Optional[Tuple[np.ndarray, ...]]:
+        count = len(columns[0]) if columns else 0
+        if not self.enabled or count < self.min_points:
+            return None
+        pipeline = pipeline_for(transformer)
+        if pipeline is None:
+            with self._lock:
+                self.fallbacks += 1
+            return None
+
+        bounds = np.linspace(0, count, self.workers + 1, dtype=int)
+        try:
+            pool = self._executor()
+            futures = [
+                pool.submit(
+                    _worker_transform,
+                    pipeline,
+                    tuple(np.ascontiguousarray(col[start:stop], dtype=float) for col in columns),
+                )
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            parts = [future.result() for future in futures]
+        except Exception:
+            with self._lock:
+                self.fallbacks += 1
+            return None
+
+        with self._lock:
+            self.tasks += 1
+            self.shards += len(parts)
+        return tuple(np.concatenate([part[i] for part in parts]) for i in range(len(columns)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "min_points": self.min_points,
+                "tasks": self.tasks,
+                "shards": self.shards,
+                "fallbacks": self.fallbacks,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+PROCESS_POOL = ProcessPoolBackend(
+    workers=int(os.getenv("TRANSFORM_PROCESSES", "0")),
+    min_points=int(os.getenv("TRANSFORM_PROCESS_MIN_POINTS", "100000")),
+)
@@ -0,0 +1,173 @@
+import itertools
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from app.services.binary_columns import encode_columns
+from app.services.executor import BLOCKING_EXECUTOR
+
+try:  # optional fast encoder
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+# Same per-point shape as the default response, encoded by the fast path.
+RECORDS_MEDIA_TYPE = "application/vnd.epsg-proj.records+json"
+# Struct-of-arrays responses: one array per field instead of one object per point.
+COLUMNAR_MEDIA_TYPE = "application/vnd.epsg-proj.columnar+json"
+# Streamed bodies: one JSON document per line, one line per point or per chunk.
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+COLUMNAR_NDJSON_MEDIA_TYPE = "application/vnd.epsg-proj.columnar+ndjson"
+
+# json: historical shape through FastAPI's encoder (the default).
+LAYOUTS = ("json", "records", "columnar", "ndjson", "ndjson-columnar")
+STREAM_LAYOUTS = ("ndjson", "ndjson-columnar")
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "1000"))
+
+
+def negotiate_layout(accept: Optional[str], format: Optional[str]) -> str:
+    """Response layout from the ``format`` query parameter or, failing that, ``Accept``.
+
+    Unknown ``format`` values raise ValueError.
+    """
+    if format:
+        layout = format.strip().lower()
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown format '{format}' (expected one of: {', '.join(LAYOUTS)})")
+        return layout
+    if accept:
+        if COLUMNAR_NDJSON_MEDIA_TYPE in accept:
+            return "ndjson-columnar"
+        if NDJSON_MEDIA_TYPE in accept:
+            return "ndjson"
+        if COLUMNAR_MEDIA_TYPE in accept:
+            return "columnar"
+        if RECORDS_MEDIA_TYPE in accept:
+            return "records"
+    return "json"
+
+
+def _json_default(value: Any) -> Any:
+    # Fallback encoder hook: NumPy arrays/scalars to JSON, non-finite floats to null.
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == "f":
+            out = value.astype(object)
+            out[~np.isfinite(value)] = None
+            return out.tolist()
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode ``payload`` (which may hold NumPy arrays) straight to JSON bytes.
+
+    Uses orjson when installed: arrays are written without a Python-list
+    round trip and NaN/inf become null.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def timed_response(payload: Any, layout: str, compute_seconds: float) -> Response:
+    """Serialize an endpoint result and report compute and serialization time.
+
+    ``json`` goes through the same jsonable_encoder/JSONResponse path FastAPI
+    would use, so its body is unchanged; ``records`` and ``columnar`` use
+    ``dumps``. Both timings are sent as a ``Server-Timing`` header (milliseconds).
+    """
+    started = time.perf_counter()
+    if layout == "columnar":
+        response: Response = Response(content=dumps(payload), media_type=COLUMNAR_MEDIA_TYPE)
+    elif layout == "records":
+        response = Response(content=dumps(payload), media_type=RECORDS_MEDIA_TYPE)
+    else:
+        response = JSONResponse(content=jsonable_encoder(payload))
+    _add_timing(response, compute_seconds, time.perf_counter() - started)
+    return response
+
+
+def binary_response(
+    columns: Dict[str, np.ndarray], kind: str, meta: Dict[str, Any], compute_seconds: float
+) -> Response:
+    """Float64 columns as a binary body of media type ``kind`` (see binary_columns).
+
+    ``meta`` (CRS, units, accuracy, ...) is embedded by the raw and Arrow
+    formats and always sent as compact JSON in ``X-Columns-Meta``.
+    """
+    started = time.perf_counter()
+    response = Response(
+        content=encode_columns(columns, kind, meta),
+        media_type=kind,
+        headers={"X-Columns-Meta": json.dumps(meta, separators=(",", ":"), default=_json_default)},
+    )
+    _add_timing(response, compute_seconds, time.perf_counter() - started)
+    return response
+
+
+def _add_timing(response: Response, compute_seconds: float, serialize_seconds: float) -> None:
+    response.headers["Server-Timing"] = (
+        f"compute;dur={compute_seconds * 1000:.3f}, serialize;dur={serialize_seconds * 1000:.3f}"
+    )
+
+
+# (chunk data, summary fields, points done so far, total points), as yielded
+# by trajectory_chunks / local_trajectory_chunks.
+ResultChunk = Tuple[Dict[str, Any], Dict[str, Any], int, int]
+
+
+def ndjson_lines(chunks: Iterator[ResultChunk], layout: str, chunk_size: int) -> Iterator[bytes]:
+    """NDJSON body for successive result chunks, one ``bytes`` block per chunk.
+
+    The first line is ``{"meta": {...}}`` (the summary fields plus ``count``
+    and ``chunk_size``). Then ``ndjson`` writes one line per point entry and
+    ``ndjson-columnar`` one ``{"offset", "count", <columns>}`` frame per chunk.
+    The last line is ``{"done": true, ...}``. Once the first chunk is out the
+    status code is fixed, so a later failure ends the stream with an
+    ``{"error", "count"}`` line instead (``count``: points already written).
+    """
+    started = time.perf_counter()
+    data, summary, done, total = next(chunks)
+    head = dumps({"meta": {**summary, "count": total, "chunk_size": chunk_size}}) + b"\n"
+    yield head + _chunk_lines(data, 0, done, layout)
+    try:
+        for data, _, stop, _ in chunks:
+            yield _chunk_lines(data, done, stop, layout)
+            done = stop
+    except Exception as exc:
+        yield dumps({"error": getattr(exc, "detail", None) or str(exc), "count": done}) + b"\n"
+        return
+    yield dumps({"done": True, "count": total, "seconds": round(time.perf_counter() - started, 4)}) + b"\n"
+
+
+def _chunk_lines(data: Dict[str, Any], start: int, stop: int, layout: str) -> bytes:
+    if layout == "ndjson-columnar":
+        return dumps({"offset": start, "count": stop - start, **data}) + b"\n"
+    (entries,) = data.values()
+    return b"".join(dumps(entry) + b"\n" for entry in entries)
+
+
+def streaming_response(chunks: Iterator[ResultChunk], layout: str, chunk_size: int) -> StreamingResponse:
+    """Stream ``chunks`` as NDJSON, computing each chunk on BLOCKING_EXECUTOR.
+
+    The first chunk is computed before returning, so invalid requests still
+    fail with a status code; ``Server-Timing`` reports its cost. Later chunks
+    are computed as the client reads, which keeps memory at one chunk.
+    """
+    started = time.perf_counter()
+    lines = ndjson_lines(chunks, layout, chunk_size)
+    first = next(lines)
+    media_type = COLUMNAR_NDJSON_MEDIA_TYPE if layout == "ndjson-columnar" else NDJSON_MEDIA_TYPE
+    return StreamingResponse(
+        BLOCKING_EXECUTOR.iterate(itertools.chain([first], lines)),
+        media_type=media_type,
+        headers={"Server-Timing": f"first-chunk;dur={(time.perf_counter() - started) * 1000:.3f}"},
+    )
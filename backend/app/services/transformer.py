@@ -1,37 +1,69 @@
-from typing import List, Dict, Optional, Tuple, cast
+from typing import Iterable, Iterator, List, Dict, Optional, Sequence, Tuple, cast
 
 from pathlib import Path
 
+import copy
 import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
-from pyproj import CRS, Transformer, Proj, datadir, network
-from pyproj.transformer import TransformerGroup
+from pyproj import CRS, Transformer, datadir, network
+from pyproj.exceptions import CRSError
 
+from app.services.cache import LRUCache, PerThreadCache, RedisCache, SingleFlight, TieredCache
+from app.services.crs_registry import CRSRecord, CRSRegistry, LazyDefinitions, content_key, crs_units, ensure_3d, geodetic_crs, proj_db_version
+from app.services.grid_manifest import GRID_MANIFEST, OFFLINE_MODE, transformer_grids
+from app.services.path_catalog import PathCatalog
+from app.services.process_pool import PROCESS_POOL
 
-# Ensure grid-backed operations can be resolved (downloads permitted when network
-# access is available).
-try:  # pragma: no cover - defensive only
-    network.set_network_enabled(True)
-except Exception:
-    pass
 
 _LOCAL_PROJ_DATA = Path(__file__).resolve().parents[2] / "proj_data"
 if _LOCAL_PROJ_DATA.exists():  # pragma: no cover - path detection
     datadir.append_data_dir(str(_LOCAL_PROJ_DATA))
 
 
-CUSTOM_CRS_ALIASES: Dict[str, str] = {
-    "GIGS:OSGB36_3D": CRS.from_epsg(4277).to_3d().to_wkt(),
-    "GIGS:AMERSFOORT_3D": CRS.from_epsg(4289).to_3d().to_wkt(),
-    "GIGS:projCRS_A2": CRS.from_proj4(
+_NETWORK_LOCK = threading.Lock()
+_network_ready = False
+
+
+def ensure_proj_network() -> None:
+    """Enable PROJ network access (grid downloads) once, on first transform use.
+
+    Deferred from import time so that workers, tests and scripts that never
+    transform do not pay for it. In offline mode (PROJ_OFFLINE) networking is
+    switched off instead and explicit GRID_MANIFEST_DIRS join PROJ's search
+    path, so grids resolve only from the local manifest.
+    """
+    global _network_ready
+    if _network_ready:
+        return
+    with _NETWORK_LOCK:
+        if not _network_ready:
+            try:  # pragma: no cover - defensive only
+                network.set_network_enabled(not OFFLINE_MODE)
+            except Exception:
+                pass
+            if OFFLINE_MODE and GRID_MANIFEST.explicit:
+                for directory in GRID_MANIFEST.dirs:
+                    if directory not in datadir.get_data_dir().split(os.pathsep):
+                        datadir.append_data_dir(directory)
+            _network_ready = True
+
+
+# Definitions are built on first lookup (see LazyDefinitions) rather than at import.
+CUSTOM_CRS_ALIASES = LazyDefinitions({
+    "GIGS:OSGB36_3D": lambda: CRS.from_epsg(4277).to_3d().to_wkt(),
+    "GIGS:AMERSFOORT_3D": lambda: CRS.from_epsg(4289).to_3d().to_wkt(),
+    "GIGS:projCRS_A2": lambda: CRS.from_proj4(
         "+proj=tmerc +lat_0=49 +lon_0=-2 +k=0.9996012717 "
         "+x_0=400000 +y_0=-100000 +ellps=WGS84 +units=m +no_defs"
     ).to_wkt(),
-    "GIGS:projCRS_A23": CRS.from_proj4(
+    "GIGS:projCRS_A23": lambda: CRS.from_proj4(
         "+proj=utm +zone=31 +ellps=WGS84 +units=us-ft +no_defs"
     ).to_wkt(),
-}
+})
 
 ALIAS_EQUIVALENTS: Dict[str, str] = {
     "GIGS:OSGB36_3D": "EPSG:4277",
@@ -144,30 +176,149 @@ CHAINED_PATHS: Dict[Tuple[str, str], Dict[str, object]] = {
 }
 
 
+CRS_REGISTRY = CRSRegistry(
+    CUSTOM_CRS_ALIASES,
+    max_entries=int(os.getenv("CRS_REGISTRY_SIZE", "1024")),
+)
+
+
+def _transformer_weight(transformer: Transformer) -> int:
+    # Approximate footprint by the length of the PROJ pipeline definition.
+    return len(transformer.definition or "") + 1024
+
+
+# Shared by every TransformationService instance so that selected transformers
+# survive across requests instead of being rebuilt per call. Partitioned per
+# thread: TransformerGroup members must not be used by two threads at once.
+TRANSFORMER_CACHE = PerThreadCache(
+    lambda: LRUCache(
+        max_entries=int(os.getenv("TRANSFORMER_CACHE_SIZE", "512")),
+        max_weight=int(os.getenv("TRANSFORMER_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+        weigher=_transformer_weight,
+    )
+)
+
+
+# Compiled CHAINED_PATHS entries keyed by (canonical source, canonical target).
+CHAIN_CACHE = PerThreadCache(lambda: LRUCache(max_entries=int(os.getenv("CHAIN_CACHE_SIZE", "64"))))
+
+
+# Seconds a failed transformer build is remembered before it is retried.
+_FAILURE_TTL = float(os.getenv("TRANSFORMER_FAILURE_TTL", "5"))
+
+PATH_CATALOG = PathCatalog(
+    max_entries=int(os.getenv("PATH_CATALOG_SIZE", "256")),
+    failure_ttl=_FAILURE_TTL,
+)
+
+# Rows of a vectorized transform still non-finite after one vectorized retry
+# that are retried with scalar calls (see transform_columns).
+SCALAR_RETRY_LIMIT = int(os.getenv("TRANSFORM_SCALAR_RETRY_LIMIT", "32"))
+
+# Transformer.from_crs objects re-create their PJ per thread, so unlike
+# TransformerGroup members they can be shared by every thread.
+LOCAL_OFFSET_TRANSFORMERS = LRUCache(max_entries=int(os.getenv("LOCAL_OFFSET_TRANSFORMERS_SIZE", "64")))
+
+# Local-offset reference contexts keyed by (CRS, reference rounded to
+# LOCAL_OFFSET_CONTEXT_DIGITS decimals of degrees and of metres of height).
+# Contexts are built from the rounded reference, so results do not depend on
+# which request populated the cache; 12 digits is about 0.1 um on the ground.
+LOCAL_OFFSET_CONTEXTS = LRUCache(max_entries=int(os.getenv("LOCAL_OFFSET_CONTEXT_CACHE_SIZE", "256")))
+_CONTEXT_DIGITS = int(os.getenv("LOCAL_OFFSET_CONTEXT_DIGITS", "12"))
+TRANSFORMER_BUILDS = SingleFlight(failure_ttl=_FAILURE_TTL)
+
+
+# Offline mode: per resolved pair, the group candidates (and PROJ-unavailable
+# operations) whose grids are missing from GRID_MANIFEST. Plain data, shared.
+OFFLINE_SKIPS = LRUCache(max_entries=int(os.getenv("PATH_CATALOG_SIZE", "256")))
+
+# Validated suggest-vias results keyed by (canonical source, canonical target).
+VIA_SUGGESTION_CACHE = LRUCache(max_entries=int(os.getenv("VIA_SUGGESTION_CACHE_SIZE", "256")))
+
+# Bump when the cached metadata response shapes or CUSTOM_CRS_ALIASES change.
+_METADATA_SCHEMA = "1"
+
+
+def _metadata_version() -> str:
+    """Cache version for CRS metadata: schema, PROJ and EPSG database versions."""
+    return f"{_METADATA_SCHEMA}-{proj_db_version()}"
+
+
+def _metadata_redis() -> Optional[RedisCache]:
+    if os.getenv("CRS_CACHE_REDIS", "1").lower() not in ("1", "true", "yes", "on"):
+        return None
+    timeout = float(os.getenv("CRS_CACHE_REDIS_TIMEOUT", "0.25"))
+    try:
+        return RedisCache(socket_connect_timeout=timeout, socket_timeout=timeout)
+    except Exception:
+        return None
+
+
+# /api/crs/info, /parameters and /units responses. They depend only on the
+# PROJ database, so they are shared between processes through Redis.
+CRS_METADATA_CACHE = TieredCache(
+    "crs-meta",
+    version=_metadata_version,
+    redis=_metadata_redis,  # connects on first use
+    max_entries=int(os.getenv("CRS_CACHE_SIZE", "2048")),
+    ttl=int(os.getenv("CRS_CACHE_TTL", "86400")),
+    negative_ttl=int(os.getenv("CRS_CACHE_NEGATIVE_TTL", "300")),
+    negative_errors=(CRSError, ValueError),
+)
+
+_VIA_POOL: Optional[ThreadPoolExecutor] = None
+_VIA_POOL_LOCK = threading.Lock()
+
+
+def _via_pool() -> ThreadPoolExecutor:
+    global _VIA_POOL
+    with _VIA_POOL_LOCK:
+        if _VIA_POOL is None:
+            _VIA_POOL = ThreadPoolExecutor(
+                max_workers=max(1, int(os.getenv("SUGGEST_VIAS_WORKERS", "4"))),
+                thread_name_prefix="suggest-vias",
+            )
+        return _VIA_POOL
+
+
+def invalidate_transform_caches() -> None:
+    """Drop every cached transformer; call after PROJ data or grid files change."""
+    PATH_CATALOG.invalidate()
+    CHAIN_CACHE.clear()
+    TRANSFORMER_CACHE.clear()
+    VIA_SUGGESTION_CACHE.clear()
+    LOCAL_OFFSET_TRANSFORMERS.clear()
+    LOCAL_OFFSET_CONTEXTS.clear()
+    TRANSFORMER_BUILDS.clear()
+    OFFLINE_SKIPS.clear()
+    CRS_METADATA_CACHE.clear()
+    GRID_MANIFEST.refresh()
+
+
+def _transform_1d(transformer: Transformer, columns: Sequence[np.ndarray]) -> Tuple[np.ndarray, ...]:
+    """``transformer.transform`` over 1-D columns, returning float64 arrays.
+
+    pyproj sends size-1 arrays down its scalar path (a NumPy deprecation
+    warning, an error in future releases), so a single row is passed as floats.
+    """
+    if len(columns[0]) == 1:
+        return tuple(np.array([value], dtype=float) for value in transformer.transform(*(float(col[0]) for col in columns)))
+    return tuple(np.array(col, dtype=float) for col in transformer.transform(*columns))
+
+
 class TransformationService:
     def __init__(self):
-        self.transformer_cache: Dict[str, Transformer] = {}
+        ensure_proj_network()
+        self.transformer_cache = TRANSFORMER_CACHE
 
     def _canonical_crs(self, crs_code: str) -> str:
-        label = crs_code.strip()
-        if label in CUSTOM_CRS_ALIASES:
-            return label
-        try:
-            crs = CRS.from_user_input(label)
-            authority = crs.to_authority()
-            if authority:
-                return f"{authority[0]}:{authority[1]}"
-        except Exception:
-            pass
-        return label
+        return CRS_REGISTRY.canonical(crs_code)
 
     def _resolve_crs_input(self, crs_code: str) -> str:
-        label = crs_code.strip()
-        return CUSTOM_CRS_ALIASES.get(label, label)
+        return CRS_REGISTRY.resolve_input(crs_code)
 
     def _crs_from_input(self, crs_code: str) -> CRS:
-        resolved = self._resolve_crs_input(crs_code)
-        return CRS.from_user_input(resolved)
+        return CRS_REGISTRY.get(crs_code).crs
 
     @staticmethod
     def _values_finite(*values: Optional[float]) -> bool:
@@ -202,6 +353,74 @@ class TransformationService:
             return []
         return [str(item).lower() for item in preferred_ops if item]
 
+    @staticmethod
+    def _cache_key(
+        canonical_source: str,
+        canonical_target: str,
+        path_id: Optional[int],
+        ops_lower: List[str],
+    ) -> str:
+        return (
+            f"{canonical_source}->{canonical_target}"
+            f"#path={'auto' if path_id is None else path_id}"
+            f"#ops={'|'.join(ops_lower) if ops_lower else 'default'}"
+        )
+
+    @staticmethod
+    def _offline_skips(resolved_source: str, resolved_target: str) -> List[Dict]:
+        """Paths for the pair whose grids are missing from GRID_MANIFEST.
+
+        Group members carry their ``path_id``; operations PROJ could not
+        instantiate at all carry ``path_id`` None.
+        """
+        key = (content_key(resolved_source.strip()), content_key(resolved_target.strip()))
+        skips = OFFLINE_SKIPS.get(key)
+        if skips is not None:
+            return skips
+        try:
+            group = PATH_CATALOG.transformers(resolved_source, resolved_target)
+            unavailable = PATH_CATALOG.unavailable(resolved_source, resolved_target)
+        except Exception:
+            return []
+        skips = []
+        for index, transformer in enumerate(group):
+            missing = GRID_MANIFEST.missing(transformer_grids(transformer))
+            if missing:
+                skips.append({"path_id": index, "description": transformer.description, "missing_grids": missing})
+        for operation in unavailable:
+            skips.append(
+                {
+                    "path_id": None,
+                    "description": operation["name"],
+                    "missing_grids": GRID_MANIFEST.missing(operation["grids"]) or operation["grids"],
+                }
+            )
+        OFFLINE_SKIPS[key] = skips
+        return skips
+
+    def skipped_paths(self, source_crs: str, target_crs: str) -> Optional[List[Dict]]:
+        """Offline mode: the paths left out for lack of local grids (per step for
+        CHAINED_PATHS pairs). None when offline mode is off."""
+        if not OFFLINE_MODE:
+            return None
+        canonical_source = self._canonical_crs(source_crs)
+        canonical_target = self._canonical_crs(target_crs)
+        chain = CHAINED_PATHS.get((canonical_source, canonical_target))
+        if chain:
+            pairs = [
+                (step_source, step_target)
+                for step_source, step_target, hint in self._chain_steps(canonical_source, canonical_target, chain)
+                if hint is not None
+            ]
+        else:
+            pairs = [(source_crs, target_crs)]
+
+        skipped: List[Dict] = []
+        for pair_source, pair_target in pairs:
+            for entry in self._offline_skips(self._resolve_crs_input(pair_source), self._resolve_crs_input(pair_target)):
+                skipped.append({"source_crs": pair_source, "target_crs": pair_target, **entry})
+        return skipped
+
     def _candidate_transformers(
         self,
         resolved_source: str,
@@ -211,31 +430,34 @@ class TransformationService:
         ops_lower: List[str],
     ) -> List[Transformer]:
         try:
-            group = TransformerGroup(
-                resolved_source,
-                resolved_target,
-                always_xy=True,
-                allow_superseded=True,
-            )
-            base_transformers = list(group.transformers)
+            base_transformers = PATH_CATALOG.transformers(resolved_source, resolved_target)
         except Exception:
             base_transformers = []
 
+        group: List[Optional[Transformer]] = list(base_transformers)
+        if OFFLINE_MODE:
+            # Never attempt a path whose grids are not available locally; the
+            # slot stays so that path_id still indexes the full group.
+            skipped = {entry["path_id"] for entry in self._offline_skips(resolved_source, resolved_target)}
+            group = [None if index in skipped else transformer for index, transformer in enumerate(group)]
+
         candidates: List[Transformer] = []
 
-        def append(transformer: Transformer) -> None:
+        def append(transformer: Optional[Transformer]) -> None:
+            if transformer is None:
+                return
             if all(id(transformer) != id(existing) for existing in candidates):
                 candidates.append(transformer)
 
-        if path_id is not None and 0 <= path_id < len(base_transformers):
-            append(base_transformers[path_id])
+        if path_id is not None and 0 <= path_id < len(group):
+            append(group[path_id])
 
         if not candidates and ops_lower:
-            for transformer in base_transformers:
-                if self._transformer_matches(transformer, ops_lower):
+            for transformer in group:
+                if transformer is not None and self._transformer_matches(transformer, ops_lower):
                     append(transformer)
 
-        for transformer in base_transformers:
+        for transformer in group:
             append(transformer)
 
         if not candidates:
@@ -266,11 +488,7 @@ class TransformationService:
         resolved_target = self._resolve_crs_input(target_crs)
 
         ops_lower = self._collect_preferred_ops(preferred_ops)
-        cache_key = (
-            f"{canonical_source}->{canonical_target}"
-            f"#path={'auto' if path_id is None else path_id}"
-            f"#ops={'|'.join(ops_lower) if ops_lower else 'default'}"
-        )
+        cache_key = self._cache_key(canonical_source, canonical_target, path_id, ops_lower)
 
         def attempt(transformer: Transformer) -> Tuple[float, float, Optional[float]]:
             x_out, y_out, z_out = self._apply_transform(transformer, x, y, z)
@@ -309,6 +527,185 @@ class TransformationService:
             raise last_error
         raise RuntimeError("No suitable transformer available")
 
+    @staticmethod
+    def _finite_mask(
+        x: np.ndarray,
+        y: np.ndarray,
+        z: Optional[np.ndarray],
+    ) -> np.ndarray:
+        mask = np.isfinite(x) & np.isfinite(y)
+        if z is not None:
+            mask &= np.isfinite(z)
+        return mask
+
+    def _apply_transform_arrays(
+        self,
+        transformer: Transformer,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        zs: Optional[np.ndarray],
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        columns = (xs, ys, zs) if zs is not None else (xs, ys)
+        out = PROCESS_POOL.transform(transformer, columns)
+        if out is None:
+            out = tuple(np.asarray(col, dtype=float) for col in transformer.transform(*columns))
+        if zs is not None:
+            return out[0], out[1], out[2]
+        return out[0], out[1], None
+
+    def _transform_arrays_with_candidates(
+        self,
+        candidates: Iterable[Transformer],
+        xs: np.ndarray,
+        ys: np.ndarray,
+        zs: Optional[np.ndarray],
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray], List[Transformer], np.ndarray]:
+        """Push all points through the first candidate, then retry only the
+        points that came back non-finite against the following candidates.
+
+        ``candidates`` is consumed lazily, so later entries are never built when
+        the first one covers every point. Returns the outputs (NaN where no
+        candidate succeeded), the transformers that produced any of them, and
+        per point the index into that list (-1 where no candidate succeeded).
+        """
+        count = len(xs)
+        x_out = np.full(count, np.nan)
+        y_out = np.full(count, np.nan)
+        z_out = np.full(count, np.nan) if zs is not None else None
+        producer = np.full(count, -1, dtype=np.int64)
+        # Non-finite inputs can never succeed; keep them out of the retry loop.
+        pending = self._finite_mask(xs, ys, zs)
+        used: List[Transformer] = []
+        tried: List[int] = []
+        errors: List[Exception] = []
+
+        if not pending.any():
+            if count == 0:
+                return x_out, y_out, z_out, used, producer
+            raise ValueError("No finite input coordinates")
+
+        for transformer in candidates:
+            if not pending.any():
+                break
+            if id(transformer) in tried:
+                continue
+            tried.append(id(transformer))
+            idx = np.flatnonzero(pending)
+            try:
+                rx, ry, rz = self._apply_transform_arrays(
+                    transformer,
+                    xs[idx],
+                    ys[idx],
+                    zs[idx] if zs is not None else None,
+                )
+            except Exception as exc:
+                errors.append(exc)
+                continue
+            ok = self._finite_mask(rx, ry, rz)
+            if not ok.any():
+                errors.append(ValueError("Transformer produced non-finite output"))
+                continue
+            done = idx[ok]
+            x_out[done] = rx[ok]
+            y_out[done] = ry[ok]
+            if z_out is not None and rz is not None:
+                z_out[done] = rz[ok]
+            pending[done] = False
+            producer[done] = len(used)
+            used.append(transformer)
+
+        if not used:
+            if errors:
+                raise errors[-1]
+            raise RuntimeError("No suitable transformer available")
+        return x_out, y_out, z_out, used, producer
+
+    @staticmethod
+    def _accuracy_of(used: List[Transformer]) -> Optional[float]:
+        known = [t.accuracy for t in used if t.accuracy is not None]
+        return max(known) if known else None
+
+    @staticmethod
+    def _catalog_path_id(
+        transformer: Transformer, resolved_source: str, resolved_target: str
+    ) -> Optional[int]:
+        """Index of ``transformer`` in the pair's TransformerGroup (the ``path_id``
+        reported by /available-paths), or None for non-group fallbacks."""
+        try:
+            group = PATH_CATALOG.transformers(resolved_source, resolved_target)
+        except Exception:
+            return None
+        for index, member in enumerate(group):
+            if member is transformer:
+                return index
+        # Cached transformers can outlive a catalog eviction; match by definition.
+        definition = getattr(transformer, "definition", None)
+        for index, member in enumerate(group):
+            if definition is not None and member.definition == definition:
+                return index
+        return None
+
+    def _run_transform_arrays(
+        self,
+        source_crs: str,
+        target_crs: str,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        zs: Optional[np.ndarray],
+        *,
+        path_id: Optional[int] = None,
+        preferred_ops: Optional[List[str]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray], Optional[float], np.ndarray]:
+        """Array counterpart of ``_run_transform``.
+
+        All points go through the cached (or first) transformer in one call;
+        only the points that come back non-finite are retried against the
+        remaining candidates. Points no candidate can handle stay NaN. Raises
+        like ``_run_transform`` when no candidate produces any finite output.
+
+        The last element holds, per point, the ``path_id`` of the group
+        transformer that produced it (-1 for failures and non-group fallbacks).
+        """
+        canonical_source = self._canonical_crs(source_crs)
+        canonical_target = self._canonical_crs(target_crs)
+        ops_lower = self._collect_preferred_ops(preferred_ops)
+        cache_key = self._cache_key(canonical_source, canonical_target, path_id, ops_lower)
+        cached = self.transformer_cache.get(cache_key)
+
+        def candidates() -> Iterator[Transformer]:
+            if cached is not None:
+                yield cached
+            yield from self._candidate_transformers(
+                self._resolve_crs_input(source_crs),
+                self._resolve_crs_input(target_crs),
+                path_id=path_id,
+                ops_lower=ops_lower,
+            )
+
+        try:
+            x_out, y_out, z_out, used, producer = self._transform_arrays_with_candidates(
+                candidates(), xs, ys, zs
+            )
+        except Exception:
+            if cached is not None:
+                self.transformer_cache.pop(cache_key, None)
+            raise
+        if used and used[0] is not cached:
+            self.transformer_cache[cache_key] = used[0]
+
+        resolved_source = self._resolve_crs_input(source_crs)
+        resolved_target = self._resolve_crs_input(target_crs)
+        lookup = np.array(
+            [
+                -1 if pid is None else pid
+                for pid in (self._catalog_path_id(t, resolved_source, resolved_target) for t in used)
+            ]
+            + [-1],
+            dtype=np.int64,
+        )
+        # producer == -1 indexes the trailing -1 sentinel.
+        return x_out, y_out, z_out, self._accuracy_of(used), lookup[producer]
+
     def _build_transformer(
         self,
         source_crs: str,
@@ -321,11 +718,7 @@ class TransformationService:
         resolved_source = self._resolve_crs_input(source_crs)
         resolved_target = self._resolve_crs_input(target_crs)
         ops_lower = self._collect_preferred_ops(preferred_ops)
-        cache_key = (
-            f"{canonical_source}->{canonical_target}"
-            f"#path={'auto' if path_id is None else path_id}"
-            f"#ops={'|'.join(ops_lower) if ops_lower else 'default'}"
-        )
+        cache_key = self._cache_key(canonical_source, canonical_target, path_id, ops_lower)
 
         cached = self.transformer_cache.get(cache_key)
         if cached is not None:
@@ -384,28 +777,29 @@ class TransformationService:
         z_out: Optional[float],
         accuracy: Optional[float],
     ) -> Dict:
-        source = CRS.from_user_input(self._resolve_crs_input(source_crs))
-        target = CRS.from_user_input(self._resolve_crs_input(target_crs))
-        return {
+        response = {
             "x": x_out,
             "y": y_out,
             "z": z_out,
-            "units_source": self._get_units(source),
-            "units_target": self._get_units(target),
+            "units_source": CRS_REGISTRY.get(source_crs).units,
+            "units_target": CRS_REGISTRY.get(target_crs).units,
             "accuracy": accuracy,
         }
+        if OFFLINE_MODE:
+            response["skipped_paths"] = self.skipped_paths(source_crs, target_crs)
+        return response
 
-    def _transform_chain(
+    def _chain_steps(
         self,
-        source_crs: str,
-        target_crs: str,
         canonical_source: str,
         canonical_target: str,
-        x: float,
-        y: float,
-        z: Optional[float],
         chain_config: Dict[str, object],
-    ) -> Dict:
+    ) -> List[Tuple[str, str, Optional[Dict[str, Optional[List[str]]]]]]:
+        """Expand a CHAINED_PATHS entry into (source, target, hint) steps.
+
+        Identity hops (an alias and the EPSG CRS it stands for) carry ``None``
+        in place of the hint.
+        """
         sequence = list(chain_config.get("sequence", []) or [])
         if not sequence:
             raise ValueError("Invalid chained transformation configuration")
@@ -420,9 +814,7 @@ class TransformationService:
             raw_hints if isinstance(raw_hints, dict) else {},
         )
 
-        current_x, current_y, current_z = x, y, z
-        accuracies: List[Optional[float]] = []
-
+        steps: List[Tuple[str, str, Optional[Dict[str, Optional[List[str]]]]]] = []
         for idx in range(len(sequence) - 1):
             step_source = sequence[idx]
             step_target = sequence[idx + 1]
@@ -430,28 +822,113 @@ class TransformationService:
 
             alias_equiv_source = ALIAS_EQUIVALENTS.get(step_source)
             if alias_equiv_source and self._canonical_crs(alias_equiv_source) == self._canonical_crs(step_target):
-                accuracies.append(accuracies[-1] if accuracies else None)
+                steps.append((step_source, step_target, None))
                 continue
 
             alias_equiv = ALIAS_EQUIVALENTS.get(step_target)
             if alias_equiv and self._canonical_crs(step_source) == self._canonical_crs(alias_equiv):
                 # Alias shares the same underlying CRS definition; treat as identity.
+                steps.append((step_source, step_target, None))
+                continue
+
+            steps.append((step_source, step_target, hint))
+        return steps
+
+    def _compiled_chain(
+        self,
+        canonical_source: str,
+        canonical_target: str,
+        chain_config: Dict[str, object],
+    ) -> List[Optional[List[Transformer]]]:
+        """Resolve a chained path once: one candidate list per step, ``None`` for identity hops.
+
+        Hops are canonicalized, alias-checked and hint-matched only when the
+        chain is first compiled; later calls reuse the transformers directly.
+        """
+        key = (canonical_source, canonical_target)
+        compiled = CHAIN_CACHE.get(key)
+        if compiled is not None:
+            return compiled
+
+        compiled = []
+        for step_source, step_target, hint in self._chain_steps(canonical_source, canonical_target, chain_config):
+            if hint is None:
+                compiled.append(None)
+                continue
+            compiled.append(
+                self._candidate_transformers(
+                    self._resolve_crs_input(step_source),
+                    self._resolve_crs_input(step_target),
+                    path_id=hint.get("path_id"),
+                    ops_lower=self._collect_preferred_ops(hint.get("preferred_ops")),
+                )
+            )
+        CHAIN_CACHE[key] = compiled
+        return compiled
+
+    def _transform_chain(
+        self,
+        source_crs: str,
+        target_crs: str,
+        canonical_source: str,
+        canonical_target: str,
+        x: float,
+        y: float,
+        z: Optional[float],
+        chain_config: Dict[str, object],
+    ) -> Dict:
+        current_x, current_y, current_z = x, y, z
+        accuracies: List[Optional[float]] = []
+
+        for candidates in self._compiled_chain(canonical_source, canonical_target, chain_config):
+            if candidates is None:
                 accuracies.append(accuracies[-1] if accuracies else None)
                 continue
 
-            current_x, current_y, current_z, accuracy = self._run_transform(
-                step_source,
-                step_target,
-                current_x,
-                current_y,
-                current_z,
-                path_id=hint.get("path_id"),
-                preferred_ops=hint.get("preferred_ops"),
+            last_error: Optional[Exception] = None
+            for transformer in candidates:
+                try:
+                    x_out, y_out, z_out = self._apply_transform(transformer, current_x, current_y, current_z)
+                except Exception as exc:
+                    last_error = exc
+                    continue
+                if self._values_finite(x_out, y_out, z_out):
+                    break
+                last_error = ValueError("Transformer produced non-finite output")
+            else:
+                raise last_error or RuntimeError("No suitable transformer available")
+            current_x, current_y, current_z = x_out, y_out, z_out
+            accuracies.append(transformer.accuracy)
+
+        accuracy = next((val for val in reversed(accuracies) if val is not None), None)
+        result = self._format_response(source_crs, target_crs, current_x, current_y, current_z, accuracy)
+        result["step_accuracies"] = accuracies
+        return result
+
+    def _transform_chain_arrays(
+        self,
+        canonical_source: str,
+        canonical_target: str,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        zs: Optional[np.ndarray],
+        chain_config: Dict[str, object],
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray], Optional[float], List[Optional[float]]]:
+        current_x, current_y, current_z = xs, ys, zs
+        accuracies: List[Optional[float]] = []
+
+        for candidates in self._compiled_chain(canonical_source, canonical_target, chain_config):
+            if candidates is None:
+                accuracies.append(accuracies[-1] if accuracies else None)
+                continue
+
+            current_x, current_y, current_z, used, _ = self._transform_arrays_with_candidates(
+                candidates, current_x, current_y, current_z
             )
-            accuracies.append(accuracy)
+            accuracies.append(self._accuracy_of(used))
 
         accuracy = next((val for val in reversed(accuracies) if val is not None), None)
-        return self._format_response(source_crs, target_crs, current_x, current_y, current_z, accuracy)
+        return current_x, current_y, current_z, accuracy, accuracies
 
     def transform_point(
         self, source_crs: str, target_crs: str, x: float, y: float, z: Optional[float] = None
@@ -507,72 +984,280 @@ class TransformationService:
         result["path_id"] = path_id
         return result
 
+    def transform_points(
+        self,
+        source_crs: str,
+        target_crs: str,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        zs: Optional[np.ndarray] = None,
+        path_id: Optional[int] = None,
+        preferred_ops: Optional[List[str]] = None,
+    ) -> Dict:
+        """Columnar counterpart of ``transform_point``/``transform_point_with_selection``.
+
+        Returns float64 arrays under ``x``/``y``/``z``; points that no candidate
+        could transform are NaN and listed in ``failed``. ``point_path_ids``
+        tags each point with the group ``path_id`` that produced it (-1 when it
+        failed or came from a non-group fallback) and ``path_counts`` totals
+        them; both are None for CHAINED_PATHS pairs, which span several groups.
+        """
+        xs = np.ascontiguousarray(xs, dtype=float)
+        ys = np.ascontiguousarray(ys, dtype=float)
+        zs = np.ascontiguousarray(zs, dtype=float) if zs is not None else None
+        if len(xs) != len(ys) or (zs is not None and len(zs) != len(xs)):
+            raise ValueError("Coordinate arrays must have the same length")
+
+        canonical_source = self._canonical_crs(source_crs)
+        canonical_target = self._canonical_crs(target_crs)
+        chain = CHAINED_PATHS.get((canonical_source, canonical_target))
+
+        step_accuracies: Optional[List[Optional[float]]] = None
+        point_path_ids: Optional[np.ndarray] = None
+        if path_id is not None or preferred_ops:
+            x_out, y_out, z_out, accuracy, point_path_ids = self._run_transform_arrays(
+                source_crs, target_crs, xs, ys, zs, path_id=path_id, preferred_ops=preferred_ops
+            )
+        elif chain:
+            x_out, y_out, z_out, accuracy, step_accuracies = self._transform_chain_arrays(
+                canonical_source, canonical_target, xs, ys, zs, chain
+            )
+        else:
+            hint = PATH_HINTS.get((canonical_source, canonical_target)) or {}
+            x_out, y_out, z_out, accuracy, point_path_ids = self._run_transform_arrays(
+                source_crs,
+                target_crs,
+                xs,
+                ys,
+                zs,
+                path_id=hint.get("path_id"),
+                preferred_ops=hint.get("preferred_ops"),
+            )
+
+        failed = np.flatnonzero(~self._finite_mask(x_out, y_out, z_out))
+        path_counts: Optional[List[Dict[str, Optional[int]]]] = None
+        if point_path_ids is not None:
+            ok = np.ones(len(x_out), dtype=bool)
+            ok[failed] = False
+            ids, counts = np.unique(point_path_ids[ok], return_counts=True)
+            path_counts = [
+                {"path_id": None if pid < 0 else int(pid), "count": int(n)}
+                for pid, n in zip(ids, counts)
+            ]
+
+        return {
+            "x": x_out,
+            "y": y_out,
+            "z": z_out,
+            "failed": failed,
+            "units_source": CRS_REGISTRY.get(source_crs).units,
+            "units_target": CRS_REGISTRY.get(target_crs).units,
+            "accuracy": accuracy,
+            "step_accuracies": step_accuracies,
+            "path_id": path_id,
+            "point_path_ids": point_path_ids,
+            "path_counts": path_counts,
+            "skipped_paths": self.skipped_paths(source_crs, target_crs),
+        }
+
+    def transform_points_via(
+        self,
+        path: List[str],
+        xs: np.ndarray,
+        ys: np.ndarray,
+        zs: Optional[np.ndarray] = None,
+        segment_path_ids: Optional[List[Optional[int]]] = None,
+        segment_preferred_ops: Optional[List[Optional[List[str]]]] = None,
+    ) -> Dict:
+        """Push coordinate arrays through every leg of ``path`` (A → B → C ...).
+
+        Each leg is one ``transform_points`` call, so its transformer is
+        resolved once for all points. Points that fail on a leg stay NaN for
+        the remaining legs.
+        """
+        if len(path) < 2:
+            raise ValueError("Path must contain at least two CRS codes")
+        seg_ids = segment_path_ids or []
+        seg_ops = segment_preferred_ops or []
+
+        cur_x, cur_y, cur_z = xs, ys, zs
+        legs: List[Dict] = []
+        for i in range(len(path) - 1):
+            src = path[i]
+            dst = path[i + 1]
+            leg = self.transform_points(
+                src,
+                dst,
+                cur_x,
+                cur_y,
+                cur_z,
+                path_id=seg_ids[i] if i < len(seg_ids) else None,
+                preferred_ops=seg_ops[i] if i < len(seg_ops) else None,
+            )
+            cur_x, cur_y, cur_z = leg["x"], leg["y"], leg["z"]
+            summary = {
+                "source_crs": src,
+                "target_crs": dst,
+                "path_id": leg["path_id"],
+                "accuracy": leg["accuracy"],
+                "step_accuracies": leg["step_accuracies"],
+                "failed_count": int(leg["failed"].size),
+                "path_counts": leg["path_counts"],
+            }
+            if leg["skipped_paths"] is not None:
+                summary["skipped_paths"] = leg["skipped_paths"]
+            legs.append(summary)
+
+        accuracies = [leg["accuracy"] for leg in legs]
+        return {
+            "x": cur_x,
+            "y": cur_y,
+            "z": cur_z,
+            "failed": np.flatnonzero(~self._finite_mask(cur_x, cur_y, cur_z)),
+            "legs": legs,
+            # Same naive aggregation as /via: unknown if any leg is unknown.
+            "cumulative_accuracy": None if any(a is None for a in accuracies) else float(sum(accuracies)),
+        }
+
     def get_all_transformation_paths(self, source_crs: str, target_crs: str) -> List[Dict]:
-        group = TransformerGroup(
+        return PATH_CATALOG.paths(
             self._resolve_crs_input(source_crs),
             self._resolve_crs_input(target_crs),
-            always_xy=True,
-            allow_superseded=True,
         )
-        paths: List[Dict] = []
-        for i, transformer in enumerate(group.transformers):
-            ops_info: List[Dict[str, Optional[str]]] = []
-            for op in getattr(transformer, "operations", []) or []:
+
+    def _via_candidates(self, source_crs: str, target_crs: str) -> List[Tuple[str, str]]:
+        """Candidate via codes in preference order, de-duplicated (first reason wins)."""
+        candidates: List[Tuple[str, str]] = []
+        seen = set()
+
+        def add(code: str, reason: str) -> None:
+            key = code.strip()
+            if key and key not in seen:
+                seen.add(key)
+                candidates.append((key, reason))
+
+        for crs_code, label in ((source_crs, "source"), (target_crs, "target")):
+            try:
+                crs = self._crs_from_input(crs_code)
+                geo = getattr(crs, "geodetic_crs", None) or crs
+                add(geo.to_string(), f"{label} geodetic")
                 try:
-                    ops_info.append(
-                        {
-                            "name": getattr(op, "name", None),
-                            "method_name": getattr(op, "method_name", None),
-                            "authority": getattr(op, "authority", None),
-                            "code": getattr(op, "code", None) or getattr(op, "id", None),
-                        }
-                    )
+                    add(geo.to_3d().to_string(), f"{label} geodetic 3D")
                 except Exception:
-                    # Best-effort only; keep going if unknown object shape
-                    ops_info.append({})
-            paths.append(
-                {
-                    "path_id": i,
-                    "description": transformer.description,
-                    "accuracy": transformer.accuracy,
-                    "accuracy_unit": "meter",
-                    "operations": [op.to_proj4() for op in transformer.operations],
-                    "operations_info": ops_info,
-                    "is_best_available": i == 0,
-                }
+                    pass
+            except Exception:
+                pass
+
+        # Common pivots
+        for code, reason in [("EPSG:4326", "WGS 84"), ("EPSG:4979", "WGS 84 3D"), ("EPSG:4978", "ECEF")]:
+            add(code, reason)
+        return candidates
+
+    def _leg_has_paths(self, source_crs: str, target_crs: str) -> bool:
+        try:
+            return bool(
+                PATH_CATALOG.transformers(
+                    self._resolve_crs_input(source_crs),
+                    self._resolve_crs_input(target_crs),
+                )
             )
-        # Sort by numeric accuracy; None means unknown and sorts last
-        return sorted(
-            paths, key=lambda x: x["accuracy"] if x["accuracy"] is not None else float("inf")
-        )
+        except Exception:
+            return False
+
+    def suggest_vias(self, source_crs: str, target_crs: str) -> List[Dict[str, str]]:
+        """Via CRS codes for which both source→via and via→target have a transformer.
+
+        Legs are validated concurrently and shared between candidates; the result
+        is memoized per pair until ``invalidate_transform_caches`` runs.
+        """
+        key = (self._canonical_crs(source_crs), self._canonical_crs(target_crs))
+        cached = VIA_SUGGESTION_CACHE.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        candidates = self._via_candidates(source_crs, target_crs)
+        legs = {(source_crs, code) for code, _ in candidates} | {
+            (code, target_crs) for code, _ in candidates
+        }
+        pool = _via_pool()
+        futures = {leg: pool.submit(self._leg_has_paths, *leg) for leg in legs}
+        valid = {leg: future.result() for leg, future in futures.items()}
+
+        suggestions = [
+            {"code": code, "reason": reason}
+            for code, reason in candidates
+            if valid[(source_crs, code)] and valid[(code, target_crs)]
+        ]
+        VIA_SUGGESTION_CACHE[key] = suggestions
+        return copy.deepcopy(suggestions)
+
+    def transform_trajectory_arrays(
+        self,
+        source_crs: str,
+        target_crs: str,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        zs: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """Transform contiguous float64 coordinate columns with a single PROJ call."""
+        transformer = self.get_transformer(source_crs, target_crs)
+        xs = np.ascontiguousarray(xs, dtype=float)
+        ys = np.ascontiguousarray(ys, dtype=float)
+        zs = np.ascontiguousarray(zs, dtype=float) if zs is not None else None
+        if len(xs) != len(ys) or (zs is not None and len(zs) != len(xs)):
+            raise ValueError("Coordinate arrays must have the same length")
+        return self._apply_transform_arrays(transformer, xs, ys, zs)
 
     def transform_trajectory(
-        self, source_crs: str, target_crs: str, points: List[Dict]
+        self,
+        source_crs: str,
+        target_crs: str,
+        points: List[Dict],
+        include_original: bool = True,
     ) -> List[Dict]:
-        transformer = self.get_transformer(source_crs, target_crs)
-        has_z = "z" in points[0]
+        ids, xs, ys, zs = self.trajectory_columns(points)
+        x_out, y_out, z_out = self.transform_trajectory_arrays(source_crs, target_crs, xs, ys, zs)
+        return self.trajectory_records(
+            ids, x_out, y_out, z_out, originals=points if include_original else None
+        )
 
-        if has_z:
-            coords = np.array([[p["x"], p["y"], p.get("z", 0.0)] for p in points], dtype=float)
-            transformed = np.array(list(transformer.itransform(coords)))
-            out_iter = transformed
-        else:
-            coords = np.array([[p["x"], p["y"]] for p in points], dtype=float)
-            transformed_2d = np.array(list(transformer.itransform(coords)))
-            out_iter = np.column_stack([transformed_2d, np.zeros(len(points))])
+    @staticmethod
+    def trajectory_columns(
+        points: List[Dict],
+    ) -> Tuple[List, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """Split trajectory point dicts into ids and float64 x/y/(z) columns."""
+        if not points:
+            raise ValueError("Trajectory points list cannot be empty")
+        count = len(points)
+        xs = np.fromiter((p["x"] for p in points), dtype=float, count=count)
+        ys = np.fromiter((p["y"] for p in points), dtype=float, count=count)
+        zs = None
+        if "z" in points[0]:
+            zs = np.array([p.get("z", 0.0) for p in points], dtype=float)
+        ids = [p.get("id", i) for i, p in enumerate(points)]
+        return ids, xs, ys, zs
 
-        results: List[Dict] = []
-        for i, (tx, ty, tz) in enumerate(out_iter):
-            results.append(
-                {
-                    "id": points[i].get("id", i),
-                    "x": float(tx),
-                    "y": float(ty),
-                    "z": float(tz) if has_z else None,
-                    "original": points[i],
-                }
-            )
-        return results
+    @staticmethod
+    def trajectory_records(
+        ids: List,
+        x_out: np.ndarray,
+        y_out: np.ndarray,
+        z_out: Optional[np.ndarray],
+        originals: Optional[List[Dict]] = None,
+    ) -> List[Dict]:
+        """Per-point dicts in the historical ``transform_trajectory`` shape."""
+        xs = x_out.tolist()
+        ys = y_out.tolist()
+        zs = z_out.tolist() if z_out is not None else [None] * len(xs)
+        if originals is None:
+            return [
+                {"id": pid, "x": px, "y": py, "z": pz}
+                for pid, px, py, pz in zip(ids, xs, ys, zs)
+            ]
+        return [
+            {"id": pid, "x": px, "y": py, "z": pz, "original": original}
+            for pid, px, py, pz, original in zip(ids, xs, ys, zs, originals)
+        ]
 
     def to_geographic(self, crs_code: str, x: float, y: float) -> Dict[str, float]:
         crs = self._crs_from_input(crs_code)
@@ -584,19 +1269,17 @@ class TransformationService:
         return {"lon": float(lon), "lat": float(lat)}
 
     def calculate_grid_convergence(self, crs_code: str, lon: float, lat: float) -> float:
-        crs = CRS.from_user_input(self._resolve_crs_input(crs_code))
-        if not crs.is_projected:
+        record = CRS_REGISTRY.get(crs_code)
+        if not record.is_projected:
             raise ValueError("Grid convergence only applies to projected CRS")
-        pj = Proj(crs)
-        factors = pj.get_factors(lon, lat)
+        factors = record.proj.get_factors(lon, lat)
         return float(factors.meridian_convergence)
 
     def calculate_scale_factor(self, crs_code: str, lon: float, lat: float) -> Dict:
-        crs = CRS.from_user_input(self._resolve_crs_input(crs_code))
-        if not crs.is_projected:
+        record = CRS_REGISTRY.get(crs_code)
+        if not record.is_projected:
             raise ValueError("Scale factor only applies to projected CRS")
-        pj = Proj(crs)
-        factors = pj.get_factors(lon, lat)
+        factors = record.proj.get_factors(lon, lat)
         return {
             "meridional_scale": float(getattr(factors, "meridional_scale", np.nan)),
             "parallel_scale": float(getattr(factors, "parallel_scale", np.nan)),
@@ -604,35 +1287,47 @@ class TransformationService:
         }
 
     def _get_units(self, crs: CRS) -> Dict:
-        units: Dict[str, float] = {}
-        for axis in crs.axis_info:
-            if axis.direction in ["east", "north"]:
-                units["horizontal"] = axis.unit_name
-                units["horizontal_factor"] = axis.unit_conversion_factor
-            elif axis.direction == "up":
-                units["vertical"] = axis.unit_name
-                units["vertical_factor"] = axis.unit_conversion_factor
-        return units
+        return crs_units(crs)
 
     def _get_geodetic_crs(self, crs: CRS) -> CRS:
-        try:
-            geo = crs.geodetic_crs
-        except Exception:
-            geo = None
-        if geo is None:
-            return crs
-        return geo
+        return geodetic_crs(crs)
 
     def _ensure_3d(self, crs: CRS) -> CRS:
-        try:
-            if hasattr(crs, "is_geocentric") and crs.is_geocentric:
-                return crs
-        except Exception:
-            pass
-        try:
-            return crs.to_3d()
-        except Exception:
-            return crs
+        return ensure_3d(crs)
+
+    @staticmethod
+    def _local_offset_transformers(record: CRSRecord) -> Dict[str, Optional[Transformer]]:
+        """ECEF/geodetic/target/WGS 84 transformers (and target to geodetic) for ``record``'s CRS.
+
+        Built once per CRS and shared; concurrent first requests wait for a
+        single build and a failed build is not retried for TRANSFORMER_FAILURE_TTL.
+        """
+        key = content_key(record.canonical)
+        cached = LOCAL_OFFSET_TRANSFORMERS.get(key)
+        if cached is not None:
+            return cached
+
+        def build() -> Dict[str, Optional[Transformer]]:
+            geodetic3d = record.geodetic3d
+            ecef = CRS.from_epsg(4978)
+            try:
+                geo_to_wgs: Optional[Transformer] = Transformer.from_crs(
+                    geodetic3d, CRS.from_epsg(4979), always_xy=True
+                )
+            except Exception:
+                geo_to_wgs = None
+            built = {
+                "geo_to_ecef": Transformer.from_crs(geodetic3d, ecef, always_xy=True),
+                "ecef_to_geo": Transformer.from_crs(ecef, geodetic3d, always_xy=True),
+                "geo_to_target": Transformer.from_crs(geodetic3d, record.crs, always_xy=True),
+                "proj_to_geo": Transformer.from_crs(record.crs, geodetic3d, always_xy=True),
+                "geo_to_wgs": geo_to_wgs,
+            }
+            LOCAL_OFFSET_TRANSFORMERS[key] = built
+            return built
+
+        built, _ = TRANSFORMER_BUILDS.do(("local-offset", key), build)
+        return built
 
     def _create_local_offset_context(
         self,
@@ -641,23 +1336,34 @@ class TransformationService:
         lat: float,
         height: float,
     ) -> Dict:
-        target_crs = self._crs_from_input(crs_code)
-        geodetic = self._get_geodetic_crs(target_crs)
-        geodetic3d = self._ensure_3d(geodetic)
-
-        ecef = CRS.from_epsg(4978)
-        geo_to_ecef = Transformer.from_crs(geodetic3d, ecef, always_xy=True)
-        ecef_to_geo = Transformer.from_crs(ecef, geodetic3d, always_xy=True)
-        geo_to_target = Transformer.from_crs(geodetic3d, target_crs, always_xy=True)
-
-        try:
-            geo_to_wgs = Transformer.from_crs(geodetic3d, CRS.from_epsg(4979), always_xy=True)
-        except Exception:
-            geo_to_wgs = None
+        record = CRS_REGISTRY.get(crs_code)
+        target_crs = record.crs
+        geodetic3d = record.geodetic3d
+
+        transformers = self._local_offset_transformers(record)
+        geo_to_ecef = transformers["geo_to_ecef"]
+        ecef_to_geo = transformers["ecef_to_geo"]
+        geo_to_target = transformers["geo_to_target"]
+        geo_to_wgs = transformers["geo_to_wgs"]
+        scales = None
+        if record.is_projected:
+            try:
+                scales = self.calculate_scale_factor(crs_code, lon, lat)
+            except Exception:
+                scales = None
+        reference_projected = geo_to_target.transform(lon, lat, height)
+        reference_wgs = None
+        if geo_to_wgs is not None:
+            try:
+                reference_wgs = geo_to_wgs.transform(lon, lat, height)
+            except Exception:
+                reference_wgs = None
 
         origin_ecef = geo_to_ecef.transform(lon, lat, height)
         lon_rad = math.radians(lon)
         lat_rad = math.radians(lat)
+        sin_lon, cos_lon = math.sin(lon_rad), math.cos(lon_rad)
+        sin_lat, cos_lat = math.sin(lat_rad), math.cos(lat_rad)
 
         context = {
             "crs": target_crs,
@@ -665,12 +1371,25 @@ class TransformationService:
             "geo_to_ecef": geo_to_ecef,
             "ecef_to_geo": ecef_to_geo,
             "geo_to_target": geo_to_target,
+            "proj_to_geo": transformers["proj_to_geo"],
             "geo_to_wgs": geo_to_wgs,
+            "reference": (lon, lat, height),
+            "reference_projected": (reference_projected[0], reference_projected[1]),
+            "reference_wgs84": reference_wgs,
+            "scales": scales,
             "origin_ecef": origin_ecef,
-            "sin_lon": math.sin(lon_rad),
-            "cos_lon": math.cos(lon_rad),
-            "sin_lat": math.sin(lat_rad),
-            "cos_lat": math.cos(lat_rad),
+            "sin_lon": sin_lon,
+            "cos_lon": cos_lon,
+            "sin_lat": sin_lat,
+            "cos_lat": cos_lat,
+            # Rows map (east, north, up) onto ECEF dX, dY, dZ.
+            "enu_rotation": np.array(
+                [
+                    [-sin_lon, -sin_lat * cos_lon, cos_lat * cos_lon],
+                    [cos_lon, -sin_lat * sin_lon, cos_lat * sin_lon],
+                    [0.0, cos_lat, sin_lat],
+                ]
+            ),
             "origin_height": height,
         }
         return context
@@ -682,7 +1401,24 @@ class TransformationService:
         lat: float,
         height: float,
     ) -> Dict:
-        return self._create_local_offset_context(crs_code, lon, lat, height)
+        """Shared (read-only) context for a reference, from LOCAL_OFFSET_CONTEXTS when cached.
+
+        The reference is rounded first (see LOCAL_OFFSET_CONTEXTS), so repeat
+        requests for the same wellhead reuse one context and build no transformers.
+        """
+        lon, lat = round(lon, _CONTEXT_DIGITS), round(lat, _CONTEXT_DIGITS)
+        height = round(height, _CONTEXT_DIGITS)
+        key = (content_key(CRS_REGISTRY.canonical(crs_code)), lon, lat, height)
+        context = LOCAL_OFFSET_CONTEXTS.get(key)
+        if context is None:
+            context = self._create_local_offset_context(crs_code, lon, lat, height)
+            LOCAL_OFFSET_CONTEXTS[key] = context
+        return context
+
+    def local_reference_geodetic(self, crs_code: str, x: float, y: float, height: float) -> Tuple[float, float, float]:
+        """Geodetic lon/lat/height of a projected reference, with the shared per-CRS transformer."""
+        transformers = self._local_offset_transformers(CRS_REGISTRY.get(crs_code))
+        return transformers["proj_to_geo"].transform(x, y, height)
 
     def local_offset_via_ecef(
         self,
@@ -695,7 +1431,7 @@ class TransformationService:
         up: float,
         context: Optional[Dict] = None,
     ) -> Dict:
-        ctx = context or self._create_local_offset_context(crs_code, lon, lat, height)
+        ctx = context or self.build_local_offset_context(crs_code, lon, lat, height)
 
         sin_lon = ctx["sin_lon"]
         cos_lon = ctx["cos_lon"]
@@ -730,6 +1466,90 @@ class TransformationService:
 
         return result
 
+    @staticmethod
+    def transform_columns(transformer: Transformer, *columns: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Run ``transformer`` over whole coordinate columns in one call.
+
+        PROJ can fail a vectorized call (inf) where a later call for the same
+        points still returns values, e.g. when a candidate grid cannot be
+        fetched the first time. The non-finite rows are retried once as one
+        vectorized call; at most SCALAR_RETRY_LIMIT rows still failing after
+        that are retried point by point. Points that are simply outside the
+        area of use stay inf without costing one scalar call each.
+        """
+        out = PROCESS_POOL.transform(transformer, columns)
+        if out is None:
+            out = _transform_1d(transformer, columns)
+        bad = np.flatnonzero(~np.logical_and.reduce([np.isfinite(col) for col in out]))
+        if bad.size:
+            retried = _transform_1d(transformer, [np.ascontiguousarray(col[bad]) for col in columns])
+            for col, values in zip(out, retried):
+                col[bad] = values
+            bad = bad[~np.logical_and.reduce([np.isfinite(col[bad]) for col in out])]
+        for i in bad[:SCALAR_RETRY_LIMIT]:
+            values = transformer.transform(*(float(col[i]) for col in columns))
+            for col, value in zip(out, values):
+                col[i] = value
+        return out
+
+    def local_offsets_via_ecef_arrays(
+        self,
+        context: Dict,
+        offsets: np.ndarray,
+    ) -> Dict[str, np.ndarray]:
+        """Apply an (N, 3) array of ENU offsets through the ECEF pipeline at once.
+
+        Returns columns ``lon``/``lat``/``height`` (geodetic), ``x``/``y``
+        (target CRS) and, when the WGS 84 leg is available,
+        ``wgs_lon``/``wgs_lat``/``wgs_height``.
+        """
+        offsets = np.asarray(offsets, dtype=float).reshape(-1, 3)
+        ecef = offsets @ context["enu_rotation"].T
+        ecef += np.asarray(context["origin_ecef"], dtype=float)
+
+        lon_new, lat_new, h_new = self.transform_columns(
+            context["ecef_to_geo"], ecef[:, 0], ecef[:, 1], ecef[:, 2]
+        )
+        proj = self.transform_columns(context["geo_to_target"], lon_new, lat_new, h_new)
+        columns = {
+            "lon": lon_new,
+            "lat": lat_new,
+            "height": h_new,
+            "x": proj[0],
+            "y": proj[1],
+        }
+
+        geo_to_wgs = context.get("geo_to_wgs")
+        if geo_to_wgs is not None:
+            try:
+                wgs = self.transform_columns(geo_to_wgs, lon_new, lat_new, h_new)
+                columns["wgs_lon"] = wgs[0]
+                columns["wgs_lat"] = wgs[1]
+                columns["wgs_height"] = wgs[2]
+            except Exception:
+                pass
+        return columns
+
+    @staticmethod
+    def ecef_results(columns: Dict[str, np.ndarray]) -> List[Dict]:
+        """Per-point dicts in the ``local_offset_via_ecef`` shape."""
+        lists = {key: value.tolist() for key, value in columns.items()}
+        results = [
+            {
+                "geodetic": {"lon": lon, "lat": lat, "height": h},
+                "projected": {"x": x, "y": y},
+            }
+            for lon, lat, h, x, y in zip(
+                lists["lon"], lists["lat"], lists["height"], lists["x"], lists["y"]
+            )
+        ]
+        if "wgs_lon" in lists:
+            for result, lon, lat, h in zip(
+                results, lists["wgs_lon"], lists["wgs_lat"], lists["wgs_height"]
+            ):
+                result["wgs84"] = {"lon": lon, "lat": lat, "height": h}
+        return results
+
     def local_offset_via_ecef_bulk(
         self,
         crs_code: str,
@@ -738,19 +1558,8 @@ class TransformationService:
         height: float,
         offsets: List[Tuple[float, float, float]],
     ) -> List[Dict]:
-        ctx = self._create_local_offset_context(crs_code, lon, lat, height)
-        results = []
-        for east, north, up in offsets:
-            results.append(
-                self.local_offset_via_ecef(
-                    crs_code,
-                    lon,
-                    lat,
-                    height,
-                    east,
-                    north,
-                    up,
-                    context=ctx,
-                )
-            )
-        return results
+        if not offsets:
+            return []
+        ctx = self.build_local_offset_context(crs_code, lon, lat, height)
+        columns = self.local_offsets_via_ecef_arrays(ctx, np.asarray(offsets, dtype=float))
+        return self.ecef_results(columns)
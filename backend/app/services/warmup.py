@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pyproj import Transformer
+
+from app.services.crs_index import CRS_SEARCH_INDEX, PROJECTED_CRS_INDEX
+from app.services.executor import BLOCKING_EXECUTOR
+from app.services.transformer import CHAINED_PATHS, CRS_REGISTRY, PATH_HINTS, TransformationService
+
+
+def configured_pairs() -> List[Tuple[str, str, str]]:
+    """(source, target, origin) for PATH_HINTS, CHAINED_PATHS and WARMUP_PAIRS.
+
+    WARMUP_PAIRS is a comma-separated list of ``SOURCE>TARGET`` entries,
+    e.g. ``EPSG:4326>EPSG:25832,EPSG:4258>EPSG:3035``.
+    """
+    pairs: List[Tuple[str, str, str]] = []
+    seen = set()
+
+    def add(source: str, target: str, origin: str) -> None:
+        if (source, target) not in seen:
+            seen.add((source, target))
+            pairs.append((source, target, origin))
+
+    for source, target in PATH_HINTS:
+        add(source, target, "path_hint")
+    for source, target in CHAINED_PATHS:
+        add(source, target, "chained_path")
+    for entry in os.getenv("WARMUP_PAIRS", "").split(","):
+        if ">" in entry:
+            source, target = (part.strip() for part in entry.split(">", 1))
+            if source and target:
+                add(source, target, "configured")
+    return pairs
+
+
+def _bounds(crs_code: str) -> Optional[Tuple[float, float, float, float]]:
+    try:
+        area = CRS_REGISTRY.get(crs_code).crs.area_of_use
+    except Exception:
+        return None
+    if area is None or area.west > area.east:  # skip antimeridian-crossing areas
+        return None
+    return area.west, area.south, area.east, area.north
+
+
+def sample_point(source_crs: str, target_crs: str) -> Tuple[float, float, float]:
+    """A point in source coordinates inside both CRS areas, so grid-based paths are exercised."""
+    src = _bounds(source_crs)
+    dst = _bounds(target_crs)
+    box = src or dst
+    if src and dst:
+        west, south = max(src[0], dst[0]), max(src[1], dst[1])
+        east, north = min(src[2], dst[2]), min(src[3], dst[3])
+        if west < east and south < north:
+            box = (west, south, east, north)
+    lon, lat = ((box[0] + box[2]) / 2, (box[1] + box[3]) / 2) if box else (0.0, 0.0)
+
+    record = CRS_REGISTRY.get(source_crs)
+    if record.is_geographic:
+        return lon, lat, 0.0
+    x, y = Transformer.from_crs("EPSG:4326", record.crs, always_xy=True).transform(lon, lat)
+    return x, y, 0.0
+
+
+def warm_pairs(pairs: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+    """Transform one sample point per pair on the calling thread, filling its caches."""
+    service = TransformationService()
+    results: List[Dict[str, Any]] = []
+    for source, target, origin in pairs:
+        started = time.perf_counter()
+        entry: Dict[str, Any] = {"source_crs": source, "target_crs": target, "origin": origin}
+        try:
+            x, y, z = sample_point(source, target)
+            service.transform_point(source, target, x, y, z)
+            entry["ok"] = True
+        except Exception as exc:
+            entry["ok"] = False
+            entry["error"] = str(exc)
+        entry["seconds"] = round(time.perf_counter() - started, 4)
+        results.append(entry)
+    return results
+
+
+class Warmup:
+    """Pre-builds transformers for the hot CRS pairs in the background.
+
+    The pairs are warmed once on the warm-up thread, which pays and reports
+    the cold cost per pair. They are then warmed again on every
+    BLOCKING_EXECUTOR worker so that each per-thread cache holds them; if
+    request traffic keeps a worker from joining within the broadcast timeout,
+    the report says so and counts only the workers that were warmed.
+    Finally the CRS search index is built and the projected-CRS index used
+    by /api/crs/match is loaded (or built and persisted on first start).
+    Failures are reported per pair and do not block readiness.
+    """
+
+    def __init__(self):
+        self.status = "pending"
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.pairs: List[Dict[str, Any]] = []
+        self.workers_warmed = 0
+        self.worker_seconds: Optional[float] = None
+        self.workers_timed_out = False
+        self.error: Optional[str] = None
+        self.crs_index: Optional[Dict[str, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "disabled")
+
+    def disable(self) -> None:
+        self.status = "disabled"
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def run(self) -> None:
+        self.status = "running"
+        self.started_at = time.time()
+        pairs = configured_pairs()
+        try:
+            self.pairs = warm_pairs(pairs)
+            started = time.perf_counter()
+            warmed, complete = BLOCKING_EXECUTOR.broadcast(
+                lambda: (threading.current_thread().name, warm_pairs(pairs))
+            )
+            self.workers_warmed = len({name for name, _ in warmed})
+            self.workers_timed_out = not complete
+            self.worker_seconds = round(time.perf_counter() - started, 4)
+            CRS_SEARCH_INDEX.search()
+            PROJECTED_CRS_INDEX.columns()
+            self.crs_index = {"search": CRS_SEARCH_INDEX.stats(), "match": PROJECTED_CRS_INDEX.stats()}
+        except Exception as exc:
+            # A partial warm-up still leaves the service usable.
+            self.error = str(exc)
+        self.finished_at = time.time()
+        self.status = "ready"
+
+    def report(self) -> Dict[str, Any]:
+        total = None
+        if self.started_at is not None and self.finished_at is not None:
+            total = round(self.finished_at - self.started_at, 4)
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "seconds": total,
+            "workers_warmed": self.workers_warmed,
+            "worker_seconds": self.worker_seconds,
+            "workers_timed_out": self.workers_timed_out,
+            "error": self.error,
+            "crs_index": self.crs_index,
+            "pairs": sorted(self.pairs, key=lambda p: p["seconds"], reverse=True),
+        }
+
+
+WARMUP = Warmup()
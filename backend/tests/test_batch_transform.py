@@ -0,0 +1,206 @@
+import warnings
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from pyproj import Transformer
+
+from app.api.transform import ViaBatchRequest, ViaRequest, transform_via, transform_via_batch
+from app.services import transformer as transformer_module
+from app.services.grid_manifest import GridManifest
+from app.services.transformer import LOCAL_OFFSET_CONTEXTS, TransformationService, invalidate_transform_caches
+
+
+class _FakeTransformer:
+    """Stands in for a grid transformer that only covers x < limit."""
+
+    def __init__(self, limit, shift, accuracy):
+        self.limit = limit
+        self.shift = shift
+        self.accuracy = accuracy
+        self.calls = []
+
+    def transform(self, xs, ys):
+        xs = np.asarray(xs, dtype=float)
+        self.calls.append(xs.size)
+        out_x = np.where(xs < self.limit, xs + self.shift, np.inf)
+        return out_x, np.asarray(ys, dtype=float)
+
+
+def test_transform_points_matches_scalar():
+    service = TransformationService()
+    xs = np.array([2.2945, 2.2955])
+    ys = np.array([48.8584, 48.8589])
+    batch = service.transform_points("EPSG:4326", "EPSG:32631", xs, ys)
+    for i in range(len(xs)):
+        single = service.transform_point("EPSG:4326", "EPSG:32631", xs[i], ys[i])
+        assert abs(batch["x"][i] - single["x"]) < 1e-6
+        assert abs(batch["y"][i] - single["y"]) < 1e-6
+    assert batch["failed"].size == 0
+
+
+def test_masked_subset_retried_on_next_candidate(monkeypatch):
+    service = TransformationService()
+    grid = _FakeTransformer(limit=1.0, shift=10.0, accuracy=0.1)
+    fallback = _FakeTransformer(limit=100.0, shift=20.0, accuracy=5.0)
+    monkeypatch.setattr(service, "_candidate_transformers", lambda *a, **k: [grid, fallback])
+    monkeypatch.setattr(service, "transformer_cache", {})
+
+    x_out, _, _, accuracy, path_ids = service._run_transform_arrays(
+        "EPSG:4326", "EPSG:4326", np.array([0.0, 2.0, 0.5, 200.0]), np.zeros(4), None
+    )
+
+    assert grid.calls == [4]
+    assert fallback.calls == [2]
+    assert x_out[:3].tolist() == [10.0, 22.0, 10.5]
+    assert np.isnan(x_out[3])
+    assert accuracy == 5.0
+    # Fakes are not TransformerGroup members, so no path_id is attributed.
+    assert path_ids.tolist() == [-1, -1, -1, -1]
+
+
+def test_points_tagged_with_producing_candidate():
+    service = TransformationService()
+    grid = _FakeTransformer(limit=1.0, shift=10.0, accuracy=0.1)
+    fallback = _FakeTransformer(limit=100.0, shift=20.0, accuracy=5.0)
+    *_, used, producer = service._transform_arrays_with_candidates(
+        [grid, fallback], np.array([0.0, 2.0, 0.5, 200.0]), np.zeros(4), None
+    )
+    assert used == [grid, fallback]
+    assert producer.tolist() == [0, 1, 0, -1]
+
+    batch = service.transform_points("EPSG:4326", "EPSG:32631", np.array([2.29, 2.30]), np.array([48.85, 48.86]))
+    assert batch["point_path_ids"].tolist() == [0, 0]
+    assert batch["path_counts"] == [{"path_id": 0, "count": 2}]
+
+
+def test_via_batch_matches_per_point_via():
+    path = ["EPSG:4326", "EPSG:32631", "EPSG:3857"]
+    xs, ys = [2.29, 2.35, 3.1], [48.85, 48.9, 50.2]
+    batch = transform_via_batch.__wrapped__(ViaBatchRequest(path=path, x=xs, y=ys))
+    assert batch["count"] == 3 and batch["failed_indices"] == []
+    for i in range(3):
+        single = transform_via.__wrapped__(ViaRequest(path=path, position={"x": xs[i], "y": ys[i]}))
+        assert abs(batch["x"][i] - single["x"]) < 1e-6
+        assert abs(batch["y"][i] - single["y"]) < 1e-6
+        assert batch["cumulative_accuracy"] == single["cumulative_accuracy"]
+
+    # Each leg reports what a single transform over that leg would.
+    service = TransformationService()
+    assert [(leg["source_crs"], leg["target_crs"]) for leg in batch["legs"]] == list(zip(path, path[1:]))
+    x, y = xs[0], ys[0]
+    for leg in batch["legs"]:
+        single = service.transform_point(leg["source_crs"], leg["target_crs"], x, y)
+        assert leg["accuracy"] == single["accuracy"]
+        assert leg["failed_count"] == 0 and sum(c["count"] for c in leg["path_counts"]) == 3
+        x, y = single["x"], single["y"]
+
+
+def test_via_batch_reports_selected_segment_path():
+    request = {"path": ["EPSG:4326", "EPSG:27700"], "segment_path_ids": [1]}
+    batch = transform_via_batch.__wrapped__(ViaBatchRequest(x=[-1.0, -2.0], y=[52.0, 53.0], **request))
+    single = transform_via.__wrapped__(ViaRequest(position={"x": -1.0, "y": 52.0}, **request))
+    (leg,) = batch["legs"]
+    assert leg["path_id"] == 1 and leg["path_counts"] == [{"path_id": 1, "count": 2}]
+    assert abs(batch["x"][0] - single["x"]) < 1e-6 and abs(batch["y"][0] - single["y"]) < 1e-6
+    assert leg["accuracy"] == batch["cumulative_accuracy"] == single["cumulative_accuracy"]
+
+
+def test_via_batch_failing_point_does_not_break_the_rest():
+    path = ["EPSG:4326", "EPSG:32631", "EPSG:3857"]
+    batch = transform_via_batch.__wrapped__(ViaBatchRequest(path=path, x=[2.29, 2.0, 2.35], y=[48.85, 95.0, 48.9]))
+    assert batch["failed_indices"] == [1]
+    assert batch["x"][1] is None and batch["y"][1] is None
+    assert [leg["failed_count"] for leg in batch["legs"]] == [1, 1]
+    assert all(leg["path_counts"] == [{"path_id": 0, "count": 2}] for leg in batch["legs"])
+    single = transform_via.__wrapped__(ViaRequest(path=path, position={"x": 2.35, "y": 48.9}))
+    assert abs(batch["x"][2] - single["x"]) < 1e-6
+
+    # The same point on its own is an error for /via.
+    with pytest.raises(HTTPException) as failed:
+        transform_via.__wrapped__(ViaRequest(path=path, position={"x": 2.0, "y": 95.0}))
+    assert failed.value.status_code == 400
+
+
+def test_transform_trajectory_records_and_columns_agree():
+    service = TransformationService()
+    points = [{"id": "P1", "x": 2.2945, "y": 48.8584, "z": 35.0}, {"x": 2.2955, "y": 48.8589, "z": 36.0}]
+    records = service.transform_trajectory("EPSG:4979", "EPSG:4978", points)
+    ids, xs, ys, zs = service.trajectory_columns(points)
+    x_out, y_out, z_out = service.transform_trajectory_arrays("EPSG:4979", "EPSG:4978", xs, ys, zs)
+
+    assert [r["id"] for r in records] == ["P1", 1] == ids
+    assert records[1]["original"] is points[1]
+    assert [r["x"] for r in records] == x_out.tolist()
+    assert [r["z"] for r in records] == z_out.tolist()
+
+
+def test_local_offset_bulk_matches_scalar():
+    service = TransformationService()
+    offsets = [(100.0, 200.0, -300.0), (1500.0, -2500.0, -3000.0)]
+    bulk = service.local_offset_via_ecef_bulk("EPSG:32631", 3.0, 50.0, 10.0, offsets)
+    for offset, result in zip(offsets, bulk):
+        single = service.local_offset_via_ecef("EPSG:32631", 3.0, 50.0, 10.0, *offset)
+        for key in ("x", "y"):
+            assert abs(result["projected"][key] - single["projected"][key]) < 1e-6
+        for key in ("lon", "lat", "height"):
+            assert abs(result["geodetic"][key] - single["geodetic"][key]) < 1e-9
+
+    # Repeat bulk calls for the same reference reuse the cached context.
+    hits = LOCAL_OFFSET_CONTEXTS.stats()["hits"]
+    assert service.local_offset_via_ecef_bulk("EPSG:32631", 3.0, 50.0, 10.0, offsets) == bulk
+    assert LOCAL_OFFSET_CONTEXTS.stats()["hits"] == hits + 1
+
+
+def test_compiled_chain_arrays_match_scalar():
+    service = TransformationService()
+    xs, ys, zs = np.array([-1.0, -3.0]), np.array([52.0, 55.0]), np.array([100.0, 10.0])
+    batch = service.transform_points("GIGS:OSGB36_3D", "EPSG:4979", xs, ys, zs)
+    assert len(batch["step_accuracies"]) == 3
+    for i in range(len(xs)):
+        single = service.transform_point("GIGS:OSGB36_3D", "EPSG:4979", xs[i], ys[i], zs[i])
+        assert single["step_accuracies"] == batch["step_accuracies"]
+        assert abs(batch["x"][i] - single["x"]) < 1e-9
+        assert abs(batch["z"][i] - single["z"]) < 1e-6
+
+
+def test_offline_mode_skips_paths_with_missing_grids(monkeypatch, tmp_path):
+    # An empty manifest: every grid-based path must be skipped, never attempted.
+    monkeypatch.setattr(transformer_module, "OFFLINE_MODE", True)
+    monkeypatch.setattr(transformer_module, "GRID_MANIFEST", GridManifest([str(tmp_path)]))
+    invalidate_transform_caches()
+    try:
+        service = TransformationService()
+        result = service.transform_point("EPSG:4326", "EPSG:27700", -1.5, 52.5)
+        batch = service.transform_points(
+            "EPSG:4326", "EPSG:27700", np.array([-1.5, -2.0]), np.array([52.5, 53.0])
+        )
+    finally:
+        invalidate_transform_caches()
+
+    missing = [grid for entry in result["skipped_paths"] for grid in entry["missing_grids"]]
+    assert "uk_os_OSTN15_NTv2_OSGBtoETRS.tif" in missing
+    assert all(entry["source_crs"] == "EPSG:4326" for entry in result["skipped_paths"])
+    assert np.isfinite(result["x"]) and np.isfinite(result["y"])
+    skipped_ids = {entry["path_id"] for entry in batch["skipped_paths"]}
+    assert not skipped_ids & {entry["path_id"] for entry in batch["path_counts"]}
+
+
+def test_transform_columns_retries_failed_rows_vectorized_then_capped(monkeypatch):
+    monkeypatch.setattr(transformer_module, "SCALAR_RETRY_LIMIT", 2)
+    outside = _FakeTransformer(limit=1.0, shift=10.0, accuracy=1.0)
+    xs = np.array([0.0, 5.0, 6.0, 7.0, 8.0, 0.5])
+    x_out, _ = TransformationService.transform_columns(outside, xs, np.zeros(6))
+    # One full call, one vectorized retry of the 4 failed rows, then at most 2 scalar calls.
+    assert outside.calls == [6, 4, 1, 1]
+    assert x_out[[0, 5]].tolist() == [10.0, 10.5] and np.isinf(x_out[1:5]).all()
+
+
+def test_transform_columns_single_rows_take_no_scalar_array_path():
+    transformer = Transformer.from_crs("EPSG:4326", "EPSG:32631", always_xy=True)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        (x_one,), _ = TransformationService.transform_columns(transformer, np.array([2.0]), np.array([48.0]))
+        # One bad row out of two is retried as a size-1 column.
+        x_out, _ = TransformationService.transform_columns(transformer, np.array([2.0, 2.0]), np.array([48.0, 95.0]))
+    assert x_out[0] == x_one and np.isinf(x_out[1])
@@ -0,0 +1,344 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from pyproj import CRS
+
+from app.services.cache import AsyncRedisCache, LRUCache, RedisCache, SingleFlight, TieredCache
+from app.services.transformer import (
+    TransformationService,
+    TRANSFORMER_CACHE,
+    CRS_REGISTRY,
+    PATH_CATALOG,
+    VIA_SUGGESTION_CACHE,
+    LOCAL_OFFSET_CONTEXTS,
+    invalidate_transform_caches,
+)
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache["c"] = 3
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+
+
+def test_lru_cache_weight_bound():
+    cache = LRUCache(max_entries=10, max_weight=10, weigher=len)
+    cache["a"] = "x" * 6
+    cache["b"] = "y" * 6
+    assert "a" not in cache
+    assert cache.stats()["weight"] == 6
+
+
+def test_transformer_cache_shared_between_services():
+    TRANSFORMER_CACHE.clear()
+    TransformationService().transform_point("EPSG:4326", "EPSG:32631", 2.2945, 48.8584)
+    before = TRANSFORMER_CACHE.stats()["hits"]
+    TransformationService().transform_point("EPSG:4326", "EPSG:32631", 2.2955, 48.8589)
+    assert TRANSFORMER_CACHE.stats()["hits"] == before + 1
+
+
+def test_crs_registry_interns_codes_and_wkt():
+    record = CRS_REGISTRY.get(" EPSG:32631 ")
+    assert CRS_REGISTRY.get("EPSG:32631") is record
+    assert record.is_projected and record.units["horizontal"] == "metre"
+    assert CRS_REGISTRY.canonical("GIGS:OSGB36_3D") == "GIGS:OSGB36_3D"
+
+    wkt = CRS.from_epsg(4326).to_wkt()
+    assert CRS_REGISTRY.get(wkt) is CRS_REGISTRY.get(wkt)
+    assert CRS_REGISTRY.canonical(wkt) == "EPSG:4326"
+
+
+def test_path_catalog_reuses_enumeration_until_invalidated():
+    invalidate_transform_caches()
+    service = TransformationService()
+    paths = service.get_all_transformation_paths("EPSG:4326", "EPSG:27700")
+    paths[0]["description"] = "mutated"
+    again = service.get_all_transformation_paths("EPSG:4326", "EPSG:27700")
+    assert again[0]["description"] != "mutated"
+    assert PATH_CATALOG.stats()["serialized"]["hits"] >= 1
+    assert PATH_CATALOG.stats()["entries"] == 1
+
+    generation = PATH_CATALOG.generation
+    invalidate_transform_caches()
+    assert PATH_CATALOG.generation == generation + 1
+    assert PATH_CATALOG.stats()["entries"] == 0 and len(TRANSFORMER_CACHE) == 0
+
+
+def test_cache_invalidate_endpoint_needs_admin_token(monkeypatch):
+    from fastapi import HTTPException
+
+    from app.api.transform import invalidate_cache
+
+    monkeypatch.delenv("CACHE_ADMIN_TOKEN", raising=False)
+    with pytest.raises(HTTPException) as disabled:
+        asyncio.run(invalidate_cache(x_admin_token="anything"))
+    assert disabled.value.status_code == 404
+
+    monkeypatch.setenv("CACHE_ADMIN_TOKEN", "s3cret")
+    with pytest.raises(HTTPException) as denied:
+        asyncio.run(invalidate_cache(x_admin_token="wrong"))
+    assert denied.value.status_code == 403
+    generation = PATH_CATALOG.generation
+    assert asyncio.run(invalidate_cache(x_admin_token="s3cret"))["invalidated"]
+    assert PATH_CATALOG.generation == generation + 1
+
+
+def test_path_catalog_results_match_across_threads():
+    invalidate_transform_caches()
+    service = TransformationService()
+    count = len(service.get_all_transformation_paths("EPSG:4326", "EPSG:27700"))
+
+    def run_all():
+        results = []
+        for path_id in range(count):
+            result = service.transform_point_with_selection("EPSG:4326", "EPSG:27700", -1.0, 52.0, path_id=path_id)
+            results.append((result["x"], result["y"]))
+        return results
+
+    # This thread enumerated the group; the workers rebuild theirs from its definitions.
+    expected = run_all()
+    barrier = threading.Barrier(4)
+    results = []
+
+    def request():
+        barrier.wait()
+        results.append(run_all())
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert count > 1 and len(results) == 4
+    for other in results:
+        assert other == expected
+
+
+def test_suggest_vias_memoized_per_pair():
+    invalidate_transform_caches()
+    service = TransformationService()
+    first = service.suggest_vias("EPSG:4326", "EPSG:32631")
+    codes = [s["code"] for s in first]
+    assert "EPSG:4326" in codes and len(codes) == len(set(codes))
+    first[0]["code"] = "mutated"
+    before = VIA_SUGGESTION_CACHE.stats()["hits"]
+    again = TransformationService().suggest_vias("EPSG:4326", "EPSG:32631")
+    assert [s["code"] for s in again] == codes
+    assert VIA_SUGGESTION_CACHE.stats()["hits"] == before + 1
+
+
+def test_single_flight_coalesces_and_caches_failures():
+    flight = SingleFlight(failure_ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def build():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "value"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", build)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", build))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while flight.stats()["coalesced"] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results, key=lambda r: not r[1]) == [("value", True)] + [("value", False)] * 3
+
+    def fail():
+        calls.append(1)
+        raise ValueError("bad crs")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            flight.do("bad", fail)
+    assert len(calls) == 2 and flight.stats()["failure_hits"] == 2
+
+
+def test_local_offset_transformers_shared_across_services():
+    invalidate_transform_caches()
+    first = TransformationService().build_local_offset_context("EPSG:32631", 3.0, 50.0, 0.0)
+    second = TransformationService().build_local_offset_context("EPSG:32631", 3.1, 50.1, 0.0)
+    assert first["geo_to_target"] is second["geo_to_target"]
+    assert first["origin_ecef"] != second["origin_ecef"]
+
+
+def test_local_offset_contexts_reused_per_rounded_reference(monkeypatch):
+    import app.api.transform as transform_api
+    from app.services import transformer as transformer_module
+
+    invalidate_transform_caches()
+    service = TransformationService()
+    first = service.build_local_offset_context("EPSG:32631", 3.0, 50.0, 10.0)
+    assert service.build_local_offset_context("EPSG:32631", 3.0 + 1e-14, 50.0, 10.0) is first
+    assert service.build_local_offset_context("EPSG:32631", 3.1, 50.0, 10.0) is not first
+
+    request = transform_api.LocalOffsetRequest(
+        crs="EPSG:32631", reference={"x": 500000.0, "y": 5540000.0}, offset={"east": 10.0, "north": 5.0}
+    )
+    expected = transform_api.transform_local_offset.__wrapped__(request)
+
+    # Repeat requests for the same reference build no transformers at all.
+    def no_builds(*args, **kwargs):
+        raise AssertionError("Transformer built on a cached reference")
+
+    monkeypatch.setattr(transform_api.Transformer, "from_crs", no_builds)
+    monkeypatch.setattr(transformer_module.Transformer, "from_crs", no_builds)
+    hits = LOCAL_OFFSET_CONTEXTS.stats()["hits"]
+    assert transform_api.transform_local_offset.__wrapped__(request) == expected
+    assert LOCAL_OFFSET_CONTEXTS.stats()["hits"] == hits + 1
+
+    # Nor when the CRS has no WGS 84 transformer: the request fails instead.
+    build_context = TransformationService.build_local_offset_context
+    monkeypatch.setattr(
+        TransformationService,
+        "build_local_offset_context",
+        lambda self, *args: {**build_context(self, *args), "geo_to_wgs": None, "reference_wgs84": None},
+    )
+    with pytest.raises(transform_api.HTTPException) as failed:
+        transform_api.transform_local_offset.__wrapped__(request)
+    assert failed.value.status_code == 400 and "to WGS 84" in failed.value.detail
+
+
+class _DictRedis:
+    """RedisCache-shaped stand-in for the shared tier."""
+
+    def __init__(self, fail: bool = False):
+        self.data = {}
+        self.fail = fail
+        self.calls = 0
+
+    def get_json(self, key):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(key)
+
+    def set_json(self, key, value, ex=None):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.data[key] = value
+
+
+def test_tiered_cache_shares_values_and_errors_through_redis():
+    shared = _DictRedis()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"name": "WGS 84"}
+
+    def invalid():
+        builds.append(1)
+        raise ValueError("unknown code")
+
+    first = TieredCache("meta", version=lambda: "v1", redis=shared)
+    assert first.get_or_build("info:EPSG:4326", build) == {"name": "WGS 84"}
+    assert first.get_or_build("info:EPSG:4326", build) == {"name": "WGS 84"}
+    with pytest.raises(ValueError, match="unknown code"):
+        first.get_or_build("info:EPSG:0", invalid)
+    assert set(shared.data) == {"meta:v1:info:EPSG:4326", "meta:v1:info:EPSG:0"}
+
+    # Another process: served from Redis, negative entry included.
+    second = TieredCache("meta", version="v1", redis=shared)
+    assert second.get_or_build("info:EPSG:4326", build) == {"name": "WGS 84"}
+    with pytest.raises(ValueError, match="unknown code"):
+        second.get_or_build("info:EPSG:0", invalid)
+    assert len(builds) == 2
+    stats = second.stats()
+    assert stats["redis_hits"] == 2 and stats["negative_hits"] == 1 and stats["builds"] == 0
+
+    # A new database version misses.
+    TieredCache("meta", version="v2", redis=shared).get_or_build("info:EPSG:4326", build)
+    assert len(builds) == 3
+
+    # A Redis factory is only called on first use.
+    connects = []
+    lazy = TieredCache("meta", version="v1", redis=lambda: connects.append(1) or shared)
+    assert not connects and lazy.stats()["redis"] == "not connected"
+    assert lazy.get_or_build("info:EPSG:4326", build) == {"name": "WGS 84"}
+    assert connects == [1] and lazy.stats()["redis_hits"] == 1
+
+
+def test_crs_metadata_keys_hash_long_definitions(monkeypatch):
+    from app.api import crs as crs_api
+
+    shared = _DictRedis()
+    cache = TieredCache("crs-meta", version="v1", redis=shared)
+    monkeypatch.setattr(crs_api, "CRS_METADATA_CACHE", cache)
+    wkt = CRS.from_epsg(32631).to_wkt()
+
+    first = crs_api.crs_info.__wrapped__(wkt)
+    padded = crs_api.crs_info.__wrapped__(f"  {wkt}\n")
+    crs_api.crs_parameters.__wrapped__(wkt)
+    assert first["name"] == padded["name"] and padded["code"] == f"  {wkt}\n"
+    assert cache.stats()["builds"] == 2
+    assert all(len(key) < 100 for key in shared.data)
+
+
+def test_tiered_cache_degrades_to_local_when_redis_fails():
+    broken = _DictRedis(fail=True)
+    cache = TieredCache("meta", version="v1", redis=broken, retry_after=60)
+    assert cache.get_or_build("a", lambda: 1) == 1
+    assert cache.get_or_build("a", lambda: 2) == 1
+    assert cache.get_or_build("b", lambda: 3) == 3
+    stats = cache.stats()
+    # One failed call, then Redis is skipped until retry_after passes.
+    assert broken.calls == 1 and stats["redis_errors"] == 1 and stats["redis"] == "unavailable"
+    assert stats["local_hits"] == 1 and stats["builds"] == 2
+
+
+def test_redis_caches_share_one_pool_per_option_set():
+    first, second = RedisCache(), RedisCache()
+    assert first.client.connection_pool is second.client.connection_pool
+    assert first.binary.connection_pool is not first.client.connection_pool
+    assert RedisCache(socket_timeout=1).client.connection_pool is not first.client.connection_pool
+
+
+def test_redis_cache_batches_keys_and_stores_binary_columns():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    cache = RedisCache(
+        client=fakeredis.FakeRedis(server=server, decode_responses=True),
+        binary_client=fakeredis.FakeRedis(server=server),
+    )
+    cache.set_many_json({"a": {"x": 1}, "b": np.array([1.5, 2.5])}, ex=60)
+    assert cache.get_many_json(["a", "missing", "b"]) == [{"x": 1}, None, [1.5, 2.5]]
+
+    cache.set_columns("cols", {"x": np.arange(3.0), "y": np.ones(3)}, {"crs": "EPSG:4326"})
+    columns, meta = cache.get_columns("cols")
+    assert columns["x"].tolist() == [0.0, 1.0, 2.0] and meta["crs"] == "EPSG:4326"
+    assert cache.get_columns("nope") is None
+
+
+def test_async_redis_cache_round_trip():
+    fakeredis = pytest.importorskip("fakeredis")
+
+    async def scenario():
+        cache = AsyncRedisCache(client=fakeredis.aioredis.FakeRedis(decode_responses=True))
+        await cache.set_many_json({"a": 1, "b": [2, 3]})
+        return await cache.get_many_json(["a", "b", "c"]), await cache.get_json("b")
+
+    assert asyncio.run(scenario()) == ([1, [2, 3], None], [2, 3])
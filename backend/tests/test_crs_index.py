@@ -0,0 +1,56 @@
+import pytest
+from pyproj.aoi import AreaOfInterest
+from pyproj.database import query_crs_info
+
+from app.services import crs_index
+from app.services.crs_index import CRSSearchIndex
+
+
+def test_projected_crs_index_persists_and_matches_exact_zones(tmp_path, monkeypatch):
+    # A slice of the EPSG projected CRS keeps the build short.
+    infos = [i for i in query_crs_info(auth_name="EPSG", pj_types=["PROJECTED_CRS"]) if "zone 3" in i.name]
+    monkeypatch.setattr(crs_index, "query_crs_info", lambda **kwargs: infos)
+    built = crs_index.ProjectedCRSIndex(str(tmp_path))
+    utm = dict(datum_name="European 1950", ellipsoid_name="International 1924", semi_major=6378388.0)
+    matches = built.match(is_utm=True, zone=31, south=False, **utm)
+    assert matches[0]["epsg_code"] == "EPSG:23031"
+    assert matches[0]["details"]["method"] == "Transverse Mercator"
+    assert built.stats()["source"] == "built" and built.path.exists()
+    # "zone 3" no longer matches zones 30-39.
+    assert all(m["name"].endswith("zone 3S") for m in built.match(is_utm=True, zone=3, south=True, **utm)[:3])
+
+    def rebuild():
+        raise AssertionError("index should load from disk")
+
+    monkeypatch.setattr(crs_index, "build_features", rebuild)
+    loaded = crs_index.ProjectedCRSIndex(str(tmp_path))
+    assert loaded.match(is_utm=True, zone=31, south=False, **utm) == matches
+    assert loaded.stats()["source"] == "file"
+
+
+def test_crs_search_index_ranks_filters_and_pages():
+    index = CRSSearchIndex()
+    results, total, _ = index.page(text="wgs 84 / utm zone 31n")
+    assert results[0] == {"code": "32631", "name": "WGS 84 / UTM zone 31N", "type": "PROJECTED_CRS"}
+    # Typeahead prefixes, codes and aliases.
+    assert index.page(text="amersf rd ne", limit=1)[0][0]["code"] == "28992"
+    assert index.page(text="EPSG:4326", limit=1)[0][0]["code"] == "4326"
+    assert index.page(text="web merc", limit=1)[0][0]["code"] == "3857"
+
+    # Area filter agrees with PROJ's intersection test, across the antimeridian too.
+    for box in [(4, 51, 6, 53), (170, -50, -170, -30)]:
+        expected = {info.code for info in query_crs_info(auth_name="EPSG", area_of_interest=AreaOfInterest(*box))}
+        assert {r["code"] for r in index.page(area_of_interest=box)[0]} == expected
+
+    query = dict(text="utm", crs_type="PROJECTED_CRS")
+    everything, total, _ = index.page(**query)
+    pages, cursor = [], None
+    while True:
+        page, page_total, cursor = index.page(limit=100, cursor=cursor, **query)
+        pages.extend(page)
+        assert page_total == total
+        if cursor is None:
+            break
+    assert pages == everything
+    with pytest.raises(ValueError):
+        index.page(text="wgs", limit=10, cursor=index.page(limit=10, **query)[2])
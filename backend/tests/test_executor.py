@@ -0,0 +1,170 @@
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from pyproj import Transformer
+
+from app.services.cache import LRUCache, PerThreadCache
+from app.services.executor import BlockingExecutor, ExecutorSaturated
+from app.services.process_pool import ProcessPoolBackend, pipeline_for
+from app.services.transformer import TransformationService
+from app.services import warmup
+
+
+def test_executor_rejects_when_workers_and_queue_are_full():
+    executor = BlockingExecutor(max_workers=1, queue_depth=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(release.wait))
+        second = asyncio.ensure_future(executor.run(lambda: threading.current_thread().name))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturated):
+            await executor.run(lambda: None)
+        stats = executor.stats()
+        release.set()
+        return stats, await first, await second
+
+    stats, first, second = asyncio.run(scenario())
+    executor.shutdown()
+
+    assert stats["running"] == 1 and stats["queued"] == 1 and stats["rejected"] == 1
+    assert first is True and second.startswith("transform-worker")
+    final = executor.stats()
+    assert final["completed"] == 2 and final["queue_wait_ms"]["max"] > 0
+
+
+def test_per_thread_cache_isolates_threads_and_clears_all():
+    cache = PerThreadCache(lambda: LRUCache(max_entries=4))
+    cache["k"] = "main"
+    seen = []
+
+    def worker():
+        seen.append(cache.get("k"))
+        cache["k"] = "worker"
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert seen == [None] and cache.get("k") == "main"
+    # The finished thread's cache is released with its thread-local storage.
+    assert cache.stats()["threads"] == 1
+    cache.clear()
+    assert "k" not in cache
+
+
+def test_process_pool_shards_match_in_process():
+    transformer = TransformationService().get_transformer("EPSG:4979", "EPSG:4978")
+    xs = np.linspace(-10.0, 10.0, 5000)
+    ys = np.linspace(40.0, 60.0, 5000)
+    zs = np.linspace(0.0, 100.0, 5000)
+    backend = ProcessPoolBackend(workers=2, min_points=1000)
+    try:
+        assert backend.transform(transformer, (xs[:10], ys[:10], zs[:10])) is None
+        out = backend.transform(transformer, (xs, ys, zs))
+    finally:
+        backend.shutdown()
+
+    expected = transformer.transform(xs, ys, zs)
+    assert out is not None
+    for got, want in zip(out, expected):
+        assert np.array_equal(got, want)
+    assert backend.stats()["shards"] == 2
+
+
+def test_process_pool_skips_transformers_without_pipeline():
+    multi = Transformer.from_crs("EPSG:4326", "EPSG:27700", always_xy=True)
+    if pipeline_for(multi) is not None:
+        pytest.skip("PROJ resolved a single operation for this pair")
+    backend = ProcessPoolBackend(workers=2, min_points=1)
+    assert backend.transform(multi, (np.zeros(4), np.zeros(4))) is None
+    assert backend.stats()["fallbacks"] == 1
+
+
+def test_iterate_advances_on_workers_even_when_saturated():
+    executor = BlockingExecutor(max_workers=1, queue_depth=0)
+
+    def items():
+        for _ in range(3):
+            yield threading.current_thread().name
+
+    async def scenario():
+        seen = []
+        async for name in executor.iterate(items()):
+            seen.append(name)
+        return seen
+
+    names = asyncio.run(scenario())
+    executor.shutdown()
+    assert len(names) == 3 and all(name.startswith("transform-worker") for name in names)
+    assert executor.stats()["rejected"] == 0
+
+
+def test_broadcast_runs_once_on_each_worker():
+    executor = BlockingExecutor(max_workers=3, queue_depth=0)
+    names, complete = executor.broadcast(lambda: threading.current_thread().name)
+    stats = executor.stats()
+    executor.shutdown()
+    assert complete and len(set(names)) == 3
+    # Broadcast tasks are admitted like requests, so they are counted.
+    assert stats["submitted"] == stats["completed"] == 3 and stats["rejected"] == 0
+
+
+def test_broadcast_reports_barrier_timeout_when_a_worker_is_busy():
+    executor = BlockingExecutor(max_workers=2, queue_depth=0)
+    release = threading.Event()
+    busy = threading.Thread(target=lambda: asyncio.run(executor.run(release.wait)))
+    busy.start()
+    while executor.stats()["running"] == 0:
+        time.sleep(0.01)
+    threading.Timer(0.3, release.set).start()
+    names, complete = executor.broadcast(lambda: threading.current_thread().name, timeout=0.1)
+    busy.join()
+    stats = executor.stats()
+    executor.shutdown()
+    assert not complete and len(names) == 2
+    assert stats["submitted"] == stats["completed"] == 3 and stats["queue_wait_ms"]["max"] > 0
+
+
+class _StubIndex:
+    def __init__(self, name, loaded):
+        self.name = name
+        self.loaded = loaded
+
+    def search(self):
+        self.loaded.append(self.name)
+
+    def columns(self):
+        self.loaded.append(self.name)
+
+    def stats(self):
+        return {"name": self.name}
+
+
+def test_warmup_reports_pairs_and_becomes_ready(monkeypatch):
+    monkeypatch.setenv("WARMUP_PAIRS", "EPSG:4326>EPSG:3857, EPSG:4326>NOT:A_CRS")
+    pairs = [p for p in warmup.configured_pairs() if p[2] == "configured"]
+    assert [(s, t) for s, t, _ in pairs] == [("EPSG:4326", "EPSG:3857"), ("EPSG:4326", "NOT:A_CRS")]
+    monkeypatch.setattr(warmup, "configured_pairs", lambda: pairs)
+    monkeypatch.setattr(warmup, "BLOCKING_EXECUTOR", BlockingExecutor(max_workers=2))
+    # The CRS indexes take seconds to build; only check that warm-up loads them.
+    loaded = []
+    monkeypatch.setattr(warmup, "CRS_SEARCH_INDEX", _StubIndex("search", loaded))
+    monkeypatch.setattr(warmup, "PROJECTED_CRS_INDEX", _StubIndex("match", loaded))
+
+    state = warmup.Warmup()
+    assert not state.ready
+    state.run()
+    report = state.report()
+    warmup.BLOCKING_EXECUTOR.shutdown()
+
+    # A failing pair is reported but does not hold back readiness.
+    assert report["ready"] and report["workers_warmed"] == 2 and not report["workers_timed_out"]
+    by_target = {p["target_crs"]: p for p in report["pairs"]}
+    assert by_target["EPSG:3857"]["ok"] and by_target["EPSG:3857"]["seconds"] >= 0
+    assert not by_target["NOT:A_CRS"]["ok"] and by_target["NOT:A_CRS"]["error"]
+    assert loaded == ["search", "match"]
+    assert report["crs_index"] == {"search": {"name": "search"}, "match": {"name": "match"}}
@@ -0,0 +1,138 @@
+import pytest
+from fastapi import HTTPException
+
+from app.api.jobs import _local_trajectory_chunks, _trajectory_chunks
+from app.api.transform import LocalTrajectoryRequest, TrajectoryRequest, local_trajectory_result, trajectory_result
+from app.services.cache import RedisCache
+from app.services.jobs import FileJobStore, JobManager, MemoryJobStore, RedisJobStore
+
+
+def _counting_handler(payload, chunk_size):
+    items = payload["items"]
+    for start in range(0, len(items), chunk_size):
+        part = items[start:start + chunk_size]
+        if "boom" in part:
+            raise ValueError("bad item")
+        yield {"items": [i * 2 for i in part]}, {"kind": "double"}, start + len(part), len(items)
+
+
+def test_job_manager_stores_chunks_and_progress(tmp_path):
+    for store in (MemoryJobStore(), FileJobStore(str(tmp_path))):
+        manager = JobManager(store, {"double": _counting_handler}, chunk_size=2)
+        job_id = manager.submit("double", {"items": [1, 2, 3, 4, 5]})["job_id"]
+        manager._queue.join()
+
+        status = manager.status(job_id)
+        assert status["status"] == "succeeded" and "payload" not in status
+        assert status["progress"] == {"done": 5, "total": 5} and status["chunks"] == 3
+        assert [manager.chunk(job_id, i)["items"] for i in range(3)] == [[2, 4], [6, 8], [10]]
+        # The payload is stored once; per-chunk record updates leave it out.
+        assert "payload" not in store.get(job_id)
+        assert store.get_payload(job_id) == {"items": [1, 2, 3, 4, 5]}
+
+        failed_id = manager.submit("double", {"items": [1, 2, "boom"]})["job_id"]
+        manager._queue.join()
+        failed = manager.status(failed_id)
+        assert failed["status"] == "failed" and failed["error"] == "bad item" and failed["chunks"] == 1
+
+        manager.delete(job_id)
+        assert manager.status(job_id) is None
+
+
+def test_failed_job_result_has_no_next_chunk(monkeypatch):
+    from app.api import jobs as jobs_api
+
+    manager = JobManager(MemoryJobStore(), {"double": _counting_handler}, chunk_size=2)
+    monkeypatch.setattr(jobs_api, "JOB_MANAGER", manager)
+    job_id = manager.submit("double", {"items": [1, 2, 3, 4, "boom"]})["job_id"]
+    manager._queue.join()
+
+    first = jobs_api.get_job_result(job_id, chunk=0)
+    last = jobs_api.get_job_result(job_id, chunk=1)
+    assert first["status"] == "failed" and first["next_chunk"] == 1
+    assert last["items"] == [6, 8] and last["next_chunk"] is None
+    with pytest.raises(HTTPException) as missing:
+        jobs_api.get_job_result(job_id, chunk=2)
+    assert missing.value.status_code == 404
+
+
+def test_file_store_requeues_unfinished_jobs(tmp_path):
+    store = FileJobStore(str(tmp_path))
+    store.put({"job_id": "abc", "kind": "double", "status": "running", "payload": {"items": [1]},
+               "progress": {"done": 0, "total": None}, "chunks": 0, "summary": {}, "error": None,
+               "created_at": 0, "started_at": 0, "finished_at": None})
+    manager = JobManager(FileJobStore(str(tmp_path)), {"double": _counting_handler})
+    manager._ensure_workers()
+    manager._queue.join()
+    assert manager.status("abc")["status"] == "succeeded"
+
+
+def test_shared_store_recovers_only_jobs_with_expired_lease(tmp_path):
+    import threading
+
+    release = threading.Event()
+
+    def blocking_handler(payload, chunk_size):
+        release.wait(5)
+        yield {"items": ["stale"]}, {}, len(payload["items"]), len(payload["items"])
+
+    owner = JobManager(FileJobStore(str(tmp_path)), {"double": blocking_handler})
+    job_id = owner.submit("double", {"items": [1, 2]})["job_id"]
+
+    # A second worker process starting up must leave the live owner's job alone.
+    other = JobManager(FileJobStore(str(tmp_path)), {"double": _counting_handler}, lease=60)
+    other._ensure_workers()
+    assert other._queue.unfinished_tasks == 0
+
+    # Once the owner stops renewing, the job is claimed and re-queued; the old
+    # owner stops without writing over the new owner's results.
+    other.store.put_lease(job_id, {"owner": owner.owner, "heartbeat_at": 0})
+    with other._lock:
+        other._recover()
+    other._queue.join()
+    assert other.status(job_id)["status"] == "succeeded"
+    assert other.store.get_lease(job_id)["owner"] == other.owner
+    release.set()
+    owner._queue.join()
+    assert owner.chunk(job_id, 0) == {"items": [2, 4]}
+
+
+def test_redis_job_store_pipelines_writes_and_prunes_index():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    cache = RedisCache(
+        client=fakeredis.FakeRedis(server=server, decode_responses=True),
+        binary_client=fakeredis.FakeRedis(server=server),
+    )
+    store = RedisJobStore(cache, ttl=60)
+    store.put({"job_id": "j1", "status": "queued"})
+    store.put_payload("j1", {"items": [1, 2]})
+    store.put({"job_id": "j2", "status": "queued"})
+    cache.client.delete("jobs:j2")
+    assert store.list_ids() == ["j1"] and store.get("j1")["status"] == "queued"
+    assert store.get_payload("j1") == {"items": [1, 2]}
+
+    store.delete("j1")
+    assert store.get("j1") is None and store.get_payload("j1") is None
+
+
+def test_trajectory_job_chunks_match_single_request():
+    points = [{"x": 2.29 + i * 0.001, "y": 48.85, "z": 1.0} for i in range(5)] + [{"id": "P6", "x": 2.3, "y": 48.9, "z": 2.0}]
+    payload = {"source_crs": "EPSG:4326", "target_crs": "EPSG:32631", "trajectory_points": points}
+    chunks = list(_trajectory_chunks(payload, 2))
+    records = [r for data, _, _, _ in chunks for r in data["transformed_trajectory"]]
+    expected = trajectory_result(TrajectoryRequest(**payload))
+    assert records == expected["transformed_trajectory"]
+    assert [done for _, _, done, _ in chunks] == [2, 4, 6]
+    assert chunks[0][1]["units_used"] == expected["units_used"]
+
+
+def test_local_trajectory_job_chunks_match_single_request():
+    payload = {
+        "crs": "EPSG:32631",
+        "reference": {"lon": 2.29, "lat": 48.85, "height": 0.0},
+        "points": [{"east": i * 10.0, "north": i * 5.0, "tvd": float(i)} for i in range(5)],
+    }
+    points = [p for data, _, _, _ in _local_trajectory_chunks(payload, 2) for p in data["points"]]
+    expected = local_trajectory_result(LocalTrajectoryRequest(**payload))
+    assert points == expected["points"]
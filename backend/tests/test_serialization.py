@@ -0,0 +1,165 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from app.api.transform import (
+    LocalTrajectoryRequest,
+    TrajectoryRequest,
+    local_trajectory_chunks,
+    local_trajectory_result,
+    trajectory_result,
+    transform_local_trajectory_binary,
+    transform_trajectory_binary,
+)
+from app.services.binary_columns import (
+    ARROW_MEDIA_TYPE,
+    NPY_MEDIA_TYPE,
+    RAW_MEDIA_TYPE,
+    decode_columns,
+    encode_columns,
+    pack_raw,
+    unpack_raw,
+)
+from app.services.serialization import (
+    COLUMNAR_MEDIA_TYPE,
+    RECORDS_MEDIA_TYPE,
+    dumps,
+    ndjson_lines,
+    negotiate_layout,
+    timed_response,
+)
+
+
+def test_negotiate_layout():
+    assert negotiate_layout(None, None) == "json"
+    assert negotiate_layout("application/json", None) == "json"
+    assert negotiate_layout(COLUMNAR_MEDIA_TYPE, None) == "columnar"
+    assert negotiate_layout(f"{RECORDS_MEDIA_TYPE}, application/json", None) == "records"
+    # The query parameter wins over Accept.
+    assert negotiate_layout(COLUMNAR_MEDIA_TYPE, "json") == "json"
+    with pytest.raises(ValueError):
+        negotiate_layout(None, "xml")
+
+
+def test_fast_records_body_matches_default_encoder():
+    payload = {"points": [{"x": 0.1 + 0.2, "name": "é", "nested": {"h": None}}], "n": 3}
+    default = timed_response(payload, "json", 0.0)
+    fast = timed_response(payload, "records", 0.0)
+    assert fast.body == default.body
+    assert "serialize;dur=" in fast.headers["Server-Timing"]
+    assert json.loads(dumps({"a": np.array([1.5, np.nan])})) == {"a": [1.5, None]}
+
+
+def test_columnar_local_trajectory_matches_records():
+    request = LocalTrajectoryRequest(
+        crs="EPSG:32631",
+        reference={"lon": 2.29, "lat": 48.85, "height": 0.0},
+        points=[{"east": i * 10.0, "north": i * 5.0, "tvd": float(i), "name": f"p{i}"} for i in range(4)],
+    )
+    records = local_trajectory_result(request)
+    columnar = json.loads(dumps(local_trajectory_result(request, "columnar")))
+    columns = columnar["points"]
+
+    assert columnar["count"] == 4 and columnar["reference"] == records["reference"]
+    for i, point in enumerate(records["points"]):
+        assert columns["name"][i] == point["name"]
+        assert columns["offset"]["up"][i] == point["offset"]["up"]
+        assert columns["ecef"]["projected"]["x"][i] == point["ecef"]["projected"]["x"]
+        assert columns["scale"]["wgs84"]["lat"][i] == point["scale"]["wgs84"]["lat"]
+        assert columns["difference"]["projected"]["d_m"][i] == point["difference"]["projected"]["d_m"]
+        assert columns["difference"]["geodesic"]["distance"][i] == point["difference"]["geodesic"]["distance"]
+    assert columns["scale"]["scales"] == records["points"][0]["scale"]["scales"]
+
+
+def test_column_container_round_trip_is_zero_copy():
+    body = pack_raw({"x": np.array([1.0, 2.0, 3.0]), "y": np.array([4.0, 5.0, 6.0])}, {"crs": "EPSG:4326"})
+    columns, meta = unpack_raw(body)
+    assert meta == {"crs": "EPSG:4326", "columns": ["x", "y"]}
+    assert columns["y"].tolist() == [4.0, 5.0, 6.0]
+    assert not columns["x"].flags.owndata and not columns["x"].flags.writeable
+    with pytest.raises(ValueError):
+        unpack_raw(body[:-8])
+
+
+def test_binary_trajectory_matches_json_endpoint():
+    xs, ys = [2.29, 2.30, 2.31], [48.85, 48.86, 48.87]
+    response = transform_trajectory_binary.__wrapped__(
+        source_crs="EPSG:4326",
+        target_crs="EPSG:32631",
+        body=pack_raw({"x": np.array(xs), "y": np.array(ys)}),
+        content_type=RAW_MEDIA_TYPE,
+        accept=NPY_MEDIA_TYPE,
+    )
+    assert response.media_type == NPY_MEDIA_TYPE
+    out = np.load(io.BytesIO(response.body))
+    expected = trajectory_result(
+        TrajectoryRequest(source_crs="EPSG:4326", target_crs="EPSG:32631", x=xs, y=ys, output="columnar")
+    )["transformed_columns"]
+    assert out["x"].tolist() == expected["x"] and out["y"].tolist() == expected["y"]
+    assert json.loads(response.headers["X-Columns-Meta"])["count"] == 3
+
+
+def test_binary_local_trajectory_from_npy_matches_records():
+    offsets = np.zeros(3, dtype=[("east", "<f8"), ("north", "<f8"), ("tvd", "<f8")])
+    offsets["east"], offsets["north"], offsets["tvd"] = [0.0, 10.0, 20.0], [0.0, 5.0, 10.0], [0.0, 1.0, 2.0]
+    stream = io.BytesIO()
+    np.save(stream, offsets)
+    response = transform_local_trajectory_binary.__wrapped__(
+        crs="EPSG:32631",
+        ref_lon=2.29,
+        ref_lat=48.85,
+        body=stream.getvalue(),
+        content_type=NPY_MEDIA_TYPE,
+        accept=None,
+    )
+    # Without Accept the response mirrors the request format.
+    assert response.media_type == NPY_MEDIA_TYPE
+    columns = np.load(io.BytesIO(response.body))
+    records = local_trajectory_result(
+        LocalTrajectoryRequest(
+            crs="EPSG:32631",
+            reference={"lon": 2.29, "lat": 48.85},
+            points=[{"east": e, "north": n, "tvd": t} for e, n, t in offsets.tolist()],
+        )
+    )["points"]
+    assert columns["ecef.projected.x"].tolist() == [p["ecef"]["projected"]["x"] for p in records]
+    assert columns["difference.projected.d_m"].tolist() == [p["difference"]["projected"]["d_m"] for p in records]
+
+
+def test_arrow_round_trip():
+    pytest.importorskip("pyarrow")
+    body = encode_columns({"x": np.array([1.0, 2.0])}, ARROW_MEDIA_TYPE, {"crs": "EPSG:4326"})
+    columns, meta = decode_columns(body, ARROW_MEDIA_TYPE, ("x",))
+    assert columns["x"].tolist() == [1.0, 2.0] and meta == {"crs": "EPSG:4326"}
+
+
+def test_ndjson_stream_lines_match_full_response():
+    request = LocalTrajectoryRequest(
+        crs="EPSG:32631",
+        reference={"lon": 2.29, "lat": 48.85},
+        points=[{"east": i * 10.0, "north": i * 5.0, "tvd": float(i)} for i in range(5)],
+    )
+    expected = local_trajectory_result(request)
+
+    lines = [json.loads(line) for line in b"".join(ndjson_lines(local_trajectory_chunks(request, 2, "records"), "ndjson", 2)).splitlines()]
+    assert lines[0]["meta"]["count"] == 5 and lines[0]["meta"]["reference"] == expected["reference"]
+    assert lines[1:-1] == expected["points"]
+    assert lines[-1]["done"] is True
+
+    frames = [json.loads(line) for line in b"".join(ndjson_lines(local_trajectory_chunks(request, 2, "columnar"), "ndjson-columnar", 2)).splitlines()]
+    assert [(f["offset"], f["count"]) for f in frames[1:-1]] == [(0, 2), (2, 2), (4, 1)]
+    assert [i for f in frames[1:-1] for i in f["points"]["index"]] == list(range(5))
+    assert [x for f in frames[1:-1] for x in f["points"]["ecef"]["projected"]["x"]] == [
+        p["ecef"]["projected"]["x"] for p in expected["points"]
+    ]
+
+
+def test_ndjson_stream_reports_late_errors_in_band():
+    def chunks():
+        yield {"points": [{"index": 0}]}, {}, 1, 3
+        raise ValueError("boom")
+
+    lines = [json.loads(line) for line in b"".join(ndjson_lines(chunks(), "ndjson", 1)).splitlines()]
+    assert lines[-1] == {"error": "boom", "count": 1}
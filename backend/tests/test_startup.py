@@ -0,0 +1,65 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from app.services.crs_registry import CRSRegistry, LazyDefinitions
+
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+# Wall-clock budget for `import app.main` in a fresh interpreter. Generous by
+# default; tighten with IMPORT_TIME_BUDGET in CI to catch startup regressions.
+IMPORT_TIME_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "5.0"))
+
+
+def test_lazy_definitions_build_once_on_lookup():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return "EPSG:4326"
+
+    aliases = LazyDefinitions({"ALIAS:WGS84": build})
+    assert "ALIAS:WGS84" in aliases and list(aliases) == ["ALIAS:WGS84"]
+    assert aliases.built == 0 and not calls
+
+    registry = CRSRegistry(aliases)
+    assert registry.get("ALIAS:WGS84").crs.to_epsg() == 4326
+    assert registry.resolve_input("ALIAS:WGS84") == "EPSG:4326"
+    assert registry.resolve_input("EPSG:3857") == "EPSG:3857"
+    assert len(calls) == 1 and aliases.built == 1
+
+
+def test_import_app_main_within_budget_and_defers_proj_setup():
+    script = textwrap.dedent(
+        """
+        import json, time
+        started = time.perf_counter()
+        import app.main
+        elapsed = time.perf_counter() - started
+        from pyproj import network
+        from app.api.jobs import JOB_MANAGER
+        from app.services.transformer import CUSTOM_CRS_ALIASES
+        print(json.dumps({
+            "seconds": elapsed,
+            "aliases_built": CUSTOM_CRS_ALIASES.built,
+            "network": network.is_network_enabled(),
+            "job_store_resolved": JOB_MANAGER._store_resolved,
+        }))
+        """
+    )
+    env = {k: v for k, v in os.environ.items() if k != "PROJ_NETWORK"}
+    env["PYTHONPATH"] = str(BACKEND)
+    env["JOBS_BACKEND"] = "redis"  # must not ping Redis at import
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report["aliases_built"] == 0
+    assert report["network"] is False
+    assert report["job_store_resolved"] is False
+    assert report["seconds"] < IMPORT_TIME_BUDGET, report